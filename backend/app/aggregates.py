@@ -0,0 +1,267 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import case, delete, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from app.models import HistoryPoint, Trade, TradeDaily, TradeSummary
+from app.usd_rate import rate_for
+
+SUMMARY_ID = 1
+ROLLUP_COLUMNS = ("trades_count", "btc_bought", "fiat_spent", "fiat_spent_usd", "fiat_unrated")
+BUCKETS = ("day", "week", "month")
+
+
+def _has_rate(t: Trade) -> bool:
+    return t.fiat_spent_usd not in (None, 0)
+
+
+def usd_rate_of(t: Trade) -> Optional[float]:
+    """Tasa ARS/USD del trade: la guardada en la fila, o la del día de la compra."""
+    return t.fiat_spent_usd if _has_rate(t) else rate_for(t.buy_timestamp.date())
+
+
+def _empty_rollup() -> dict:
+    return {
+        "trades_count": 0,
+        "btc_bought": 0.0,
+        "fiat_spent": 0.0,
+        "fiat_spent_usd": 0.0,
+        "fiat_unrated": 0.0,
+        "close_price": None,
+        "close_at": None,
+    }
+
+
+def _upsert_daily(session: Session, rows: list[dict]) -> None:
+    """INSERT ... ON CONFLICT (day) DO UPDATE col = col + excluded.col."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(TradeDaily)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(TradeDaily)
+    else:
+        raise HTTPException(status_code=501, detail=f"Rollups no soportados para {dialect}")
+    table = TradeDaily.__table__
+    stmt = stmt.values(rows)
+    # El cierre del día queda con el de la compra más reciente, venga de este lote o de uno anterior.
+    newer = table.c.close_at.is_(None) | (stmt.excluded.close_at >= table.c.close_at)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.day],
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name in ROLLUP_COLUMNS},
+            "close_price": case((newer, stmt.excluded.close_price), else_=table.c.close_price),
+            "close_at": case((newer, stmt.excluded.close_at), else_=table.c.close_at),
+        },
+    )
+    session.execute(stmt)
+
+
+def apply_trades(session: Session, trades: Iterable[Trade]) -> None:
+    """
+    Suma los trades recién insertados a los totales con un UPDATE atómico (col = col + delta)
+    y a los rollups diarios con un upsert. Debe llamarse dentro de la misma transacción que el insert.
+    """
+    trades = list(trades)
+    if not trades:
+        return
+
+    daily: dict[date, dict] = defaultdict(_empty_rollup)
+    for t in trades:
+        rate = usd_rate_of(t)
+        row = daily[t.buy_timestamp.date()]
+        row["trades_count"] += 1
+        row["btc_bought"] += t.btc_bought
+        row["fiat_spent"] += t.fiat_spent
+        if rate:
+            row["fiat_spent_usd"] += t.fiat_spent / rate
+        else:
+            row["fiat_unrated"] += t.fiat_spent
+        if row["close_at"] is None or t.buy_timestamp >= row["close_at"]:
+            row["close_price"] = t.price_fiat_per_btc
+            row["close_at"] = t.buy_timestamp
+
+    deltas = {
+        "trades_count": sum(r["trades_count"] for r in daily.values()),
+        "total_btc": sum(r["btc_bought"] for r in daily.values()),
+        "total_fiat": sum(r["fiat_spent"] for r in daily.values()),
+        "total_fiat_usd": sum(r["fiat_spent_usd"] for r in daily.values()),
+        "fiat_unrated": sum(r["fiat_unrated"] for r in daily.values()),
+    }
+    stmt = (
+        update(TradeSummary)
+        .where(TradeSummary.id == SUMMARY_ID)
+        .values(
+            **{name: getattr(TradeSummary, name) + delta for name, delta in deltas.items()},
+            updated_at=datetime.now(timezone.utc),
+        )
+    )
+    if session.execute(stmt).rowcount == 0:
+        # Sin fila de resumen todavía: se arma desde la tabla (ya incluye estos trades).
+        session.flush()
+        rebuild_summary(session)
+        return
+    _upsert_daily(session, [{"day": day, **row} for day, row in daily.items()])
+
+
+def touch_summary(session: Session) -> None:
+    """Marca un cambio en trades existentes (sin altas) para que cambie la versión de los datos."""
+    session.execute(update(TradeSummary).values(updated_at=datetime.now(timezone.utc)))
+
+
+def _as_date(value) -> date:
+    # SQLite devuelve date() como texto; Postgres como date.
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def rebuild_summary(session: Session) -> TradeSummary:
+    """
+    Recalcula los totales y los rollups diarios con una agregación SQL por día sobre trade.
+    Los trades sin tasa guardada se convierten con la tasa histórica de su día. No hace commit.
+    """
+    has_rate = Trade.fiat_spent_usd.is_not(None) & (Trade.fiat_spent_usd != 0)
+    day = func.date(Trade.buy_timestamp)
+    rows = session.exec(
+        select(
+            day,
+            has_rate,
+            func.count(Trade.id),
+            func.coalesce(func.sum(Trade.btc_bought), 0.0),
+            func.coalesce(func.sum(Trade.fiat_spent), 0.0),
+            func.coalesce(func.sum(case((has_rate, Trade.fiat_spent / Trade.fiat_spent_usd), else_=0.0)), 0.0),
+        ).group_by(day, has_rate)
+    ).all()
+
+    daily: dict[date, dict] = defaultdict(_empty_rollup)
+    for raw_day, rated, count, btc, fiat, fiat_usd in rows:
+        bucket_day = _as_date(raw_day)
+        row = daily[bucket_day]
+        row["trades_count"] += count
+        row["btc_bought"] += btc
+        row["fiat_spent"] += fiat
+        if rated:
+            row["fiat_spent_usd"] += fiat_usd
+        elif rate := rate_for(bucket_day):
+            row["fiat_spent_usd"] += fiat / rate
+        else:
+            row["fiat_unrated"] += fiat
+
+    # Cierre de cada día: el precio de su última compra.
+    last = select(day.label("day"), func.max(Trade.buy_timestamp).label("close_at")).group_by(day).subquery()
+    closes = session.exec(
+        select(last.c.day, Trade.buy_timestamp, Trade.price_fiat_per_btc)
+        .join(last, (func.date(Trade.buy_timestamp) == last.c.day) & (Trade.buy_timestamp == last.c.close_at))
+        .order_by(Trade.id)
+    ).all()
+    for raw_day, close_at, close_price in closes:
+        row = daily[_as_date(raw_day)]
+        row["close_price"] = close_price
+        row["close_at"] = close_at
+
+    session.execute(delete(TradeDaily))
+    for bucket_day, row in daily.items():
+        session.add(TradeDaily(day=bucket_day, **row))
+
+    summary = session.get(TradeSummary, SUMMARY_ID) or TradeSummary(id=SUMMARY_ID)
+    summary.trades_count = sum(r["trades_count"] for r in daily.values())
+    summary.total_btc = sum(r["btc_bought"] for r in daily.values())
+    summary.total_fiat = sum(r["fiat_spent"] for r in daily.values())
+    summary.total_fiat_usd = sum(r["fiat_spent_usd"] for r in daily.values())
+    summary.fiat_unrated = sum(r["fiat_unrated"] for r in daily.values())
+    summary.updated_at = datetime.now(timezone.utc)
+    session.add(summary)
+    session.flush()
+    return summary
+
+
+def get_summary(session: Session) -> TradeSummary:
+    summary = session.get(TradeSummary, SUMMARY_ID)
+    if summary is None:
+        summary = rebuild_summary(session)
+        session.commit()
+    return summary
+
+
+def _bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def get_history(
+    session: Session,
+    bucket: str = "day",
+    usd_rate: Optional[float] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> list[HistoryPoint]:
+    """
+    Serie de BTC acumulado, costo promedio y PnL por día/semana/mes desde trade_daily
+    (una fila por día con compras, así años de historial son unas pocas miles de filas).
+
+    Con `usd_rate` los montos van en USD (los días sin tasa se convierten con esa cotización).
+    El PnL de cada período se valúa a su cierre: el precio de la última compra del período
+    (o del último con compras), la cotización histórica más reciente que tiene la base.
+    """
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=422, detail=f"bucket debe ser uno de {', '.join(BUCKETS)}")
+
+    summary = get_summary(session)
+    days = session.exec(select(TradeDaily).order_by(TradeDaily.day)).all()
+    stale = any(d.trades_count and d.close_price is None for d in days)
+    if stale or sum(d.trades_count for d in days) != summary.trades_count:
+        # Rollups de antes de existir trade_daily (o del cierre diario), o desfasados: se reconstruyen una vez.
+        rebuild_summary(session)
+        session.commit()
+        days = session.exec(select(TradeDaily).order_by(TradeDaily.day)).all()
+
+    buckets: dict[date, dict] = {}
+    for d in days:
+        fiat = d.fiat_spent
+        if usd_rate is not None:
+            fiat = d.fiat_spent_usd + (d.fiat_unrated / usd_rate if usd_rate else d.fiat_unrated)
+        row = buckets.setdefault(
+            _bucket_start(d.day, bucket), {"trades_count": 0, "btc": 0.0, "fiat": 0.0, "close": None}
+        )
+        row["trades_count"] += d.trades_count
+        row["btc"] += d.btc_bought
+        row["fiat"] += fiat
+        if d.close_price:
+            close = d.close_price
+            if usd_rate is not None:
+                rate = rate_for(d.day) or usd_rate
+                close = close / rate if rate else close
+            row["close"] = close
+
+    points: list[HistoryPoint] = []
+    cum_btc = cum_fiat = mark_price = 0.0
+    for period_start, row in buckets.items():
+        cum_btc += row["btc"]
+        cum_fiat += row["fiat"]
+        if row["close"]:
+            mark_price = row["close"]
+        if (start and period_start < _bucket_start(start, bucket)) or (end and period_start > end):
+            continue
+        value = cum_btc * mark_price
+        pnl_abs = value - cum_fiat
+        points.append(
+            HistoryPoint(
+                period_start=period_start,
+                trades_count=row["trades_count"],
+                btc_bought=row["btc"],
+                fiat_spent=row["fiat"],
+                cumulative_btc=cum_btc,
+                cumulative_fiat=cum_fiat,
+                avg_cost=cum_fiat / cum_btc if cum_btc else 0.0,
+                mark_price=mark_price,
+                value=value,
+                pnl_abs=pnl_abs,
+                pnl_pct=(pnl_abs / cum_fiat * 100) if cum_fiat else 0.0,
+            )
+        )
+    return points
@@ -1,16 +1,169 @@
+import asyncio
 import logging
-from typing import Optional
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
 
+import httpx
 import requests
 
 
-def fetch_price(symbol: str, base_url: str = "https://api.binance.com") -> Optional[float]:
+def fetch_price(
+    symbol: str,
+    base_url: str = "https://api.binance.com",
+    session: Optional[requests.Session] = None,
+) -> Optional[float]:
     url = f"{base_url.rstrip('/')}/api/v3/ticker/price"
     try:
-        resp = requests.get(url, params={"symbol": symbol}, timeout=5)
+        resp = (session or requests).get(url, params={"symbol": symbol}, timeout=5)
         resp.raise_for_status()
         data = resp.json()
         return float(data.get("price", 0))
     except Exception as exc:  # noqa: BLE001
         logging.error("No se pudo obtener precio para %s en %s: %s", symbol, base_url, exc)
         return None
+
+
+async def async_fetch_price(
+    symbol: str,
+    base_url: str = "https://api.binance.com",
+    client: Optional[httpx.AsyncClient] = None,
+) -> Optional[float]:
+    url = f"{base_url.rstrip('/')}/api/v3/ticker/price"
+    try:
+        if client is None:
+            async with httpx.AsyncClient() as own_client:
+                resp = await own_client.get(url, params={"symbol": symbol}, timeout=5)
+        else:
+            resp = await client.get(url, params={"symbol": symbol}, timeout=5)
+        resp.raise_for_status()
+        return float(resp.json().get("price", 0))
+    except Exception as exc:  # noqa: BLE001
+        logging.error("No se pudo obtener precio para %s en %s: %s", symbol, base_url, exc)
+        return None
+
+
+@dataclass(frozen=True)
+class PriceQuote:
+    price: Optional[float]
+    fetched_at: Optional[float] = None
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        return time.time() - self.fetched_at if self.fetched_at else None
+
+    @property
+    def updated_at(self) -> Optional[datetime]:
+        return datetime.fromtimestamp(self.fetched_at, tz=timezone.utc) if self.fetched_at else None
+
+
+class PriceFeed:
+    """
+    Mantiene en memoria el último precio de `symbol`, refrescado por un hilo de fondo.
+
+    Los requests leen la copia en memoria; sólo si está vencida (o el hilo no arrancó)
+    disparan un refresco, y los que llegan a la vez comparten esa única llamada a Binance.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        base_url: str = "https://api.binance.com",
+        refresh_seconds: float = 5,
+        stale_after_seconds: float = 30,
+    ) -> None:
+        self.symbol = symbol
+        self.base_url = base_url
+        self.refresh_seconds = refresh_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self.session = requests.Session()
+        self._quote = PriceQuote(price=None)
+        self._lock = threading.Lock()
+        self._inflight: Optional[threading.Event] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        # Se invoca con (anterior, nuevo) cada vez que el precio cambia.
+        self.on_change: Optional[Callable[[PriceQuote, PriceQuote], None]] = None
+        self._ainflight: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"price-feed-{self.symbol}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def aclose(self) -> None:
+        self.stop()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_seconds)
+
+    def is_stale(self, quote: PriceQuote) -> bool:
+        age = quote.age_seconds
+        return age is None or age > self.stale_after_seconds
+
+    def _store(self, price: Optional[float]) -> None:
+        if not price:
+            return
+        previous, self._quote = self._quote, PriceQuote(price=price, fetched_at=time.time())
+        if self.on_change and previous.price != price:
+            try:
+                self.on_change(previous, self._quote)
+            except Exception as exc:  # noqa: BLE001
+                logging.warning("Error notificando cambio de precio de %s: %s", self.symbol, exc)
+
+    def refresh(self) -> PriceQuote:
+        with self._lock:
+            inflight = self._inflight
+            leader = inflight is None
+            if leader:
+                inflight = self._inflight = threading.Event()
+
+        if not leader:
+            inflight.wait(timeout=10)
+            return self._quote
+
+        try:
+            self._store(fetch_price(self.symbol, base_url=self.base_url, session=self.session))
+        finally:
+            with self._lock:
+                self._inflight = None
+            inflight.set()
+        return self._quote
+
+    def get(self) -> PriceQuote:
+        """Último precio conocido; si está vencido intenta refrescarlo (y si falla, devuelve el viejo)."""
+        quote = self._quote
+        if self.is_stale(quote):
+            quote = self.refresh()
+        return quote
+
+    async def _afetch(self) -> PriceQuote:
+        if self._client is None:
+            self._client = httpx.AsyncClient()
+        self._store(await async_fetch_price(self.symbol, base_url=self.base_url, client=self._client))
+        return self._quote
+
+    async def aget(self) -> PriceQuote:
+        """
+        Igual que `get` para handlers async: si el precio está vencido lo refresca con
+        httpx sin bloquear el event loop, y los requests concurrentes esperan la misma tarea.
+        """
+        quote = self._quote
+        if not self.is_stale(quote):
+            return quote
+        if self._ainflight is None or self._ainflight.done():
+            self._ainflight = asyncio.create_task(self._afetch())
+        return await asyncio.shield(self._ainflight)
@@ -0,0 +1,158 @@
+import json
+from typing import AsyncIterator, Iterable
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from app.models import Trade, TradeCreate, TransferUpdate
+
+# Filas por sentencia INSERT multi-row (SQLite admite hasta 32766 parámetros).
+BULK_BATCH_SIZE = 1000
+
+
+def _insert_ignoring_conflicts(dialect_name: str):
+    if dialect_name == "postgresql":
+        return postgresql.insert(Trade).on_conflict_do_nothing()
+    if dialect_name == "sqlite":
+        return sqlite.insert(Trade).on_conflict_do_nothing()
+    raise HTTPException(status_code=501, detail=f"Bulk insert no soportado para {dialect_name}")
+
+
+def _drop_reported_orders(session: Session, trades: list[TradeCreate]) -> list[TradeCreate]:
+    """
+    Los índices únicos cubren fill repetido y orden del bot repetida; falta el cruce:
+    un fill de sync_trades.py cuya orden ya reportó el bot (o al revés) es la misma compra.
+    """
+    order_ids = {t.binance_order_id for t in trades if t.binance_order_id is not None}
+    if not order_ids:
+        return trades
+
+    rows = session.exec(
+        select(Trade.binance_order_id, Trade.binance_trade_id).where(Trade.binance_order_id.in_(order_ids))
+    ).all()
+    bot_orders = {order_id for order_id, trade_id in rows if trade_id is None}
+    synced_orders = {order_id for order_id, trade_id in rows if trade_id is not None}
+
+    kept = []
+    for t in trades:
+        if t.binance_order_id in bot_orders:
+            continue
+        if t.binance_trade_id is None and t.binance_order_id in synced_orders:
+            continue
+        kept.append(t)
+    return kept
+
+
+def insert_trades(session: Session, trades: list[TradeCreate]) -> list[Trade]:
+    """
+    Inserta un lote con una sola sentencia multi-row `INSERT ... ON CONFLICT DO NOTHING`
+    y devuelve las filas efectivamente creadas. No hace commit.
+    """
+    candidates = _drop_reported_orders(session, trades)
+    if not candidates:
+        return []
+
+    stmt = _insert_ignoring_conflicts(session.get_bind().dialect.name)
+    stmt = stmt.values([t.model_dump() for t in candidates]).returning(*Trade.__table__.columns)
+    return [Trade(**row._mapping) for row in session.execute(stmt)]
+
+
+def update_transfers(session: Session, updates: list[TransferUpdate]) -> int:
+    """
+    Aplica los datos de retiro a los trades de cada binance_order_id con una sola sentencia
+    UPDATE ejecutada en lote (executemany). Devuelve las filas tocadas. No hace commit.
+    """
+    if not updates:
+        return 0
+    table = Trade.__table__
+    stmt = (
+        update(table)
+        .where(table.c.binance_order_id == bindparam("b_order_id"))
+        .values(
+            transfer_timestamp=func.coalesce(bindparam("b_transfer_timestamp"), table.c.transfer_timestamp),
+            withdraw_id=func.coalesce(bindparam("b_withdraw_id"), table.c.withdraw_id),
+            transfer_tx_id=func.coalesce(bindparam("b_transfer_tx_id"), table.c.transfer_tx_id),
+        )
+    )
+    result = session.connection().execute(
+        stmt,
+        [
+            {
+                "b_order_id": u.binance_order_id,
+                "b_transfer_timestamp": u.transfer_timestamp,
+                "b_withdraw_id": u.withdraw_id,
+                "b_transfer_tx_id": u.transfer_tx_id,
+            }
+            for u in updates
+        ],
+    )
+    return max(result.rowcount, 0)
+
+
+def _validate(item, position: int) -> TradeCreate:
+    try:
+        return TradeCreate.model_validate(item)
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail={"item": position, "errors": exc.errors()}) from None
+
+
+def _batches(items: Iterable[TradeCreate]) -> Iterable[list[TradeCreate]]:
+    batch: list[TradeCreate] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= BULK_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _ndjson_items(request: Request) -> AsyncIterator[TradeCreate]:
+    buffer = b""
+    position = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _validate(_parse_json(line, position), position)
+                position += 1
+    if buffer.strip():
+        yield _validate(_parse_json(buffer, position), position)
+
+
+def _parse_json(raw: bytes, position: int):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"JSON inválido en el elemento {position}") from None
+
+
+async def read_trade_batches(request: Request) -> AsyncIterator[list[TradeCreate]]:
+    """
+    Lee el cuerpo de POST /trades/bulk en lotes de BULK_BATCH_SIZE. Acepta un array JSON o,
+    con `Content-Type: application/x-ndjson`, un trade por línea leído a medida que llega.
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type:
+        batch: list[TradeCreate] = []
+        async for item in _ndjson_items(request):
+            batch.append(item)
+            if len(batch) >= BULK_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        return
+
+    try:
+        payload = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="El cuerpo no es JSON válido") from None
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Se esperaba un array JSON de trades")
+    for batch in _batches(_validate(item, i) for i, item in enumerate(payload)):
+        yield batch
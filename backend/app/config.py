@@ -7,8 +7,13 @@ from dotenv import load_dotenv
 @dataclass
 class Settings:
     db_url: str
+    db_async_url: str | None
     price_symbol: str
     price_base_url: str
+    price_refresh_seconds: float
+    price_stale_after_seconds: float
+    usd_rate_ttl_seconds: float
+    usd_rate_negative_ttl_seconds: float
     withdraw_network: str
     withdraw_address: str | None
 
@@ -16,16 +21,27 @@ class Settings:
 def get_settings() -> Settings:
     load_dotenv()
     db_url = os.getenv("DCA_DB_URL") or "sqlite:///./dca.db"
+    # Opcional: si no se define se deriva de DCA_DB_URL (aiosqlite / psycopg async).
+    db_async_url = os.getenv("DCA_DB_ASYNC_URL")
     # Prioriza el env específico, luego TRADE_SYMBOL (para alinear con BTCARS), sino USDT.
     price_symbol = (os.getenv("DCA_PRICE_SYMBOL") or os.getenv("TRADE_SYMBOL") or "BTCUSDT").upper()
     price_base_url = os.getenv("DCA_PRICE_BASE_URL") or "https://api.binance.com"
+    price_refresh_seconds = float(os.getenv("DCA_PRICE_REFRESH_SECONDS") or 5)
+    price_stale_after_seconds = float(os.getenv("DCA_PRICE_STALE_SECONDS") or 30)
+    usd_rate_ttl_seconds = float(os.getenv("DCA_USD_RATE_TTL_SECONDS") or 900)
+    usd_rate_negative_ttl_seconds = float(os.getenv("DCA_USD_RATE_RETRY_SECONDS") or 60)
     withdraw_network = (os.getenv("WITHDRAW_NETWORK") or "BSC").upper()
     withdraw_address = os.getenv("WITHDRAW_ADDRESS")
 
     return Settings(
         db_url=db_url,
+        db_async_url=db_async_url,
         price_symbol=price_symbol,
         price_base_url=price_base_url.rstrip("/"),
+        price_refresh_seconds=price_refresh_seconds,
+        price_stale_after_seconds=price_stale_after_seconds,
+        usd_rate_ttl_seconds=usd_rate_ttl_seconds,
+        usd_rate_negative_ttl_seconds=usd_rate_negative_ttl_seconds,
         withdraw_network=withdraw_network,
         withdraw_address=withdraw_address,
     )
@@ -1,4 +1,11 @@
+import logging
+from typing import AsyncIterator
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import get_settings
 
@@ -10,10 +17,57 @@ engine = create_engine(
 )
 
 
+def _async_url(db_url: str) -> str:
+    """Misma base con driver async: aiosqlite en local, psycopg (modo async) para Postgres/Supabase."""
+    scheme, sep, rest = db_url.partition("://")
+    if scheme in ("sqlite", "sqlite+pysqlite"):
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if scheme in ("postgresql", "postgres", "postgresql+psycopg2"):
+        return f"postgresql+psycopg{sep}{rest}"
+    return db_url
+
+
+# Engine async para los endpoints; el sync queda para init_db y los hilos de fondo.
+async_engine = create_async_engine(settings.db_async_url or _async_url(settings.db_url), pool_pre_ping=True)
+async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _add_missing_columns() -> None:
+    """create_all no altera tablas existentes: agrega las columnas nullable que falten."""
+    inspector = inspect(engine)
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            ddl_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl_type}"))
+
+
+def _create_missing_indexes() -> None:
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except SQLAlchemyError as exc:
+                # p.ej. duplicados previos que impiden un índice único; se sigue sin él.
+                logging.warning("No se pudo crear el índice %s: %s", index.name, exc)
+
+
 def init_db() -> None:
     SQLModel.metadata.create_all(engine)
+    _add_missing_columns()
+    _create_missing_indexes()
 
 
 def get_session() -> Session:
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    async with async_session_factory() as session:
+        yield session
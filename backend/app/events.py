@@ -0,0 +1,111 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+# Eventos que se conservan para reenviar a clientes que reconectan con Last-Event-ID.
+REPLAY_BUFFER_SIZE = 1000
+KEEPALIVE_SECONDS = 15
+RECONNECT_MILLIS = 3000
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    name: str
+    data: str
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: {self.name}\ndata: {self.data}\n\n"
+
+
+class EventBus:
+    """
+    Canal de eventos en proceso para `GET /events` (Server-Sent Events).
+
+    `publish` se puede llamar desde el event loop o desde hilos (p.ej. el feed de precios).
+    Los ids arrancan en el epoch en ms del proceso, así un Last-Event-ID de un proceso
+    anterior queda fuera del buffer y el cliente recibe `resync` en vez de un hueco.
+    """
+
+    def __init__(self, buffer_size: int = REPLAY_BUFFER_SIZE) -> None:
+        self._events: deque[Event] = deque(maxlen=buffer_size)
+        self._next_id = int(time.time() * 1000)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Event] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    def publish(self, name: str, payload: dict) -> Event:
+        with self._lock:
+            event = Event(id=self._next_id, name=name, data=json.dumps(payload, default=str))
+            self._next_id += 1
+            self._events.append(event)
+        if self._loop is not None and not self._loop.is_closed():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is self._loop:
+                self._wake()
+            else:
+                self._loop.call_soon_threadsafe(self._wake)
+        return event
+
+    def _wake(self) -> None:
+        # Despierta a todos los suscriptores y deja un Event nuevo para la próxima espera.
+        changed, self._changed = self._changed, asyncio.Event()
+        if changed is not None:
+            changed.set()
+
+    def since(self, last_id: int) -> tuple[list[Event], bool, int]:
+        """
+        Eventos posteriores a `last_id`, si hay un hueco (se perdieron eventos por salir
+        del buffer) y el id del último evento publicado.
+        """
+        with self._lock:
+            events = list(self._events)
+            head = self._next_id - 1
+        pending = [e for e in events if e.id > last_id]
+        oldest = events[0].id if events else head + 1
+        return pending, last_id < oldest - 1, head
+
+    async def stream(self, last_event_id: Optional[str]) -> AsyncIterator[str]:
+        try:
+            last_id: Optional[int] = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_id = None
+
+        yield f"retry: {RECONNECT_MILLIS}\n\n"
+        if last_id is None:
+            last_id = self.since(-1)[2]
+
+        while True:
+            # Se toma el Event antes de leer el buffer: lo publicado después despierta la espera.
+            changed = self._changed
+            events, gap, head = self.since(last_id)
+            if gap:
+                # El cliente perdió eventos (reconexión tardía o buffer desbordado): que recargue.
+                yield "event: resync\ndata: {}\n\n"
+                last_id = events[0].id - 1 if events else head
+            for event in events:
+                yield event.encode()
+                last_id = event.id
+            if events:
+                continue
+            try:
+                if changed is None:
+                    await asyncio.sleep(KEEPALIVE_SECONDS)
+                else:
+                    await asyncio.wait_for(changed.wait(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+
+
+event_bus = EventBus()
@@ -0,0 +1,168 @@
+import csv
+import io
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.db import async_session_factory
+from app.models import Trade
+
+# Filas por lote leído del cursor (y por row group / record batch en Parquet / Arrow).
+EXPORT_CHUNK_ROWS = 10_000
+
+EXPORT_COLUMNS = (
+    "id",
+    "buy_timestamp",
+    "fiat_spent",
+    "fiat_spent_usd",
+    "btc_bought",
+    "price_fiat_per_btc",
+    "wallet",
+    "transfer_timestamp",
+    "binance_order_id",
+    "binance_trade_id",
+    "withdraw_id",
+    "transfer_tx_id",
+)
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def export_query(start: Optional[date] = None, end: Optional[date] = None, wallet: Optional[str] = None):
+    """
+    Columnas crudas de trade (sin instanciar modelos) del más viejo al más nuevo,
+    con `end` inclusive. Usa el índice ix_trade_buy_timestamp_id.
+    """
+    table = Trade.__table__
+    query = select(*(table.c[name] for name in EXPORT_COLUMNS)).order_by(table.c.buy_timestamp, table.c.id)
+    if start:
+        query = query.where(table.c.buy_timestamp >= datetime.combine(start, time.min))
+    if end:
+        query = query.where(table.c.buy_timestamp < datetime.combine(end + timedelta(days=1), time.min))
+    if wallet:
+        query = query.where(table.c.wallet == wallet)
+    return query
+
+
+async def _row_chunks(query) -> AsyncIterator[list[tuple]]:
+    # Sesión propia: la del request se cierra antes de terminar el streaming.
+    async with async_session_factory() as session:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        async for rows in result.partitions(EXPORT_CHUNK_ROWS):
+            yield [tuple(row) for row in rows]
+
+
+async def stream_csv(query) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    async for rows in _row_chunks(query):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            tuple(value.isoformat() if isinstance(value, datetime) else value for value in row) for row in rows
+        )
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Archivo de sólo escritura que acumula lo escrito hasta que se lo retira con `drain`."""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._parts.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise HTTPException(
+            status_code=501, detail="Los formatos arrow/parquet requieren pyarrow (pip install pyarrow)"
+        ) from None
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("buy_timestamp", pa.timestamp("us")),
+            ("fiat_spent", pa.float64()),
+            ("fiat_spent_usd", pa.float64()),
+            ("btc_bought", pa.float64()),
+            ("price_fiat_per_btc", pa.float64()),
+            ("wallet", pa.string()),
+            ("transfer_timestamp", pa.timestamp("us")),
+            ("binance_order_id", pa.int64()),
+            ("binance_trade_id", pa.int64()),
+            ("withdraw_id", pa.string()),
+            ("transfer_tx_id", pa.string()),
+        ]
+    )
+
+
+def _record_batch(rows: list[tuple], schema):
+    import pyarrow as pa
+
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+    )
+
+
+async def stream_arrow(query) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield sink.drain()
+        async for rows in _row_chunks(query):
+            writer.write_batch(_record_batch(rows, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+async def stream_parquet(query) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        async for rows in _row_chunks(query):
+            writer.write_table(pa.Table.from_batches([_record_batch(rows, schema)]))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_export(fmt: str, query) -> AsyncIterator:
+    if fmt == "csv":
+        return stream_csv(query)
+    _require_pyarrow()
+    return stream_arrow(query) if fmt == "arrow" else stream_parquet(query)
@@ -0,0 +1,87 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+from fastapi import Request
+
+# Respuestas más grandes se sirven igual (con ETag) pero no se guardan en memoria.
+MAX_CACHED_BODY_BYTES = 4 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    version: str
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+def make_etag(key: str, version: str) -> str:
+    return '"' + hashlib.sha1(f"{key}|{version}".encode()).hexdigest()[:20] + '"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """True si el cliente ya tiene esta versión (If-None-Match, con o sin prefijo W/)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+def cache_key(request: Request) -> str:
+    """Ruta + query normalizada (el orden de los parámetros no cambia la clave)."""
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{params}"
+
+
+class ResponseCache:
+    """
+    Caché LRU en proceso de respuestas ya serializadas, indexado por clave de request.
+    Cada entrada recuerda la versión de los datos con que se generó: si la versión actual
+    es otra, no se usa. Las altas llaman a `invalidate()` para soltar la memoria enseguida.
+    """
+
+    def __init__(self, max_entries: int = 256, max_body_bytes: int = MAX_CACHED_BODY_BYTES) -> None:
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, version: str, body: bytes, headers: Optional[dict[str, str]] = None) -> None:
+        if len(body) > self.max_body_bytes:
+            return
+        with self._lock:
+            self._entries[key] = CachedResponse(version=version, body=body, headers=headers or {})
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    async def capture(self, key: str, version: str, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Reenvía un streaming y, si terminó completo y no excede el tope, lo guarda."""
+        parts: Optional[list[bytes]] = []
+        size = 0
+        async for chunk in chunks:
+            if parts is not None:
+                encoded = chunk.encode()
+                size += len(encoded)
+                if size <= self.max_body_bytes:
+                    parts.append(encoded)
+                else:
+                    parts = None
+            yield chunk
+        if parts is not None:
+            self.put(key, version, b"".join(parts))
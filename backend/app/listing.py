@@ -0,0 +1,98 @@
+import base64
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlmodel import select
+
+from app.db import async_session_factory
+from app.models import Trade
+from app.usd_rate import rate_for
+
+# Filas por chunk al serializar exportaciones grandes.
+STREAM_CHUNK_ROWS = 500
+
+
+def encode_cursor(trade: Trade) -> str:
+    raw = f"{trade.buy_timestamp.isoformat()}|{trade.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        ts, trade_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(trade_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor 'before' inválido") from None
+
+
+def trades_query(before: Optional[str] = None, wallet: Optional[str] = None):
+    """
+    Trades del más nuevo al más viejo, ordenados por (buy_timestamp, id) para que el cursor
+    sea estable con timestamps repetidos. Usa el índice ix_trade_buy_timestamp_id.
+    """
+    query = select(Trade).order_by(Trade.buy_timestamp.desc(), Trade.id.desc())
+    if wallet:
+        query = query.where(Trade.wallet == wallet)
+    if before:
+        ts, trade_id = decode_cursor(before)
+        query = query.where(
+            or_(Trade.buy_timestamp < ts, and_(Trade.buy_timestamp == ts, Trade.id < trade_id))
+        )
+    return query
+
+
+def _to_float(val) -> float:
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def to_usd(t: Trade) -> Trade:
+    # Si fiat_spent_usd está almacenando la tasa de USD en ARS, usamos fiat_spent / tasa;
+    # si no, la tasa histórica del día de la compra (tabla usd_rate, sin consultas en línea).
+    if t.fiat_spent_usd not in (None, 0):
+        usd_spent = _to_float(t.fiat_spent) / _to_float(t.fiat_spent_usd)
+    else:
+        usd_rate = rate_for(t.buy_timestamp.date())
+        usd_spent = _to_float(t.fiat_spent) / usd_rate if usd_rate else 0.0
+    price_usd = usd_spent / t.btc_bought if t.btc_bought else 0.0
+    return Trade(
+        id=t.id,
+        buy_timestamp=t.buy_timestamp,
+        fiat_spent=usd_spent,
+        fiat_spent_usd=usd_spent,
+        btc_bought=t.btc_bought,
+        price_fiat_per_btc=price_usd,
+        wallet=t.wallet,
+        transfer_timestamp=t.transfer_timestamp,
+        binance_order_id=t.binance_order_id,
+        binance_trade_id=t.binance_trade_id,
+        withdraw_id=t.withdraw_id,
+        transfer_tx_id=t.transfer_tx_id,
+    )
+
+
+async def stream_trades_json(query, usd: bool = False) -> AsyncIterator[str]:
+    """
+    Serializa el resultado como un array JSON en chunks, leyendo con un cursor del lado
+    del servidor (stream_scalars), así la memoria no crece con el historial.
+    Abre su propia sesión porque la del request se cierra antes de terminar el streaming.
+    """
+    async with async_session_factory() as session:
+        result = await session.stream_scalars(query.execution_options(yield_per=STREAM_CHUNK_ROWS))
+        yield "["
+        first = True
+        chunk: list[str] = []
+        async for t in result:
+            row = to_usd(t) if usd else t
+            chunk.append(row.model_dump_json())
+            if len(chunk) >= STREAM_CHUNK_ROWS:
+                yield ("" if first else ",") + ",".join(chunk)
+                first = False
+                chunk = []
+        if chunk:
+            yield ("" if first else ",") + ",".join(chunk)
+        yield "]"
@@ -1,17 +1,41 @@
-from datetime import datetime
-from typing import Annotated, List
+import asyncio
+from datetime import date, datetime
+from typing import Annotated, List, Literal
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import Session, select
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.binance_price import fetch_price
+from app.aggregates import apply_trades, get_history, get_summary, rebuild_summary, touch_summary
+from app.binance_price import PriceFeed, PriceQuote
+from app.bulk import insert_trades, read_trade_batches, update_transfers
 from app.config import get_settings
-from app.db import get_session, init_db
-from app.models import Metrics, Trade, TradeCreate
-from app.usd_rate import get_usd_rate
+from app.db import engine, get_async_session, init_db
+from app.events import event_bus
+from app.export import EXPORT_FORMATS, export_query, stream_export
+from app.http_cache import ResponseCache, cache_key, make_etag, not_modified
+from app.listing import encode_cursor, stream_trades_json, to_usd, trades_query
+from app.models import (
+    BulkResult,
+    HistoryPoint,
+    Metrics,
+    Trade,
+    TradeCreate,
+    TradeSummary,
+    TransferResult,
+    TransferUpdate,
+)
+from app.usd_rate import get_usd_rate, rate_service
 
 settings = get_settings()
+price_feed = PriceFeed(
+    settings.price_symbol,
+    base_url=settings.price_base_url,
+    refresh_seconds=settings.price_refresh_seconds,
+    stale_after_seconds=settings.price_stale_after_seconds,
+)
 
 app = FastAPI(title="DCA BTC Dashboard API", version="0.1.0")
 app.add_middleware(
@@ -20,103 +44,314 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+response_cache = ResponseCache()
+MAX_TRADE_EVENTS_PER_WRITE = 100
 
 
 @app.on_event("startup")
-def on_startup() -> None:
+async def on_startup() -> None:
     init_db()
+    event_bus.bind(asyncio.get_running_loop())
+    price_feed.on_change = _publish_price
+    price_feed.start()
+    rate_service.on_history_loaded = _rebuild_summary_quietly
+    rate_service.start()
 
 
-@app.get("/health")
-def health() -> dict:
-    return {"status": "ok", "time": datetime.utcnow()}
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await price_feed.aclose()
+    rate_service.stop()
+
+
+def _rebuild_summary_quietly() -> None:
+    # Con días nuevos en usd_rate, trades antes sin tasa pasan a tener conversión histórica.
+    with Session(engine) as session:
+        rebuild_summary(session)
+        session.commit()
 
 
-def _to_float(val) -> float:
-    try:
-        return float(val)
-    except (TypeError, ValueError):
-        return 0.0
+def _publish_price(previous: PriceQuote, quote: PriceQuote) -> None:
+    change_pct = (quote.price - previous.price) / previous.price * 100 if previous.price else None
+    event_bus.publish(
+        "metrics.price",
+        {
+            "symbol": price_feed.symbol,
+            "current_price": quote.price,
+            "previous_price": previous.price,
+            "change_pct": change_pct,
+            "price_updated_at": quote.updated_at,
+        },
+    )
+
+
+def _publish_trades(trades: list[Trade]) -> None:
+    # Un bulk grande (p.ej. sync_trades.py inicial) se anuncia como un solo evento.
+    if len(trades) > MAX_TRADE_EVENTS_PER_WRITE:
+        event_bus.publish("trades.imported", {"created": len(trades)})
+        return
+    for trade in trades:
+        event_bus.publish("trade.created", trade.model_dump(mode="json"))
+
+
+@app.get("/health")
+async def health() -> dict:
+    return {"status": "ok", "time": datetime.utcnow()}
 
 
 @app.post("/trades", response_model=Trade)
-def create_trade(trade: TradeCreate, session: Annotated[Session, Depends(get_session)]) -> Trade:
+async def create_trade(trade: TradeCreate, session: Annotated[AsyncSession, Depends(get_async_session)]) -> Trade:
     db_trade = Trade.from_orm(trade)
     session.add(db_trade)
-    session.commit()
-    session.refresh(db_trade)
+    await session.flush()
+    await session.run_sync(apply_trades, [db_trade])
+    await session.commit()
+    response_cache.invalidate()
+    await session.refresh(db_trade)
+    _publish_trades([db_trade])
     return db_trade
 
 
+@app.post("/trades/bulk", response_model=BulkResult)
+async def create_trades_bulk(
+    request: Request, session: Annotated[AsyncSession, Depends(get_async_session)]
+) -> BulkResult:
+    """
+    Alta masiva idempotente: array JSON o NDJSON (`application/x-ndjson`) en streaming.
+    Cada lote de hasta 1000 filas es un único INSERT multi-row que omite duplicados por
+    binance_trade_id / binance_order_id del bot. Todo el pedido es una sola transacción: un
+    elemento inválido en cualquier posición rechaza el pedido entero sin dejar lotes a medias.
+    """
+    inserted: list[Trade] = []
+    received = 0
+    async for batch in read_trade_batches(request):
+        received += len(batch)
+        inserted += await session.run_sync(_insert_batch, batch)
+    await session.commit()
+    if inserted:
+        response_cache.invalidate()
+        _publish_trades(inserted)
+    return BulkResult(created=len(inserted), skipped=received - len(inserted))
+
+
+def _insert_batch(session: Session, batch: list[TradeCreate]) -> list[Trade]:
+    # Corre vía AsyncSession.run_sync: código sync sobre la conexión async, sin threadpool.
+    inserted = insert_trades(session, batch)
+    apply_trades(session, inserted)
+    return inserted
+
+
+@app.patch("/trades/transfers", response_model=TransferResult)
+async def update_trade_transfers(
+    updates: List[TransferUpdate], session: Annotated[AsyncSession, Depends(get_async_session)]
+) -> TransferResult:
+    """
+    Vincula trades existentes (por binance_order_id) con el retiro que los llevó a la wallet:
+    un solo UPDATE en lote para todo el pedido en lugar de una corrección por fila.
+    """
+    updated = await session.run_sync(_update_transfers, updates)
+    if updated:
+        response_cache.invalidate()
+        event_bus.publish("trades.transfers", {"updated": updated})
+    return TransferResult(updated=updated)
+
+
+def _update_transfers(session: Session, updates: list[TransferUpdate]) -> int:
+    updated = update_transfers(session, updates)
+    if updated:
+        touch_summary(session)
+    session.commit()
+    return updated
+
+
+def _data_version(summary: TradeSummary) -> str:
+    # trade_summary se actualiza en la misma transacción que cada alta (y en cada rebuild),
+    # así que sirve de versión de los datos también entre varios workers.
+    updated_at = summary.updated_at.timestamp() if summary.updated_at else 0
+    return f"{summary.trades_count}:{updated_at}:{rate_service.version}"
+
+
+def _cached_response(request: Request, version: str) -> tuple[str, dict[str, str], Response | None]:
+    """
+    ETag de la respuesta para esta versión y, si se puede responder sin recalcular,
+    la respuesta: 304 si el cliente ya la tiene, o el cuerpo guardado en el caché.
+    """
+    key = cache_key(request)
+    etag = make_etag(key, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if not_modified(request, etag):
+        return key, headers, Response(status_code=304, headers=headers)
+    cached = response_cache.get(key, version)
+    if cached is not None:
+        body_headers = {**headers, **cached.headers}
+        return key, headers, Response(cached.body, media_type="application/json", headers=body_headers)
+    return key, headers, None
+
+
+def _json_array(items) -> bytes:
+    return ("[" + ",".join(t.model_dump_json() for t in items) + "]").encode()
+
+
 @app.get("/trades", response_model=List[Trade])
-def list_trades(
-    session: Annotated[Session, Depends(get_session)],
+async def list_trades(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_async_session)],
     currency: str | None = None,
-) -> List[Trade]:
-    trades = session.exec(select(Trade).order_by(Trade.buy_timestamp.desc())).all()
-    if currency and currency.upper() == "USD":
-        usd_rate = get_usd_rate() or 0.0
-        converted: list[Trade] = []
-        for t in trades:
-            # Si fiat_spent_usd está almacenando la tasa de USD en ARS, usamos fiat_spent / tasa.
-            if t.fiat_spent_usd not in (None, 0):
-                usd_spent = _to_float(t.fiat_spent) / _to_float(t.fiat_spent_usd)
-            else:
-                usd_spent = _to_float(t.fiat_spent) / usd_rate if usd_rate else 0.0
-            price_usd = usd_spent / t.btc_bought if t.btc_bought else 0.0
-            converted.append(
-                Trade(
-                    id=t.id,
-                    buy_timestamp=t.buy_timestamp,
-                    fiat_spent=usd_spent,
-                    fiat_spent_usd=usd_spent,
-                    btc_bought=t.btc_bought,
-                    price_fiat_per_btc=price_usd,
-                    wallet=t.wallet,
-                    transfer_timestamp=t.transfer_timestamp,
-                )
-            )
-        return converted
-    return trades
+    limit: Annotated[int | None, Query(ge=1, le=1000)] = None,
+    before: str | None = None,
+    wallet: str | None = None,
+):
+    """
+    Con `limit` devuelve una página y el cursor de la siguiente en `X-Next-Cursor`
+    (pasarlo como `before`). Sin `limit` devuelve todo el historial serializado en streaming.
+    Lleva ETag: con `If-None-Match` vigente responde 304, y si no hubo altas desde la última
+    vez sirve el cuerpo ya serializado desde memoria.
+    """
+    version = _data_version(await session.run_sync(get_summary))
+    key, headers, cached = _cached_response(request, version)
+    if cached is not None:
+        return cached
+
+    usd = bool(currency) and currency.upper() == "USD"
+    query = trades_query(before=before, wallet=wallet)
+
+    if limit is None:
+        stream = response_cache.capture(key, version, stream_trades_json(query, usd))
+        return StreamingResponse(stream, media_type="application/json", headers=headers)
+
+    page = (await session.exec(query.limit(limit + 1))).all()
+    extra: dict[str, str] = {}
+    if len(page) > limit:
+        page = page[:limit]
+        extra["X-Next-Cursor"] = encode_cursor(page[-1])
+    body = _json_array([to_usd(t) for t in page] if usd else page)
+    response_cache.put(key, version, body, extra)
+    return Response(body, media_type="application/json", headers={**headers, **extra})
 
 
 @app.get("/metrics", response_model=Metrics)
-def metrics(session: Annotated[Session, Depends(get_session)], currency: str | None = None) -> Metrics:
-    trades = session.exec(select(Trade)).all()
+async def metrics(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    currency: str | None = None,
+):
+    summary = await session.run_sync(get_summary)
+    quote = await price_feed.aget()
+    # Además de los trades, la respuesta cambia cuando el feed trae otro precio o vence.
+    stale = price_feed.is_stale(quote)
+    version = f"{_data_version(summary)}:{quote.fetched_at}:{stale}"
+    key, headers, cached = _cached_response(request, version)
+    if cached is not None:
+        return cached
+
     currency = (currency or "ARS").upper()
     usd_rate = get_usd_rate() if currency == "USD" else None
 
-    def _fiat(t: Trade) -> float:
-        if currency == "USD":
-            if t.fiat_spent_usd not in (None, 0):
-                return _to_float(t.fiat_spent) / _to_float(t.fiat_spent_usd)
-            if usd_rate:
-                return _to_float(t.fiat_spent) / usd_rate
-        return _to_float(t.fiat_spent)
-
-    total_fiat = sum(_fiat(t) for t in trades)
-    total_btc = sum(t.btc_bought for t in trades)
-    current_price = fetch_price(settings.price_symbol, base_url=settings.price_base_url) or 0.0
+    total_fiat = summary.total_fiat
+    if currency == "USD":
+        # total_fiat_usd ya usa la tasa de cada día; sólo lo que no tiene ninguna tasa
+        # (tabla usd_rate vacía) se convierte con la cotización actual.
+        unrated = summary.fiat_unrated / usd_rate if usd_rate else summary.fiat_unrated
+        total_fiat = summary.total_fiat_usd + unrated
+
+    total_btc = summary.total_btc
+    current_price = quote.price or 0.0
     if currency == "USD" and current_price > 0 and usd_rate:
         current_price = current_price / usd_rate
     current_value = total_btc * current_price
     pnl_abs = current_value - total_fiat
     pnl_pct = (pnl_abs / total_fiat * 100) if total_fiat else 0.0
-    return Metrics(
+    result = Metrics(
         total_fiat=total_fiat,
         total_btc=total_btc,
         current_price=current_price,
         current_value=current_value,
         pnl_abs=pnl_abs,
         pnl_pct=pnl_pct,
-        trades_count=len(trades),
+        trades_count=summary.trades_count,
+        price_updated_at=quote.updated_at,
+        price_stale=stale,
+    )
+    body = result.model_dump_json().encode()
+    response_cache.put(key, version, body)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/metrics/history", response_model=List[HistoryPoint])
+async def metrics_history(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    bucket: Literal["day", "week", "month"] = "day",
+    currency: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+):
+    """
+    BTC acumulado, costo promedio y PnL por período, desde los rollups diarios (trade_daily).
+    `start`/`end` recortan la serie sin cambiar los acumulados.
+    """
+    version = _data_version(await session.run_sync(get_summary))
+    key, headers, cached = _cached_response(request, version)
+    if cached is not None:
+        return cached
+
+    usd_rate = (get_usd_rate() or 0.0) if (currency or "").upper() == "USD" else None
+    points = await session.run_sync(get_history, bucket, usd_rate, start, end)
+    body = _json_array(points)
+    response_cache.put(key, version, body)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.post("/metrics/rebuild", response_model=TradeSummary)
+async def rebuild_metrics(session: Annotated[AsyncSession, Depends(get_async_session)]) -> TradeSummary:
+    """Recalcula los totales acumulados desde la tabla trade (p.ej. tras editar filas a mano)."""
+    summary = await session.run_sync(rebuild_summary)
+    await session.commit()
+    response_cache.invalidate()
+    await session.refresh(summary)
+    return summary
+
+
+@app.get("/events")
+async def events(request: Request, last_event_id: str | None = None) -> StreamingResponse:
+    """
+    Server-Sent Events: `trade.created` al confirmarse cada alta (o `trades.imported` para
+    bulks grandes) y `metrics.price` cuando cambia el precio del feed. Al reconectar, el
+    navegador manda `Last-Event-ID` y se reenvían los eventos perdidos; si ya no están en
+    el buffer llega `resync` y el cliente debe recargar /trades y /metrics.
+    """
+    last_id = request.headers.get("last-event-id") or last_event_id
+    return StreamingResponse(
+        event_bus.stream(last_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/trades/export")
+async def export_trades(
+    format: Literal["csv", "arrow", "parquet"] = "csv",
+    start: date | None = None,
+    end: date | None = None,
+    wallet: str | None = None,
+) -> StreamingResponse:
+    """
+    Historial completo (o filtrado por fechas inclusive / wallet) en CSV, Arrow IPC stream
+    o Parquet, generado por lotes desde un cursor del lado del servidor sin pasar por modelos.
+    """
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream_export(format, export_query(start=start, end=end, wallet=wallet)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="trades.{extension}"'},
     )
 
 
 @app.get("/trades/{trade_id}", response_model=Trade)
-def get_trade(trade_id: int, session: Annotated[Session, Depends(get_session)]) -> Trade:
-    trade = session.get(Trade, trade_id)
+async def get_trade(trade_id: int, session: Annotated[AsyncSession, Depends(get_async_session)]) -> Trade:
+    trade = await session.get(Trade, trade_id)
     if not trade:
         raise HTTPException(status_code=404, detail="Trade no encontrado")
     return trade
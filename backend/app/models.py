@@ -1,12 +1,27 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
+from sqlalchemy import BigInteger, Index, text
 from sqlmodel import Field, SQLModel
 
 
 class Trade(SQLModel, table=True):
+    __table_args__ = (
+        # Clave natural para inserts idempotentes: un fill de Binance, o una orden del bot.
+        Index("ux_trade_binance_trade_id", "binance_trade_id", unique=True),
+        Index(
+            "ux_trade_bot_order_id",
+            "binance_order_id",
+            unique=True,
+            sqlite_where=text("binance_trade_id IS NULL"),
+            postgresql_where=text("binance_trade_id IS NULL"),
+        ),
+        Index("ix_trade_buy_timestamp_id", "buy_timestamp", "id"),
+        Index("ix_trade_wallet", "wallet"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     buy_timestamp: datetime
     fiat_spent: float
@@ -15,6 +30,14 @@ class Trade(SQLModel, table=True):
     price_fiat_per_btc: float
     wallet: str
     transfer_timestamp: Optional[datetime] = None
+    # Ids de Binance para deduplicar: los trades del bot sólo traen la orden,
+    # los de sync_trades.py traen además el id de cada fill.
+    binance_order_id: Optional[int] = Field(default=None, sa_type=BigInteger)
+    binance_trade_id: Optional[int] = Field(default=None, sa_type=BigInteger)
+    # Retiro de Binance que llevó este BTC a la wallet (uno puede cubrir varios trades)
+    # y txId on-chain con el que se completó.
+    withdraw_id: Optional[str] = None
+    transfer_tx_id: Optional[str] = None
 
 
 class TradeCreate(SQLModel):
@@ -25,6 +48,76 @@ class TradeCreate(SQLModel):
     price_fiat_per_btc: float
     wallet: str
     transfer_timestamp: Optional[datetime] = None
+    binance_order_id: Optional[int] = None
+    binance_trade_id: Optional[int] = None
+    withdraw_id: Optional[str] = None
+    transfer_tx_id: Optional[str] = None
+
+
+class TransferUpdate(SQLModel):
+    """Retiro que cubre los trades de una orden; los campos en None no pisan lo guardado."""
+
+    binance_order_id: int
+    transfer_timestamp: Optional[datetime] = None
+    withdraw_id: Optional[str] = None
+    transfer_tx_id: Optional[str] = None
+
+
+class TradeSummary(SQLModel, table=True):
+    """
+    Totales acumulados de todos los trades (fila única id=1), actualizados en la misma
+    transacción que cada alta para que /metrics no tenga que recorrer la tabla trade.
+    """
+
+    __tablename__ = "trade_summary"
+
+    id: int = Field(default=1, primary_key=True)
+    trades_count: int = 0
+    total_btc: float = 0.0
+    total_fiat: float = 0.0
+    # USD de los trades con tasa guardada (fiat_spent / fiat_spent_usd)...
+    total_fiat_usd: float = 0.0
+    # ...y ARS de los que no la tienen, que se convierten al consultar.
+    fiat_unrated: float = 0.0
+    updated_at: Optional[datetime] = None
+
+
+class TradeDaily(SQLModel, table=True):
+    """
+    Rollup por día de compra, mantenido junto con trade_summary en cada alta.
+    Base de /metrics/history (semanas y meses se suman desde acá).
+    """
+
+    __tablename__ = "trade_daily"
+
+    day: date = Field(primary_key=True)
+    trades_count: int = 0
+    btc_bought: float = 0.0
+    fiat_spent: float = 0.0
+    fiat_spent_usd: float = 0.0
+    fiat_unrated: float = 0.0
+    # Precio y hora de la última compra del día: cierre con el que se valúa /metrics/history.
+    close_price: Optional[float] = None
+    close_at: Optional[datetime] = None
+
+
+class UsdRate(SQLModel, table=True):
+    """Cotización dólar blue (ARS por USD) de cada día, para convertir trades por su fecha."""
+
+    __tablename__ = "usd_rate"
+
+    day: date = Field(primary_key=True)
+    rate: float
+    source: str = "bluelytics"
+
+
+class BulkResult(SQLModel):
+    created: int
+    skipped: int
+
+
+class TransferResult(SQLModel):
+    updated: int
 
 
 class Metrics(SQLModel):
@@ -35,3 +128,19 @@ class Metrics(SQLModel):
     pnl_abs: float
     pnl_pct: float
     trades_count: int
+    price_updated_at: Optional[datetime] = None
+    price_stale: bool = False
+
+
+class HistoryPoint(SQLModel):
+    period_start: date
+    trades_count: int
+    btc_bought: float
+    fiat_spent: float
+    cumulative_btc: float
+    cumulative_fiat: float
+    avg_cost: float
+    mark_price: float
+    value: float
+    pnl_abs: float
+    pnl_pct: float
@@ -1,27 +1,188 @@
+import bisect
 import logging
-from functools import lru_cache
-from typing import Optional
+import threading
+import time
+from datetime import date, datetime, timezone
+from typing import Callable, Optional
 
 import requests
+from sqlmodel import Session, select
 
+from app.config import get_settings
+from app.db import engine
+from app.models import UsdRate
 
-@lru_cache(maxsize=1)
-def get_usd_rate() -> Optional[float]:
+LATEST_URL = "https://api.bluelytics.com.ar/v2/latest"
+EVOLUTION_URL = "https://api.bluelytics.com.ar/v2/evolution.json"
+
+
+class UsdRateService:
     """
-    Devuelve la cotización del dólar (blue) en ARS usando la API pública de Bluelytics.
-    Usa value_sell como referencia. Cachea la llamada para evitar repetirla en el mismo proceso.
+    Cotización del dólar blue (ARS por USD, `value_sell` de Bluelytics).
+
+    - La última cotización se refresca en un hilo de fondo cada `ttl_seconds`; si la
+      consulta falla se reintenta a los `negative_ttl_seconds` en vez de cachear el error.
+    - Cada cotización obtenida se guarda como la tasa del día en la tabla `usd_rate`, que
+      además se completa con el histórico de Bluelytics. `rate_for(día)` resuelve desde un
+      índice en memoria (el día exacto o el anterior más cercano) sin llamadas externas.
     """
-    url = "https://api.bluelytics.com.ar/v2/latest"
-    try:
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()
-        data = resp.json()
-        blue = data.get("blue") or {}
-        rate = float(blue.get("value_sell") or 0)
-        if rate <= 0:
+
+    def __init__(self, ttl_seconds: float = 15 * 60, negative_ttl_seconds: float = 60) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.session = requests.Session()
+        self._latest: Optional[float] = None
+        self._latest_at: Optional[float] = None
+        self._failed_at: Optional[float] = None
+        self._revision = 0
+        self._days: list[date] = []
+        self._rates: dict[date, float] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Se invoca tras guardar días nuevos del histórico (p.ej. para recalcular totales).
+        self.on_history_loaded: Optional[Callable[[], None]] = None
+
+    def start(self) -> None:
+        self.load_index()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="usd-rate", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        self._backfill_history()
+        while not self._stop.is_set():
+            ok = self.refresh() is not None
+            self._stop.wait(self.ttl_seconds if ok else self.negative_ttl_seconds)
+
+    def load_index(self) -> None:
+        with Session(engine) as session:
+            rows = session.exec(select(UsdRate.day, UsdRate.rate)).all()
+        with self._lock:
+            self._rates = {day: rate for day, rate in rows}
+            self._days = sorted(self._rates)
+            self._revision += 1
+
+    def _remember(self, rates: dict[date, float]) -> None:
+        with Session(engine) as session:
+            for day, rate in rates.items():
+                session.merge(UsdRate(day=day, rate=rate))
+            session.commit()
+        with self._lock:
+            changed = any(self._rates.get(day) != rate for day, rate in rates.items())
+            self._rates.update(rates)
+            self._days = sorted(self._rates)
+            if changed:
+                self._revision += 1
+
+    def refresh(self) -> Optional[float]:
+        """Consulta Bluelytics; varios llamadores simultáneos comparten una sola consulta."""
+        if not self._refresh_lock.acquire(blocking=False):
+            with self._refresh_lock:
+                return self._latest
+        try:
+            resp = self.session.get(LATEST_URL, timeout=5)
+            resp.raise_for_status()
+            blue = resp.json().get("blue") or {}
+            rate = float(blue.get("value_sell") or 0)
+            if rate <= 0:
+                raise ValueError(f"value_sell inválido: {blue.get('value_sell')!r}")
+            self._latest, self._latest_at, self._failed_at = rate, time.time(), None
+            self._remember({datetime.now(timezone.utc).date(): rate})
+            return rate
+        except Exception as exc:  # noqa: BLE001
+            logging.error("No se pudo obtener cotización USD (Bluelytics): %s", exc)
+            self._failed_at = time.time()
             return None
-        return rate
-    except Exception as exc:  # noqa: BLE001
-        logging.error("No se pudo obtener cotización USD (Bluelytics): %s", exc)
-        return None
+        finally:
+            self._refresh_lock.release()
+
+    def _backfill_history(self) -> None:
+        try:
+            resp = self.session.get(EVOLUTION_URL, timeout=30)
+            resp.raise_for_status()
+            rates = {}
+            for item in resp.json():
+                if item.get("source") != "Blue":
+                    continue
+                day = date.fromisoformat(item["date"][:10])
+                rate = float(item.get("value_sell") or 0)
+                if rate > 0 and day not in self._rates:
+                    rates[day] = rate
+        except Exception as exc:  # noqa: BLE001
+            logging.warning("No se pudo descargar el histórico de cotizaciones (Bluelytics): %s", exc)
+            return
+        if not rates:
+            return
+        try:
+            self._remember(rates)
+            logging.info("Histórico USD: %d días nuevos guardados", len(rates))
+            if self.on_history_loaded:
+                self.on_history_loaded()
+        except Exception as exc:  # noqa: BLE001
+            # Un error de base no puede matar el hilo antes de que empiece a refrescar.
+            logging.warning("No se pudo guardar el histórico de cotizaciones: %s", exc)
 
+    @property
+    def version(self) -> str:
+        """Cambia cuando cambia la última cotización o alguna tasa diaria (para ETags)."""
+        return f"{self._latest}:{self._revision}"
+
+    def _expired(self, at: Optional[float], ttl: float) -> bool:
+        return at is None or time.time() - at > ttl
+
+    def latest(self) -> Optional[float]:
+        """
+        Última cotización conocida. Con el hilo de fondo corriendo nunca consulta en línea;
+        sin él (scripts) refresca si venció el TTL y no hubo un fallo en los últimos
+        `negative_ttl_seconds`. Si no hay cotización, usa la última tasa diaria guardada.
+        """
+        background = self._thread is not None and self._thread.is_alive()
+        if (
+            not background
+            and self._expired(self._latest_at, self.ttl_seconds)
+            and self._expired(self._failed_at, self.negative_ttl_seconds)
+        ):
+            self.refresh()
+        if self._latest is not None:
+            return self._latest
+        with self._lock:
+            return self._rates[self._days[-1]] if self._days else None
+
+    def rate_for(self, day: date) -> Optional[float]:
+        """Tasa de ese día, o la del día anterior más cercano con dato (None si no hay ninguno)."""
+        with self._lock:
+            if not self._days:
+                return None
+            exact = self._rates.get(day)
+            if exact is not None:
+                return exact
+            idx = bisect.bisect_right(self._days, day) - 1
+            if idx < 0:
+                return None
+            return self._rates[self._days[idx]]
+
+
+settings = get_settings()
+rate_service = UsdRateService(
+    ttl_seconds=settings.usd_rate_ttl_seconds,
+    negative_ttl_seconds=settings.usd_rate_negative_ttl_seconds,
+)
+
+
+def rate_for(day: date) -> Optional[float]:
+    return rate_service.rate_for(day)
+
+
+def get_usd_rate() -> Optional[float]:
+    """
+    Devuelve la cotización del dólar (blue) en ARS usando la API pública de Bluelytics.
+    Usa value_sell como referencia. Sale del caché de `rate_service`, no de una consulta por llamada.
+    """
+    return rate_service.latest()
@@ -27,6 +27,31 @@ type Metrics = {
   trades_count: number;
 };
 
+// Recalcula valor y PnL con el precio del evento `metrics.price` (en la moneda del feed).
+// En USD se aplica la variación relativa, porque las métricas ya vienen convertidas.
+const applyPrice = (
+  metrics: Metrics,
+  feedPrice: number,
+  previousFeedPrice: number,
+  currency: "ARS" | "USD"
+): Metrics | null => {
+  if (!feedPrice) return null;
+  let currentPrice = feedPrice;
+  if (currency === "USD") {
+    if (!previousFeedPrice || !metrics.current_price) return null;
+    currentPrice = metrics.current_price * (feedPrice / previousFeedPrice);
+  }
+  const currentValue = metrics.total_btc * currentPrice;
+  const pnlAbs = currentValue - metrics.total_fiat;
+  return {
+    ...metrics,
+    current_price: currentPrice,
+    current_value: currentValue,
+    pnl_abs: pnlAbs,
+    pnl_pct: metrics.total_fiat ? (pnlAbs / metrics.total_fiat) * 100 : 0,
+  };
+};
+
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE_URL || "http://localhost:8000";
 const MANUAL_WITHDRAW_ADDRESS = "0x8ba1f109551bD432803012645Ac136ddd64DBA72";
 
@@ -107,9 +132,31 @@ export default function Dashboard() {
 
   useEffect(() => {
     fetchData();
-    const interval = setInterval(fetchData, 15000);
-    return () => clearInterval(interval);
-  }, [fetchData]);
+    if (typeof EventSource === "undefined") {
+      const interval = setInterval(fetchData, 15000);
+      return () => clearInterval(interval);
+    }
+    // El backend avisa por SSE cada compra, retiro y cambio de precio; el navegador
+    // reconecta solo (con Last-Event-ID) y los GET responden 304 si nada cambió.
+    const events = new EventSource(`${API_BASE}/events`);
+    const onChange = () => fetchData();
+    ["trade.created", "trades.imported", "trades.transfers", "resync"].forEach((name) =>
+      events.addEventListener(name, onChange)
+    );
+    // El precio llega cada pocos segundos: se aplica sobre las métricas ya cargadas sin
+    // volver a pedir /trades ni /metrics.
+    events.addEventListener("metrics.price", (event) => {
+      const current = metricsRef.current;
+      if (!current) return;
+      const payload = JSON.parse((event as MessageEvent).data);
+      const next = applyPrice(current, payload.current_price, payload.previous_price, currency);
+      if (next && !isSameMetrics(current, next)) {
+        metricsRef.current = next;
+        setMetrics(next);
+      }
+    });
+    return () => events.close();
+  }, [fetchData, currency]);
 
   useEffect(() => {
     setMounted(true);
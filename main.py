@@ -1,10 +1,18 @@
 import logging
+from pathlib import Path
 
 from src.balance_monitor import BalanceMonitor
 from src.binance_client import AssetBalance, BinanceClient
 from src.config import load_config
+from src.execution import ExecutionPlanner
+from src.order_journal import OrderJournal
+from src.routing import Route, Router
+from src.state_store import JsonStateStore
 from src.telemetry import TradeReporter
 from src.trading import AutoSwapper
+from src.twap import SliceScheduler
+from src.user_stream import UserDataStream
+from src.withdraw_reconciler import WithdrawReconciler
 from src.withdrawer import AutoWithdrawer
 
 
@@ -19,6 +27,7 @@ def main() -> None:
         api_key=config.api_key,
         api_secret=config.api_secret,
         base_url=config.base_url,
+        state_dir=config.state_dir,
     )
     withdrawer = AutoWithdrawer(
         client=client,
@@ -26,8 +35,37 @@ def main() -> None:
         address=config.withdraw_address,
         network=config.withdraw_network,
         min_amount=config.withdraw_min_amount,
+        batch_fee_ratio=config.withdraw_batch_fee_ratio,
+        batch_max_hold_seconds=config.withdraw_batch_max_hold_seconds,
     )
-    reporter = TradeReporter(base_url=config.backend_api_base)
+    reporter = TradeReporter(
+        base_url=config.backend_api_base,
+        spool_path=Path(config.state_dir) / "trade_reports.jsonl",
+    )
+
+    journal = OrderJournal(Path(config.state_dir) / "orders.sqlite3")
+    scheduler = None
+    if config.twap_threshold > 0:
+        scheduler = SliceScheduler(
+            store=JsonStateStore(Path(config.state_dir) / "twap.json"),
+            threshold_quote=config.twap_threshold,
+            slices=config.twap_slices,
+            window_seconds=config.twap_window_seconds,
+        )
+
+    router = None
+    if config.route_via:
+        # Ruta directa (ej. BTCARS) contra un tramo por cada activo intermedio (ARS → USDT → BTC).
+        base_asset = config.trade_symbol[: -len(config.target_asset)]
+        routes = [Route((config.trade_symbol,))] + [
+            Route((f"{via}{config.target_asset}", f"{base_asset}{via}")) for via in config.route_via
+        ]
+        router = Router(
+            client,
+            routes,
+            fee_bps=config.trading_fee_bps,
+            max_slippage_bps=config.max_slippage_bps,
+        )
 
     swapper = AutoSwapper(
         client=client,
@@ -38,7 +76,25 @@ def main() -> None:
         withdraw_coin=config.withdraw_coin,
         reporter=reporter,
         wallet=config.withdraw_address or "",
+        journal=journal,
+        planner=ExecutionPlanner(
+            market_slippage_bps=config.market_slippage_bps,
+            max_slippage_bps=config.max_slippage_bps,
+        ),
+        scheduler=scheduler,
+        router=router,
+    )
+    # Completa compras que quedaron a medias en una corrida anterior antes de mirar saldos.
+    swapper.recover()
+    reconciler = WithdrawReconciler(
+        client=client,
+        journal=journal,
+        reporter=reporter,
+        store=JsonStateStore(Path(config.state_dir) / "withdrawals.json"),
+        coin=config.withdraw_coin,
+        interval_seconds=config.withdraw_reconcile_seconds,
     )
+    reconciler.start()
 
     def handle_balance(balance: AssetBalance) -> None:
         logging.info(
@@ -55,8 +111,14 @@ def main() -> None:
         asset=config.target_asset,
         poll_interval_seconds=config.poll_interval_seconds,
         on_result=handle_balance,
+        stream=UserDataStream(client, ws_url=config.ws_url) if config.balance_source == "stream" else None,
+        next_check=scheduler.next_due if scheduler else None,
     )
     monitor.run_forever()
+    swapper.close()
+    reconciler.stop()
+    reporter.close()
+    journal.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from src.binance_client import (
+    DAY_MS,
+    MY_TRADES_PAGE_LIMIT,
+    WITHDRAW_HISTORY_PAGE_LIMIT,
+    WITHDRAW_HISTORY_WINDOW_MS,
+    AssetBalance,
+    BinanceClientBase,
+    _response_json,
+)
+from src.rate_limiter import RequestGovernor, retry_after_seconds
+from src.retry import RetryPolicy, binance_error_code
+from src.symbol_cache import SymbolCache, SymbolFilters
+
+
+class AsyncBinanceClient(BinanceClientBase):
+    """
+    Versión asyncio de BinanceClient con la misma superficie de métodos.
+
+    Usa un único httpx.AsyncClient (conexiones keep-alive reutilizadas) y un semáforo
+    que acota cuántas llamadas hay en vuelo a la vez. Comparte governor y cache de
+    exchangeInfo con el cliente sincrónico del mismo base_url/state_dir.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        base_url: str = "https://api.binance.com",
+        recv_window: int = 5000,
+        governor: Optional[RequestGovernor] = None,
+        state_dir: Optional[str] = None,
+        exchange_info_ttl_seconds: float = 6 * 3600,
+        max_concurrency: int = 8,
+        timeout_seconds: float = 10,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
+        super().__init__(api_key, api_secret, base_url, recv_window, governor, state_dir, retry_policy)
+        self.http = httpx.AsyncClient(
+            headers={"X-MBX-APIKEY": self.api_key},
+            timeout=timeout_seconds,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+        self.symbol_cache = SymbolCache(None, path=self._symbol_cache_path(), ttl_seconds=exchange_info_ttl_seconds)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self) -> "AsyncBinanceClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        url: str,
+        params: Optional[dict] = None,
+        signed_params: Optional[dict] = None,
+    ) -> dict:
+        delay = self.governor.reserve(method, path, params if signed_params is None else signed_params)
+        if delay > 0:
+            logging.info("Limitando llamadas a Binance: se espera %.2fs antes de %s %s", delay, method, path)
+            await asyncio.sleep(delay)
+
+        async with self._semaphore:
+            response = await self.http.request(method, url, params=params)
+        self.governor.observe(response.headers)
+        if response.status_code in (418, 429):
+            self.governor.penalize(retry_after_seconds(response.headers))
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            raise httpx.HTTPStatusError(
+                f"{exc} | body={response.text}",
+                request=exc.request,
+                response=response,
+            ) from None
+        return response.json()
+
+    async def _request(self, method: str, path: str, params: Optional[dict], signed: bool) -> dict:
+        attempt = 0
+        while True:
+            query = params.copy() if params else {}
+            try:
+                if not signed:
+                    return await self._send(method, path, f"{self.base_url}{path}", params=query)
+                if self._time_sync_due():
+                    await self._sync_time_quietly()
+                return await self._send(method, path, self._signed_url(path, query), signed_params=query)
+            except httpx.HTTPStatusError as exc:
+                delay = self._retry_delay(
+                    method,
+                    path,
+                    attempt,
+                    exc,
+                    status_code=exc.response.status_code,
+                    error_code=binance_error_code(_response_json(exc.response)),
+                )
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as exc:
+                delay = self._retry_delay(method, path, attempt, exc, connect_failed=True)
+            except httpx.TransportError as exc:
+                delay = self._retry_delay(method, path, attempt, exc, timeout=True)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _public_request(self, method: str, path: str, params: Optional[dict] = None) -> dict:
+        return await self._request(method, path, params, signed=False)
+
+    async def _signed_request(self, method: str, path: str, params: Optional[dict] = None) -> dict:
+        return await self._request(method, path, params, signed=True)
+
+    async def sync_time(self) -> int:
+        sent_at = time.time()
+        payload = await self._public_request("GET", "/api/v3/time")
+        self._apply_server_time(int(payload["serverTime"]), sent_at, time.time())
+        return self.time_offset_ms
+
+    async def _sync_time_quietly(self) -> None:
+        try:
+            await self.sync_time()
+        except Exception as exc:  # noqa: BLE001
+            self._time_sync_failed(exc)
+
+    async def get_asset_balance(self, asset: str) -> AssetBalance:
+        payload = await self._signed_request("GET", "/api/v3/account")
+        return self._parse_asset_balance(payload, asset)
+
+    async def get_symbol_info(self, symbol: str) -> dict:
+        payload = await self._public_request("GET", "/api/v3/exchangeInfo", params={"symbol": symbol})
+        return self._first_symbol(payload, symbol)
+
+    async def get_symbol_filters(self, symbol: str) -> SymbolFilters:
+        cached = self.symbol_cache.peek(symbol)
+        if cached is not None and not cached[1]:
+            return cached[0]
+        try:
+            return self.symbol_cache.store(symbol, await self.get_symbol_info(symbol))
+        except Exception as exc:  # noqa: BLE001
+            if cached is None:
+                raise
+            logging.warning("No se pudo refrescar exchangeInfo de %s; se usa la copia en cache: %s", symbol, exc)
+            return cached[0]
+
+    async def get_symbol_min_notional(self, symbol: str) -> float:
+        return (await self.get_symbol_filters(symbol)).min_notional
+
+    async def withdraw(
+        self,
+        coin: str,
+        address: str,
+        amount: float,
+        network: Optional[str] = None,
+        address_tag: Optional[str] = None,
+        withdraw_order_id: Optional[str] = None,
+    ) -> dict:
+        params = self._withdraw_params(coin, address, amount, network, address_tag, withdraw_order_id)
+        return await self._signed_request("POST", "/sapi/v1/capital/withdraw/apply", params)
+
+    async def get_withdraw_history(
+        self,
+        coin: Optional[str] = None,
+        withdraw_order_id: Optional[str] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        params = self._withdraw_history_params(coin, withdraw_order_id, start_time, end_time, offset, limit)
+        return await self._signed_request("GET", "/sapi/v1/capital/withdraw/history", params)
+
+    async def iter_withdraw_history(
+        self,
+        coin: str,
+        start_time: int,
+        end_time: Optional[int] = None,
+        limit: int = WITHDRAW_HISTORY_PAGE_LIMIT,
+    ) -> AsyncIterator[list[dict]]:
+        """Igual que BinanceClient.iter_withdraw_history, como generador asíncrono."""
+        window_start = int(start_time)
+        stop = int(end_time) if end_time else int(time.time() * 1000) + self.time_offset_ms
+        while window_start <= stop:
+            window_end = min(window_start + WITHDRAW_HISTORY_WINDOW_MS - 1, stop)
+            offset = 0
+            while True:
+                page = await self.get_withdraw_history(
+                    coin=coin, start_time=window_start, end_time=window_end, offset=offset, limit=limit
+                )
+                if page:
+                    yield page
+                if len(page) < limit:
+                    break
+                offset += len(page)
+            window_start = window_end + 1
+
+    async def get_coin_config(self) -> list[dict]:
+        return await self._signed_request("GET", "/sapi/v1/capital/config/getall")
+
+    async def place_market_order(
+        self,
+        symbol: str,
+        side: str,
+        quantity: Optional[float] = None,
+        quote_order_qty: Optional[float] = None,
+        new_order_resp_type: str = "FULL",
+        new_client_order_id: Optional[str] = None,
+    ) -> dict:
+        params = self._market_order_params(
+            symbol, side, quantity, quote_order_qty, new_order_resp_type, new_client_order_id
+        )
+        return await self._signed_request("POST", "/api/v3/order", params)
+
+    async def place_limit_order(
+        self,
+        symbol: str,
+        side: str,
+        quantity: float,
+        price: float,
+        time_in_force: str = "IOC",
+        new_order_resp_type: str = "FULL",
+        new_client_order_id: Optional[str] = None,
+    ) -> dict:
+        params = self._limit_order_params(
+            symbol, side, quantity, price, time_in_force, new_order_resp_type, new_client_order_id
+        )
+        return await self._signed_request("POST", "/api/v3/order", params)
+
+    async def get_order_book(self, symbol: str, limit: int = 100) -> dict:
+        return await self._public_request("GET", "/api/v3/depth", params={"symbol": symbol, "limit": limit})
+
+    async def get_order(
+        self, symbol: str, order_id: Optional[int] = None, orig_client_order_id: Optional[str] = None
+    ) -> dict:
+        params = self._order_query_params(symbol, order_id, orig_client_order_id)
+        return await self._signed_request("GET", "/api/v3/order", params)
+
+    async def iter_my_trades(
+        self,
+        symbol: str,
+        from_id: Optional[int] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: int = MY_TRADES_PAGE_LIMIT,
+    ) -> AsyncIterator[list[dict]]:
+        """Igual que BinanceClient.iter_my_trades, como generador asíncrono."""
+        if from_id is None and start_time is not None:
+            window_start = int(start_time)
+            stop = int(end_time) if end_time else int(time.time() * 1000) + self.time_offset_ms
+            while from_id is None:
+                if window_start > stop:
+                    return
+                window_end = min(window_start + DAY_MS - 1, stop)
+                params = self._my_trades_params(symbol, window_start, window_end, limit=limit)
+                page = await self._signed_request("GET", "/api/v3/myTrades", params)
+                if page:
+                    from_id = int(page[0]["id"])
+                window_start = window_end + 1
+
+        from_id = from_id or 0
+        while True:
+            params = self._my_trades_params(symbol, from_id=from_id, limit=limit)
+            page = await self._signed_request("GET", "/api/v3/myTrades", params)
+            page, reached_end = self._trim_page(page, end_time)
+            if page:
+                yield page
+            if reached_end or len(page) < limit:
+                return
+            from_id = int(page[-1]["id"]) + 1
+
+    async def get_my_trades(
+        self, symbol: str, start_time: Optional[int] = None, end_time: Optional[int] = None
+    ) -> list[dict]:
+        return [
+            t
+            async for page in self.iter_my_trades(symbol, start_time=start_time, end_time=end_time)
+            for t in page
+        ]
@@ -1,8 +1,9 @@
 import logging
 import time
-from typing import Callable
+from typing import Callable, Optional
 
 from src.binance_client import AssetBalance, BinanceClient
+from src.user_stream import UserDataStream, balance_from_event
 
 
 class BalanceMonitor:
@@ -12,13 +13,61 @@ class BalanceMonitor:
         asset: str,
         poll_interval_seconds: float = 10,
         on_result: Callable[[AssetBalance], None] | None = None,
+        stream: UserDataStream | None = None,
+        resync_interval_seconds: float = 300,
+        max_reconnect_delay_seconds: float = 60,
+        next_check: Callable[[], Optional[float]] | None = None,
     ) -> None:
         self.client = client
         self.asset = asset
         self.poll_interval_seconds = poll_interval_seconds
         self.on_result = on_result
+        self.stream = stream
+        self.resync_interval_seconds = resync_interval_seconds
+        self.max_reconnect_delay_seconds = max_reconnect_delay_seconds
+        # Epoch en que alguien necesita ver el balance aunque no haya eventos (p.ej. la próxima hija TWAP).
+        self.next_check = next_check
+        self._last_emitted: tuple[float, float] | None = None
+        self._last_resync = 0.0
 
     def run_forever(self) -> None:
+        if self.stream:
+            self._run_streaming()
+        else:
+            self._run_polling()
+
+    def _emit(self, balance: AssetBalance) -> None:
+        self._last_emitted = (balance.free, balance.locked)
+        if self.on_result:
+            self.on_result(balance)
+        else:
+            logging.info(
+                "Balance %s -> libre: %.8f | bloqueado: %.8f | total: %.8f",
+                balance.asset,
+                balance.free,
+                balance.locked,
+                balance.total,
+            )
+
+    def _poll_once(self) -> None:
+        try:
+            balance = self.client.get_asset_balance(self.asset)
+            self._last_resync = time.monotonic()
+            self._emit(balance)
+        except KeyboardInterrupt:
+            raise
+        except Exception as exc:
+            logging.error("Error en el ciclo de monitoreo: %s", exc)
+
+    def _next_poll_delay(self) -> float:
+        # Nunca sondea más rápido de lo que permite el presupuesto de peso compartido.
+        governor = self.client.governor
+        safe = governor.safe_poll_interval(governor.cost("GET", "/api/v3/account"))
+        if safe > self.poll_interval_seconds:
+            logging.info("Presupuesto de peso bajo; próximo sondeo en %.1fs", safe)
+        return max(self.poll_interval_seconds, safe)
+
+    def _run_polling(self) -> None:
         logging.info(
             "Iniciando monitoreo de balance para %s cada %.1f segundos",
             self.asset,
@@ -26,20 +75,65 @@ class BalanceMonitor:
         )
         while True:
             try:
-                balance = self.client.get_asset_balance(self.asset)
-                if self.on_result:
-                    self.on_result(balance)
-                else:
-                    logging.info(
-                        "Balance %s -> libre: %.8f | bloqueado: %.8f | total: %.8f",
-                        balance.asset,
-                        balance.free,
-                        balance.locked,
-                        balance.total,
-                    )
+                self._poll_once()
+                time.sleep(self._next_poll_delay())
+            except KeyboardInterrupt:
+                logging.info("Monitoreo detenido por el usuario.")
+                break
+
+    def _handle_event(self, event: dict) -> None:
+        balance = balance_from_event(event, self.asset)
+        if balance is not None:
+            # outboundAccountPosition puede repetirse sin cambios para nuestro activo.
+            if (balance.free, balance.locked) != self._last_emitted:
+                try:
+                    self._emit(balance)
+                except KeyboardInterrupt:
+                    raise
+                except Exception as exc:
+                    # Un error del callback no debe cerrar el websocket ni el listenKey.
+                    logging.error("Error en el ciclo de monitoreo: %s", exc)
+            return
+        if event.get("e") == "balanceUpdate" and event.get("a") == self.asset:
+            # balanceUpdate sólo trae el delta; se pide la foto completa por REST.
+            self._poll_once()
+
+    def _resync_if_due(self) -> None:
+        # Reenvía el balance periódicamente por si un intento anterior de orden falló.
+        due = self.next_check() if self.next_check else None
+        if time.monotonic() - self._last_resync >= self.resync_interval_seconds or (due and time.time() >= due):
+            self._poll_once()
+
+    def _run_streaming(self) -> None:
+        logging.info("Iniciando monitoreo de balance para %s vía user-data stream", self.asset)
+        reconnect_delay = self.poll_interval_seconds
+        while True:
+            connected_at = time.monotonic()
+            try:
+                self.stream.run(
+                    on_event=self._handle_event,
+                    on_connected=self._poll_once,
+                    on_idle=self._resync_if_due,
+                )
             except KeyboardInterrupt:
                 logging.info("Monitoreo detenido por el usuario.")
                 break
             except Exception as exc:
-                logging.error("Error en el ciclo de monitoreo: %s", exc)
-            time.sleep(self.poll_interval_seconds)
+                logging.warning("User-data stream caído (%s); se usa REST hasta reconectar.", exc)
+
+            if time.monotonic() - connected_at > self.max_reconnect_delay_seconds:
+                reconnect_delay = self.poll_interval_seconds
+            try:
+                self._poll_until(time.monotonic() + reconnect_delay)
+            except KeyboardInterrupt:
+                logging.info("Monitoreo detenido por el usuario.")
+                break
+            reconnect_delay = min(reconnect_delay * 2, self.max_reconnect_delay_seconds)
+
+    def _poll_until(self, deadline: float) -> None:
+        while True:
+            self._poll_once()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(self.poll_interval_seconds, remaining))
@@ -1,13 +1,38 @@
 import hashlib
 import hmac
+import logging
 import time
 from dataclasses import dataclass
-from typing import Optional
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator, Optional
 from urllib.parse import urlencode
 
 import requests
 from requests import HTTPError
 
+from src.rate_limiter import RequestGovernor, get_governor, retry_after_seconds
+from src.retry import TIMESTAMP_ERROR_CODES, RetryPolicy, binance_error_code, is_retryable
+from src.symbol_cache import SymbolCache, SymbolFilters
+
+
+# Máximo de trades por llamada a /api/v3/myTrades y ventana máxima con startTime/endTime.
+MY_TRADES_PAGE_LIMIT = 1000
+DAY_MS = 24 * 60 * 60 * 1000
+# /sapi/v1/capital/withdraw/history admite ventanas de hasta 90 días y 1000 filas por página.
+WITHDRAW_HISTORY_WINDOW_MS = 90 * DAY_MS
+WITHDRAW_HISTORY_PAGE_LIMIT = 1000
+# GET /api/v3/order: la orden no existe.
+ORDER_NOT_FOUND_CODE = -2013
+
+
+def _decimal_str(value: float) -> str:
+    """
+    Número en notación decimal con los dígitos justos: 0.00012 y no '1.2e-04' (str) ni
+    '0.000120' (format "f"), así coincide con la precisión del step/tick del filtro.
+    """
+    return format(Decimal(str(value)).normalize(), "f")
+
 
 @dataclass
 class AssetBalance:
@@ -20,153 +45,526 @@ class AssetBalance:
         return self.free + self.locked
 
 
-class BinanceClient:
+def _to_float(value: Optional[str]) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _response_json(response) -> Optional[dict]:
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def http_error_code(exc: HTTPError) -> Optional[int]:
+    """Código de error de Binance (`code` del cuerpo) de una respuesta HTTP fallida."""
+    return binance_error_code(_response_json(exc.response)) if exc.response is not None else None
+
+
+class BinanceClientBase:
+    """
+    Estado, firma y armado de parámetros comunes a BinanceClient y AsyncBinanceClient.
+    Las subclases sólo aportan el transporte HTTP.
+    """
+
     def __init__(
         self,
         api_key: str,
         api_secret: str,
         base_url: str = "https://api.binance.com",
         recv_window: int = 5000,
+        governor: Optional[RequestGovernor] = None,
+        state_dir: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        time_sync_interval_seconds: float = 30 * 60,
     ) -> None:
         self.api_key = api_key
         self.api_secret = api_secret.encode()
         self.base_url = base_url.rstrip("/")
         self.recv_window = recv_window
-        self.session = requests.Session()
-        self.session.headers.update({"X-MBX-APIKEY": self.api_key})
+        self.governor = governor or get_governor(self.base_url)
+        self.state_dir = Path(state_dir) if state_dir else None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.time_sync_interval_seconds = time_sync_interval_seconds
+        # Diferencia (ms) entre el reloj de Binance y el local; se suma al timestamp firmado.
+        self.time_offset_ms = 0
+        self._next_time_sync = 0.0
 
     def _sign(self, query_string: str) -> str:
         return hmac.new(self.api_secret, query_string.encode(), hashlib.sha256).hexdigest()
 
-    def _public_request(self, method: str, path: str, params: Optional[dict] = None) -> dict:
-        url = f"{self.base_url}{path}"
-        response = self.session.request(method, url, params=params or {}, timeout=10)
-        try:
-            response.raise_for_status()
-        except HTTPError as exc:
-            raise HTTPError(
-                f"{exc} | body={response.text}",
-                response=response,
-                request=exc.request,
-            ) from None
-        return response.json()
+    def _time_sync_due(self) -> bool:
+        return time.monotonic() >= self._next_time_sync
 
-    def _signed_request(self, method: str, path: str, params: Optional[dict] = None) -> dict:
-        params = params.copy() if params else {}
-        params["timestamp"] = int(time.time() * 1000)
+    def _apply_server_time(self, server_time_ms: int, sent_at: float, received_at: float) -> None:
+        # Se asume que el servidor estampó la hora a mitad del round-trip.
+        self.time_offset_ms = int(server_time_ms - (sent_at + received_at) / 2 * 1000)
+        self._next_time_sync = time.monotonic() + self.time_sync_interval_seconds
+        if abs(self.time_offset_ms) > 1000:
+            logging.warning("Reloj local desfasado %d ms respecto de Binance; se corrige en las firmas", self.time_offset_ms)
+
+    def _time_sync_failed(self, exc: Exception) -> None:
+        logging.warning("No se pudo sincronizar la hora con Binance: %s", exc)
+        self._next_time_sync = time.monotonic() + 60
+
+    def _retry_delay(self, method: str, path: str, attempt: int, error: Exception, **classification) -> float:
+        """
+        Devuelve cuánto esperar antes del próximo intento o relanza `error` si no es seguro repetir.
+        """
+        if classification.get("error_code") in TIMESTAMP_ERROR_CODES:
+            self._next_time_sync = 0.0
+        if attempt + 1 >= self.retry_policy.max_attempts or not is_retryable(method, **classification):
+            raise error
+        delay = self.retry_policy.backoff(attempt)
+        logging.warning(
+            "Falla transitoria en %s %s (%s); reintento %d en %.2fs",
+            method,
+            path,
+            error,
+            attempt + 1,
+            delay,
+        )
+        return delay
+
+    def _signed_url(self, path: str, params: dict) -> str:
+        params["timestamp"] = int(time.time() * 1000) + self.time_offset_ms
         params.setdefault("recvWindow", self.recv_window)
 
         query_string = urlencode(params, doseq=True)
         signature = self._sign(query_string)
-        url = f"{self.base_url}{path}?{query_string}&signature={signature}"
+        return f"{self.base_url}{path}?{query_string}&signature={signature}"
 
-        response = self.session.request(method, url, timeout=10)
-        try:
-            response.raise_for_status()
-        except HTTPError as exc:
-            # Adjunta cuerpo de error para depurar (p.ej. api-key inválida, timestamp, permisos).
-            raise HTTPError(
-                f"{exc} | body={response.text}",
-                response=response,
-                request=exc.request,
-            ) from None
-        return response.json()
+    def _symbol_cache_path(self) -> Optional[Path]:
+        return self.state_dir / "exchange_info.json" if self.state_dir else None
 
-    def get_asset_balance(self, asset: str) -> AssetBalance:
-        payload = self._signed_request("GET", "/api/v3/account")
+    @staticmethod
+    def _parse_asset_balance(payload: dict, asset: str) -> AssetBalance:
         balances = payload.get("balances", [])
         match = next((b for b in balances if b.get("asset") == asset), None)
 
         if not match:
             return AssetBalance(asset=asset, free=0.0, locked=0.0)
 
-        def _to_float(value: Optional[str]) -> float:
-            try:
-                return float(value)
-            except (TypeError, ValueError):
-                return 0.0
-
         return AssetBalance(
             asset=asset,
             free=_to_float(match.get("free")),
             locked=_to_float(match.get("locked")),
         )
 
-    def get_symbol_info(self, symbol: str) -> dict:
-        payload = self._public_request("GET", "/api/v3/exchangeInfo", params={"symbol": symbol})
+    @staticmethod
+    def _first_symbol(payload: dict, symbol: str) -> dict:
         symbols = payload.get("symbols", [])
         if not symbols:
             raise ValueError(f"Símbolo no encontrado en exchangeInfo: {symbol}")
         return symbols[0]
 
-    def get_symbol_min_notional(self, symbol: str) -> float:
-        """
-        Devuelve el mínimo de notional permitido para órdenes de mercado de un símbolo.
-        """
-        info = self.get_symbol_info(symbol)
-        filters = info.get("filters", [])
-        min_notional = 0.0
-
-        for f in filters:
-            if f.get("filterType") in ("MIN_NOTIONAL", "NOTIONAL"):
-                try:
-                    min_notional = max(min_notional, float(f.get("minNotional", 0)))
-                except (TypeError, ValueError):
-                    pass
-        return min_notional
-
-    def withdraw(
-        self,
+    @staticmethod
+    def _withdraw_params(
         coin: str,
         address: str,
         amount: float,
         network: Optional[str] = None,
         address_tag: Optional[str] = None,
+        withdraw_order_id: Optional[str] = None,
     ) -> dict:
-        """
-        Envía un retiro usando /sapi/v1/capital/withdraw/apply.
-        Requiere que la API key tenga permiso de retiros y que el network/coin sean válidos.
-        """
         params: dict[str, str | float] = {
             "coin": coin.upper(),
             "address": address,
-            "amount": amount,
+            "amount": _decimal_str(amount),
         }
         if network:
             params["network"] = network.upper()
         if address_tag:
             params["addressTag"] = address_tag
+        if withdraw_order_id:
+            params["withdrawOrderId"] = withdraw_order_id
+        return params
 
-        return self._signed_request("POST", "/sapi/v1/capital/withdraw/apply", params)
+    @staticmethod
+    def _withdraw_history_params(
+        coin: Optional[str] = None,
+        withdraw_order_id: Optional[str] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> dict:
+        params: dict[str, str | int] = {}
+        if coin:
+            params["coin"] = coin.upper()
+        if withdraw_order_id:
+            params["withdrawOrderId"] = withdraw_order_id
+        if start_time:
+            params["startTime"] = int(start_time)
+        if end_time:
+            params["endTime"] = int(end_time)
+        if offset:
+            params["offset"] = int(offset)
+        if limit:
+            params["limit"] = int(limit)
+        return params
 
-    def place_market_order(
-        self,
+    @staticmethod
+    def _market_order_params(
         symbol: str,
         side: str,
         quantity: Optional[float] = None,
         quote_order_qty: Optional[float] = None,
         new_order_resp_type: str = "FULL",
+        new_client_order_id: Optional[str] = None,
     ) -> dict:
-        """
-        Envía una orden de mercado. Para comprar usando el total de un activo de cotización,
-        usar quote_order_qty.
-        """
         if quantity is None and quote_order_qty is None:
             raise ValueError("Debes especificar 'quantity' o 'quote_order_qty'")
 
         params: dict[str, str | float] = {"symbol": symbol, "side": side.upper(), "type": "MARKET"}
         if quantity is not None:
-            params["quantity"] = quantity
+            params["quantity"] = _decimal_str(quantity)
         if quote_order_qty is not None:
-            params["quoteOrderQty"] = quote_order_qty
+            params["quoteOrderQty"] = _decimal_str(quote_order_qty)
+        if new_client_order_id:
+            params["newClientOrderId"] = new_client_order_id
         params["newOrderRespType"] = new_order_resp_type
+        return params
 
-        return self._signed_request("POST", "/api/v3/order", params)
+    @staticmethod
+    def _limit_order_params(
+        symbol: str,
+        side: str,
+        quantity: float,
+        price: float,
+        time_in_force: str = "IOC",
+        new_order_resp_type: str = "FULL",
+        new_client_order_id: Optional[str] = None,
+    ) -> dict:
+        params: dict[str, str | float] = {
+            "symbol": symbol,
+            "side": side.upper(),
+            "type": "LIMIT",
+            "timeInForce": time_in_force,
+            "quantity": _decimal_str(quantity),
+            "price": _decimal_str(price),
+            "newOrderRespType": new_order_resp_type,
+        }
+        if new_client_order_id:
+            params["newClientOrderId"] = new_client_order_id
+        return params
 
-    def get_my_trades(self, symbol: str, start_time: Optional[int] = None, end_time: Optional[int] = None) -> list[dict]:
+    @staticmethod
+    def _order_query_params(
+        symbol: str, order_id: Optional[int] = None, orig_client_order_id: Optional[str] = None
+    ) -> dict:
+        if order_id is None and not orig_client_order_id:
+            raise ValueError("Debes especificar 'order_id' o 'orig_client_order_id'")
         params: dict[str, str | int] = {"symbol": symbol}
+        if order_id is not None:
+            params["orderId"] = int(order_id)
+        if orig_client_order_id:
+            params["origClientOrderId"] = orig_client_order_id
+        return params
+
+    @staticmethod
+    def _my_trades_params(
+        symbol: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        from_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> dict:
+        params: dict[str, str | int] = {"symbol": symbol}
+        if from_id is not None:
+            params["fromId"] = int(from_id)
         if start_time:
             params["startTime"] = int(start_time)
         if end_time:
             params["endTime"] = int(end_time)
-        return self._signed_request("GET", "/api/v3/myTrades", params)
+        if limit:
+            params["limit"] = int(limit)
+        return params
+
+    @staticmethod
+    def _trim_page(page: list[dict], end_time: Optional[int]) -> tuple[list[dict], bool]:
+        """Recorta los trades posteriores a end_time; el bool indica si se llegó al final del rango."""
+        if end_time is None:
+            return page, False
+        kept = [t for t in page if int(t.get("time", 0)) <= end_time]
+        return kept, len(kept) < len(page)
+
+
+class BinanceClient(BinanceClientBase):
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        base_url: str = "https://api.binance.com",
+        recv_window: int = 5000,
+        governor: Optional[RequestGovernor] = None,
+        state_dir: Optional[str] = None,
+        exchange_info_ttl_seconds: float = 6 * 3600,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
+        super().__init__(api_key, api_secret, base_url, recv_window, governor, state_dir, retry_policy)
+        self.session = requests.Session()
+        self.session.headers.update({"X-MBX-APIKEY": self.api_key})
+        self.symbol_cache = SymbolCache(
+            self.get_symbol_info,
+            path=self._symbol_cache_path(),
+            ttl_seconds=exchange_info_ttl_seconds,
+        )
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        url: str,
+        params: Optional[dict] = None,
+        signed_params: Optional[dict] = None,
+    ) -> dict:
+        self.governor.acquire(method, path, params if signed_params is None else signed_params)
+        response = self.session.request(method, url, params=params, timeout=10)
+        self.governor.observe(response.headers)
+        if response.status_code in (418, 429):
+            self.governor.penalize(retry_after_seconds(response.headers))
+        try:
+            response.raise_for_status()
+        except HTTPError as exc:
+            # Adjunta cuerpo de error para depurar (p.ej. api-key inválida, timestamp, permisos).
+            raise HTTPError(
+                f"{exc} | body={response.text}",
+                response=response,
+                request=exc.request,
+            ) from None
+        return response.json()
+
+    def _request(self, method: str, path: str, params: Optional[dict], signed: bool) -> dict:
+        attempt = 0
+        while True:
+            query = params.copy() if params else {}
+            try:
+                if not signed:
+                    return self._send(method, path, f"{self.base_url}{path}", params=query)
+                if self._time_sync_due():
+                    self._sync_time_quietly()
+                return self._send(method, path, self._signed_url(path, query), signed_params=query)
+            except HTTPError as exc:
+                delay = self._retry_delay(
+                    method,
+                    path,
+                    attempt,
+                    exc,
+                    status_code=exc.response.status_code,
+                    error_code=binance_error_code(_response_json(exc.response)),
+                )
+            except requests.ConnectTimeout as exc:
+                delay = self._retry_delay(method, path, attempt, exc, connect_failed=True)
+            except (requests.Timeout, requests.ConnectionError) as exc:
+                delay = self._retry_delay(method, path, attempt, exc, timeout=True)
+            time.sleep(delay)
+            attempt += 1
+
+    def _public_request(self, method: str, path: str, params: Optional[dict] = None) -> dict:
+        return self._request(method, path, params, signed=False)
+
+    def _signed_request(self, method: str, path: str, params: Optional[dict] = None) -> dict:
+        return self._request(method, path, params, signed=True)
+
+    def sync_time(self) -> int:
+        """Mide el desfase con /api/v3/time y lo aplica a las próximas firmas. Devuelve el desfase en ms."""
+        sent_at = time.time()
+        payload = self._public_request("GET", "/api/v3/time")
+        self._apply_server_time(int(payload["serverTime"]), sent_at, time.time())
+        return self.time_offset_ms
+
+    def _sync_time_quietly(self) -> None:
+        try:
+            self.sync_time()
+        except Exception as exc:  # noqa: BLE001
+            self._time_sync_failed(exc)
+
+    def get_asset_balance(self, asset: str) -> AssetBalance:
+        payload = self._signed_request("GET", "/api/v3/account")
+        return self._parse_asset_balance(payload, asset)
+
+    def get_symbol_info(self, symbol: str) -> dict:
+        payload = self._public_request("GET", "/api/v3/exchangeInfo", params={"symbol": symbol})
+        return self._first_symbol(payload, symbol)
+
+    def get_symbol_filters(self, symbol: str) -> SymbolFilters:
+        """
+        Devuelve los filtros del símbolo desde la cache local (descarga exchangeInfo sólo si hace falta).
+        """
+        return self.symbol_cache.get(symbol)
+
+    def get_symbol_min_notional(self, symbol: str) -> float:
+        """
+        Devuelve el mínimo de notional permitido para órdenes de mercado de un símbolo.
+        """
+        return self.get_symbol_filters(symbol).min_notional
+
+    def withdraw(
+        self,
+        coin: str,
+        address: str,
+        amount: float,
+        network: Optional[str] = None,
+        address_tag: Optional[str] = None,
+        withdraw_order_id: Optional[str] = None,
+    ) -> dict:
+        """
+        Envía un retiro usando /sapi/v1/capital/withdraw/apply.
+        Requiere que la API key tenga permiso de retiros y que el network/coin sean válidos.
+        `withdraw_order_id` permite encontrarlo después en el historial de retiros.
+        """
+        params = self._withdraw_params(coin, address, amount, network, address_tag, withdraw_order_id)
+        return self._signed_request("POST", "/sapi/v1/capital/withdraw/apply", params)
+
+    def get_withdraw_history(
+        self,
+        coin: Optional[str] = None,
+        withdraw_order_id: Optional[str] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        params = self._withdraw_history_params(coin, withdraw_order_id, start_time, end_time, offset, limit)
+        return self._signed_request("GET", "/sapi/v1/capital/withdraw/history", params)
+
+    def iter_withdraw_history(
+        self,
+        coin: str,
+        start_time: int,
+        end_time: Optional[int] = None,
+        limit: int = WITHDRAW_HISTORY_PAGE_LIMIT,
+    ) -> Iterator[list[dict]]:
+        """
+        Recorre el historial de retiros desde `start_time` en ventanas de 90 días (máximo que
+        admite Binance) y, dentro de cada ventana, en páginas de `limit` por offset.
+        """
+        window_start = int(start_time)
+        stop = int(end_time) if end_time else int(time.time() * 1000) + self.time_offset_ms
+        while window_start <= stop:
+            window_end = min(window_start + WITHDRAW_HISTORY_WINDOW_MS - 1, stop)
+            offset = 0
+            while True:
+                page = self.get_withdraw_history(
+                    coin=coin, start_time=window_start, end_time=window_end, offset=offset, limit=limit
+                )
+                if page:
+                    yield page
+                if len(page) < limit:
+                    break
+                offset += len(page)
+            window_start = window_end + 1
+
+    def get_coin_config(self) -> list[dict]:
+        """Config de cada moneda (GET /sapi/v1/capital/config/getall): redes, fee y mínimo de retiro."""
+        return self._signed_request("GET", "/sapi/v1/capital/config/getall")
+
+    def place_market_order(
+        self,
+        symbol: str,
+        side: str,
+        quantity: Optional[float] = None,
+        quote_order_qty: Optional[float] = None,
+        new_order_resp_type: str = "FULL",
+        new_client_order_id: Optional[str] = None,
+    ) -> dict:
+        """
+        Envía una orden de mercado. Para comprar usando el total de un activo de cotización,
+        usar quote_order_qty. Con `new_client_order_id` la orden se puede consultar con
+        get_order aunque se pierda la respuesta.
+        """
+        params = self._market_order_params(
+            symbol, side, quantity, quote_order_qty, new_order_resp_type, new_client_order_id
+        )
+        return self._signed_request("POST", "/api/v3/order", params)
+
+    def place_limit_order(
+        self,
+        symbol: str,
+        side: str,
+        quantity: float,
+        price: float,
+        time_in_force: str = "IOC",
+        new_order_resp_type: str = "FULL",
+        new_client_order_id: Optional[str] = None,
+    ) -> dict:
+        """
+        Envía una orden LIMIT (por defecto IOC: ejecuta lo que haya hasta `price` y cancela
+        el resto). `quantity` y `price` ya deben venir redondeados a stepSize / tickSize.
+        """
+        params = self._limit_order_params(
+            symbol, side, quantity, price, time_in_force, new_order_resp_type, new_client_order_id
+        )
+        return self._signed_request("POST", "/api/v3/order", params)
+
+    def get_order_book(self, symbol: str, limit: int = 100) -> dict:
+        """Libro de órdenes (GET /api/v3/depth): `bids` y `asks` como listas [precio, cantidad]."""
+        return self._public_request("GET", "/api/v3/depth", params={"symbol": symbol, "limit": limit})
+
+    def get_order(
+        self, symbol: str, order_id: Optional[int] = None, orig_client_order_id: Optional[str] = None
+    ) -> dict:
+        """Estado de una orden (GET /api/v3/order). Si no existe, HTTPError con código -2013."""
+        params = self._order_query_params(symbol, order_id, orig_client_order_id)
+        return self._signed_request("GET", "/api/v3/order", params)
+
+    def create_listen_key(self) -> str:
+        """
+        Abre un listenKey para el user-data stream (sólo requiere API key, sin firma).
+        """
+        payload = self._public_request("POST", "/api/v3/userDataStream")
+        return payload["listenKey"]
+
+    def keepalive_listen_key(self, listen_key: str) -> None:
+        """Extiende la validez del listenKey otros 60 minutos."""
+        self._public_request("PUT", "/api/v3/userDataStream", params={"listenKey": listen_key})
+
+    def close_listen_key(self, listen_key: str) -> None:
+        self._public_request("DELETE", "/api/v3/userDataStream", params={"listenKey": listen_key})
+
+    def iter_my_trades(
+        self,
+        symbol: str,
+        from_id: Optional[int] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: int = MY_TRADES_PAGE_LIMIT,
+    ) -> Iterator[list[dict]]:
+        """
+        Recorre /api/v3/myTrades en páginas de hasta `limit` trades, en orden de id.
+
+        Con `from_id` (p.ej. el último id guardado + 1) avanza por cursor de id. Con sólo
+        `start_time` busca el primer trade en ventanas de 24 h (máximo que admite Binance)
+        y desde ahí sigue por id. Sin ninguno de los dos arranca desde el primer trade.
+        """
+        if from_id is None and start_time is not None:
+            window_start = int(start_time)
+            stop = int(end_time) if end_time else int(time.time() * 1000) + self.time_offset_ms
+            while from_id is None:
+                if window_start > stop:
+                    return
+                window_end = min(window_start + DAY_MS - 1, stop)
+                params = self._my_trades_params(symbol, window_start, window_end, limit=limit)
+                page = self._signed_request("GET", "/api/v3/myTrades", params)
+                if page:
+                    from_id = int(page[0]["id"])
+                window_start = window_end + 1
+
+        from_id = from_id or 0
+        while True:
+            params = self._my_trades_params(symbol, from_id=from_id, limit=limit)
+            page = self._signed_request("GET", "/api/v3/myTrades", params)
+            page, reached_end = self._trim_page(page, end_time)
+            if page:
+                yield page
+            if reached_end or len(page) < limit:
+                return
+            from_id = int(page[-1]["id"]) + 1
+
+    def get_my_trades(self, symbol: str, start_time: Optional[int] = None, end_time: Optional[int] = None) -> list[dict]:
+        """Devuelve todos los trades del rango (paginando; ya no se corta en 500)."""
+        return [t for page in self.iter_my_trades(symbol, start_time=start_time, end_time=end_time) for t in page]
@@ -28,6 +28,7 @@ def main() -> None:
         api_key=config.api_key,
         api_secret=config.api_secret,
         base_url=config.base_url,
+        state_dir=config.state_dir,
     )
     checker = BTCBalanceChecker(client)
     balance = checker.get_balance()
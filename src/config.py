@@ -1,9 +1,12 @@
 import os
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Optional
 
 from dotenv import load_dotenv
 
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
 
 @dataclass
 class AppConfig:
@@ -13,13 +16,26 @@ class AppConfig:
     poll_interval_seconds: float
     trade_symbol: str
     min_quote_qty: float
+    market_slippage_bps: float
+    max_slippage_bps: float
+    twap_threshold: float
+    twap_slices: int
+    twap_window_seconds: float
+    route_via: list[str]
+    trading_fee_bps: float
     base_url: str
     withdraw_address: str | None
     withdraw_network: str
     withdraw_min_amount: float
+    withdraw_batch_fee_ratio: float
+    withdraw_batch_max_hold_seconds: float
+    withdraw_reconcile_seconds: float
     withdraw_coin: str
     withdraw_amount_override: float | None
     backend_api_base: str | None
+    balance_source: str
+    ws_url: str
+    state_dir: str
 
 
 def _read_env(key: str, fallback_key: Optional[str] = None) -> Optional[str]:
@@ -40,13 +56,29 @@ def load_config() -> AppConfig:
     trade_symbol = (os.getenv("TRADE_SYMBOL") or f"BTC{target_asset}").upper()
     poll_interval_raw = os.getenv("POLL_INTERVAL_SECONDS") or "10"
     min_quote_raw = os.getenv("MIN_QUOTE_QTY") or "0"
+    market_slippage_raw = os.getenv("MARKET_SLIPPAGE_BPS") or "10"
+    max_slippage_raw = os.getenv("MAX_SLIPPAGE_BPS") or "50"
+    twap_threshold_raw = os.getenv("TWAP_THRESHOLD") or "0"
+    twap_slices_raw = os.getenv("TWAP_SLICES") or "6"
+    twap_window_raw = os.getenv("TWAP_WINDOW_SECONDS") or "3600"
+    route_via = [asset.strip().upper() for asset in (os.getenv("ROUTE_VIA") or "").split(",") if asset.strip()]
+    trading_fee_raw = os.getenv("TRADING_FEE_BPS") or "10"
     base_url = os.getenv("BINANCE_BASE_URL") or "https://api.binance.com"
     withdraw_address = os.getenv("WITHDRAW_ADDRESS")
     withdraw_network = (os.getenv("WITHDRAW_NETWORK") or "BSC").upper()
     withdraw_min_amount_raw = os.getenv("WITHDRAW_MIN_AMOUNT") or "0"
+    withdraw_batch_fee_ratio_raw = os.getenv("WITHDRAW_BATCH_FEE_RATIO") or "0"
+    withdraw_batch_max_hold_raw = os.getenv("WITHDRAW_BATCH_MAX_HOLD_HOURS") or "168"
+    withdraw_reconcile_raw = os.getenv("WITHDRAW_RECONCILE_SECONDS") or "600"
     withdraw_coin = (os.getenv("WITHDRAW_COIN") or "BTC").upper()
     withdraw_amount_override_raw = os.getenv("WITHDRAW_AMOUNT")
     backend_api_base = os.getenv("BACKEND_API_BASE") or os.getenv("DCA_API_BASE")
+    balance_source = (os.getenv("BALANCE_SOURCE") or "poll").lower()
+    default_ws_url = (
+        "wss://stream.testnet.binance.vision/ws" if "testnet" in base_url else "wss://stream.binance.com:9443/ws"
+    )
+    ws_url = os.getenv("BINANCE_WS_URL") or default_ws_url
+    state_dir = os.getenv("STATE_DIR") or str(PROJECT_ROOT / ".state")
 
     if not api_key or not api_secret:
         raise ValueError(
@@ -68,6 +100,37 @@ def load_config() -> AppConfig:
     except ValueError as exc:
         raise ValueError("MIN_QUOTE_QTY debe ser un número mayor o igual a cero") from exc
 
+    try:
+        market_slippage_bps = float(market_slippage_raw)
+        max_slippage_bps = float(max_slippage_raw)
+        if market_slippage_bps < 0 or max_slippage_bps < market_slippage_bps:
+            raise ValueError
+    except ValueError as exc:
+        raise ValueError(
+            "MARKET_SLIPPAGE_BPS debe ser >= 0 y MAX_SLIPPAGE_BPS mayor o igual a MARKET_SLIPPAGE_BPS"
+        ) from exc
+
+    try:
+        twap_threshold = float(twap_threshold_raw)
+        twap_slices = int(twap_slices_raw)
+        twap_window_seconds = float(twap_window_raw)
+        if twap_threshold < 0 or twap_slices < 1 or twap_window_seconds <= 0:
+            raise ValueError
+    except ValueError as exc:
+        raise ValueError(
+            "TWAP_THRESHOLD debe ser >= 0, TWAP_SLICES un entero >= 1 y TWAP_WINDOW_SECONDS mayor a cero"
+        ) from exc
+
+    try:
+        trading_fee_bps = float(trading_fee_raw)
+        if not 0 <= trading_fee_bps < 10_000:
+            raise ValueError
+    except ValueError as exc:
+        raise ValueError("TRADING_FEE_BPS debe ser un número entre 0 y 10000") from exc
+
+    if route_via and not trade_symbol.endswith(target_asset):
+        raise ValueError("ROUTE_VIA requiere que TRADE_SYMBOL termine en TARGET_ASSET (ej. BTCARS)")
+
     try:
         withdraw_min_amount = float(withdraw_min_amount_raw)
         if withdraw_min_amount < 0:
@@ -75,6 +138,26 @@ def load_config() -> AppConfig:
     except ValueError as exc:
         raise ValueError("WITHDRAW_MIN_AMOUNT debe ser un número mayor o igual a cero") from exc
 
+    try:
+        withdraw_batch_fee_ratio = float(withdraw_batch_fee_ratio_raw)
+        withdraw_batch_max_hold_hours = float(withdraw_batch_max_hold_raw)
+        if not 0 <= withdraw_batch_fee_ratio < 1 or withdraw_batch_max_hold_hours <= 0:
+            raise ValueError
+    except ValueError as exc:
+        raise ValueError(
+            "WITHDRAW_BATCH_FEE_RATIO debe estar entre 0 y 1 y WITHDRAW_BATCH_MAX_HOLD_HOURS ser mayor a cero"
+        ) from exc
+
+    try:
+        withdraw_reconcile_seconds = float(withdraw_reconcile_raw)
+        if withdraw_reconcile_seconds <= 0:
+            raise ValueError
+    except ValueError as exc:
+        raise ValueError("WITHDRAW_RECONCILE_SECONDS debe ser un número mayor a cero") from exc
+
+    if balance_source not in ("poll", "stream"):
+        raise ValueError("BALANCE_SOURCE debe ser 'poll' o 'stream'")
+
     withdraw_amount_override = None
     if withdraw_amount_override_raw:
         try:
@@ -91,11 +174,24 @@ def load_config() -> AppConfig:
         poll_interval_seconds=poll_interval,
         trade_symbol=trade_symbol,
         min_quote_qty=min_quote_qty,
+        market_slippage_bps=market_slippage_bps,
+        max_slippage_bps=max_slippage_bps,
+        twap_threshold=twap_threshold,
+        twap_slices=twap_slices,
+        twap_window_seconds=twap_window_seconds,
+        route_via=route_via,
+        trading_fee_bps=trading_fee_bps,
         base_url=base_url.rstrip("/"),
         withdraw_address=withdraw_address,
         withdraw_network=withdraw_network,
         withdraw_min_amount=withdraw_min_amount,
+        withdraw_batch_fee_ratio=withdraw_batch_fee_ratio,
+        withdraw_batch_max_hold_seconds=withdraw_batch_max_hold_hours * 3600,
+        withdraw_reconcile_seconds=withdraw_reconcile_seconds,
         withdraw_coin=withdraw_coin,
         withdraw_amount_override=withdraw_amount_override,
         backend_api_base=backend_api_base.rstrip("/") if backend_api_base else None,
+        balance_source=balance_source,
+        ws_url=ws_url.rstrip("/"),
+        state_dir=state_dir,
     )
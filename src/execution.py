@@ -0,0 +1,182 @@
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from src.symbol_cache import SymbolFilters
+
+MARKET = "market"
+LIMIT_IOC = "limit_ioc"
+SLICE = "slice"
+
+# Niveles del libro que se piden a /api/v3/depth (peso 5 hasta 100).
+DEPTH_LIMIT = 100
+
+
+def book_levels(raw_levels) -> list[tuple[float, float]]:
+    return [(float(price), float(qty)) for price, qty in raw_levels or [] if float(qty) > 0]
+
+
+@dataclass(frozen=True)
+class FillEstimate:
+    """Resultado de recorrer el lado ask del libro gastando `quote_qty`."""
+
+    quote_qty: float
+    best_price: float
+    avg_price: float
+    worst_price: float
+    base_qty: float
+    filled_quote: float
+
+    @property
+    def complete(self) -> bool:
+        """False si el libro leído no alcanza para todo el monto."""
+        return self.filled_quote >= self.quote_qty * (1 - 1e-9)
+
+    @property
+    def slippage_bps(self) -> float:
+        if not self.best_price:
+            return 0.0
+        return (self.avg_price / self.best_price - 1) * 10_000
+
+
+def estimate_buy(asks: list[tuple[float, float]], quote_qty: float) -> FillEstimate:
+    """Precio promedio (VWAP) de comprar por `quote_qty` recorriendo los asks de menor a mayor."""
+    remaining = quote_qty
+    base = 0.0
+    spent = 0.0
+    worst = 0.0
+    for price, qty in asks:
+        if remaining <= 0:
+            break
+        take_quote = min(remaining, price * qty)
+        base += take_quote / price
+        spent += take_quote
+        remaining -= take_quote
+        worst = price
+    best = asks[0][0] if asks else 0.0
+    return FillEstimate(
+        quote_qty=quote_qty,
+        best_price=best,
+        avg_price=spent / base if base else 0.0,
+        worst_price=worst,
+        base_qty=base,
+        filled_quote=spent,
+    )
+
+
+def affordable_within(asks: list[tuple[float, float]], quote_qty: float, max_avg_price: float) -> FillEstimate:
+    """
+    Mayor compra (hasta `quote_qty`) cuyo VWAP no supera `max_avg_price`: se toman niveles
+    enteros mientras el promedio lo permita y del siguiente sólo la parte que entra.
+    """
+    base = 0.0
+    spent = 0.0
+    worst = 0.0
+    for price, qty in asks:
+        room = quote_qty - spent
+        if room <= 0:
+            break
+        take_base = min(qty, room / price)
+        if price > max_avg_price:
+            # Cuánto de este nivel se puede sumar sin pasar el promedio: (spent + p*x) / (base + x) = max.
+            take_base = min(take_base, max(0.0, (max_avg_price * base - spent) / (price - max_avg_price)))
+        if take_base <= 0:
+            break
+        base += take_base
+        spent += take_base * price
+        worst = price
+        if take_base < qty and price > max_avg_price:
+            break
+    return FillEstimate(
+        quote_qty=quote_qty,
+        best_price=asks[0][0] if asks else 0.0,
+        avg_price=spent / base if base else 0.0,
+        worst_price=worst,
+        base_qty=base,
+        filled_quote=spent,
+    )
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    kind: str
+    estimate: FillEstimate
+    quote_qty: float
+    quantity: Optional[float] = None
+    limit_price: Optional[float] = None
+
+    def describe(self) -> str:
+        if self.kind == MARKET:
+            return f"MARKET por {self.quote_qty:.2f}"
+        return f"LIMIT IOC {self.quantity:.8f} @ {self.limit_price:.2f} ({self.kind})"
+
+
+class ExecutionPlanner:
+    """
+    Elige cómo ejecutar una compra según el libro (/api/v3/depth).
+
+    - Slippage estimado ≤ `market_slippage_bps`: MARKET con quoteOrderQty (libro profundo).
+    - ≤ `max_slippage_bps`: LIMIT IOC por todo el monto con precio tope en el peor nivel
+      estimado (+ `price_buffer_bps`), para no pagar de más si el libro se mueve al enviar.
+    - Más que eso: se compra sólo la porción cuyo promedio entra en `max_slippage_bps`
+      (LIMIT IOC); el resto queda en el saldo y se toma en los próximos ciclos.
+    """
+
+    def __init__(
+        self,
+        market_slippage_bps: float = 10,
+        max_slippage_bps: float = 50,
+        price_buffer_bps: float = 5,
+    ) -> None:
+        self.market_slippage_bps = market_slippage_bps
+        self.max_slippage_bps = max_slippage_bps
+        self.price_buffer_bps = price_buffer_bps
+
+    def plan(self, book: dict, quote_qty: float, filters: SymbolFilters) -> Optional[ExecutionPlan]:
+        """Devuelve None si con este libro no se puede armar una orden válida (p.ej. por minNotional)."""
+        asks = book_levels(book.get("asks"))
+        if not asks:
+            return None
+        estimate = estimate_buy(asks, quote_qty)
+        if estimate.complete and estimate.slippage_bps <= self.market_slippage_bps:
+            return ExecutionPlan(MARKET, estimate, quote_qty)
+
+        if estimate.complete and estimate.slippage_bps <= self.max_slippage_bps:
+            kind = LIMIT_IOC
+            limit_price = filters.round_price(estimate.worst_price * (1 + self.price_buffer_bps / 10_000))
+            target = estimate
+        else:
+            kind = SLICE
+            max_avg = estimate.best_price * (1 + self.max_slippage_bps / 10_000)
+            target = affordable_within(asks, quote_qty, max_avg)
+            limit_price = filters.round_price(target.worst_price)
+
+        if not limit_price:
+            return None
+        # Cantidad al tope, acotada por el saldo: nunca se compromete más quote del disponible.
+        quantity = filters.round_qty(min(target.base_qty, quote_qty / limit_price))
+        if quantity <= 0 or quantity < filters.min_qty or quantity * limit_price < filters.min_notional:
+            logging.info(
+                "Libro de %s sin profundidad suficiente dentro de %.0f bps para una orden válida",
+                filters.symbol,
+                self.max_slippage_bps,
+            )
+            return None
+        return ExecutionPlan(kind, target, quantity * limit_price, quantity=quantity, limit_price=limit_price)
+
+
+def log_execution(plan: ExecutionPlan, realized_avg: float, executed_qty: float) -> None:
+    """Compara el precio promedio estimado con el realizado (de los fills)."""
+    expected = plan.estimate.avg_price
+    if not expected or not realized_avg:
+        return
+    diff_bps = (realized_avg / expected - 1) * 10_000
+    logging.info(
+        "Ejecución %s: esperado=%.2f realizado=%.2f (%+.1f bps vs estimado, %.1f bps vs mejor ask) qty=%.8f",
+        plan.kind,
+        expected,
+        realized_avg,
+        diff_bps,
+        (realized_avg / plan.estimate.best_price - 1) * 10_000 if plan.estimate.best_price else 0.0,
+        executed_qty,
+    )
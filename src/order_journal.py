@@ -0,0 +1,400 @@
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# Estados de la orden. "intent" = registrada antes de enviarla; su resultado se desconoce
+# hasta recibir la respuesta o reconciliar con GET /api/v3/order.
+INTENT = "intent"
+FILLED = "filled"
+REJECTED = "rejected"
+
+# Estados del retiro. "sending" = se va a llamar (o se llamó) a withdraw/apply;
+# "queued" = esperando a juntarse con otras compras en un retiro por lotes.
+WITHDRAW_QUEUED = "queued"
+WITHDRAW_SENDING = "sending"
+WITHDRAW_DONE = "done"
+WITHDRAW_SKIPPED = "skipped"
+WITHDRAW_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS orders (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_order_id TEXT NOT NULL UNIQUE,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    quote_qty REAL,
+    quantity REAL,
+    status TEXT NOT NULL,
+    order_id INTEGER,
+    executed_qty REAL,
+    fiat_spent REAL,
+    price REAL,
+    transact_time INTEGER,
+    withdraw_status TEXT,
+    withdraw_id TEXT,
+    withdraw_time INTEGER,
+    reported INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_orders_open ON orders (status, withdraw_status, reported);
+"""
+
+# Columnas agregadas después de la primera versión: se suman a journals existentes al abrir.
+# `route` = símbolos de la ruta separados por coma, `leg` = índice de este tramo,
+# `parent_order_id` = clientOrderId del tramo anterior (o del que se deshace),
+# `withdraw_batch` = withdrawOrderId del retiro por lotes que cubre esta compra,
+# `withdraw_sent_at` = cuándo se pasó a "sending" (para el margen antes de darlo por perdido) y
+# `transfer_time` / `tx_id` = cuándo se completó ese retiro en la red y con qué txId.
+_ADDED_COLUMNS = {
+    "route": "TEXT",
+    "leg": "INTEGER",
+    "parent_order_id": "TEXT",
+    "withdraw_batch": "TEXT",
+    "withdraw_sent_at": "INTEGER",
+    "transfer_time": "INTEGER",
+    "tx_id": "TEXT",
+}
+
+
+@dataclass
+class JournalEntry:
+    seq: int
+    client_order_id: str
+    symbol: str
+    side: str
+    quote_qty: Optional[float]
+    quantity: Optional[float]
+    status: str
+    order_id: Optional[int]
+    executed_qty: Optional[float]
+    fiat_spent: Optional[float]
+    price: Optional[float]
+    transact_time: Optional[int]
+    withdraw_status: Optional[str]
+    withdraw_id: Optional[str]
+    withdraw_time: Optional[int]
+    reported: bool
+    error: Optional[str]
+    created_at: int
+    updated_at: int
+    route: Optional[str] = None
+    leg: Optional[int] = None
+    parent_order_id: Optional[str] = None
+    withdraw_batch: Optional[str] = None
+    withdraw_sent_at: Optional[int] = None
+    transfer_time: Optional[int] = None
+    tx_id: Optional[str] = None
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.created_at / 1000
+
+    @property
+    def withdraw_order_id(self) -> str:
+        """withdrawOrderId con el que se envió el retiro de esta compra (propio o del lote)."""
+        return self.withdraw_batch or self.client_order_id
+
+    @property
+    def route_symbols(self) -> list[str]:
+        return self.route.split(",") if self.route else []
+
+    @property
+    def is_final_leg(self) -> bool:
+        """True si esta entrada compra el activo final (compra directa o último tramo de una ruta)."""
+        return not self.route or (self.side == "BUY" and self.leg == len(self.route_symbols) - 1)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class OrderJournal:
+    """
+    Journal local (SQLite, write-ahead) de cada compra: intención → orden → retiro → reporte.
+
+    Cada paso se confirma en disco antes de pasar al siguiente, así tras un corte se sabe
+    qué quedó pendiente. El `newClientOrderId` sale del propio journal (prefijo fijo por
+    journal + secuencia), de modo que una intención siempre se puede consultar en Binance.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self.prefix = self._journal_prefix()
+
+    def _migrate(self) -> None:
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(orders)")}
+        for name, kind in _ADDED_COLUMNS.items():
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE orders ADD COLUMN {name} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_orders_parent ON orders (parent_order_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_orders_withdraw_batch ON orders (withdraw_batch)")
+
+    def _journal_prefix(self) -> str:
+        # Aleatorio una sola vez por journal: si se borra el archivo, los ids nuevos no
+        # chocan con órdenes viejas que Binance todavía devolvería por origClientOrderId.
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'prefix'").fetchone()
+            if row:
+                return row["value"]
+            prefix = secrets.token_hex(3)
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('prefix', ?)", (prefix,))
+            return prefix
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _update(self, client_order_id: str, **fields) -> None:
+        fields["updated_at"] = _now_ms()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE orders SET {assignments} WHERE client_order_id = ?",
+                (*fields.values(), client_order_id),
+            )
+
+    def get(self, client_order_id: str) -> Optional[JournalEntry]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM orders WHERE client_order_id = ?", (client_order_id,)).fetchone()
+        return JournalEntry(**dict(row)) if row else None
+
+    def open_intent(
+        self,
+        symbol: str,
+        side: str,
+        quote_qty: Optional[float] = None,
+        quantity: Optional[float] = None,
+        route: Optional[str] = None,
+        leg: Optional[int] = None,
+        parent_order_id: Optional[str] = None,
+    ) -> JournalEntry:
+        """Registra la intención de operar y le asigna su newClientOrderId (≤36 caracteres)."""
+        now = _now_ms()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "INSERT INTO orders (client_order_id, symbol, side, quote_qty, quantity, status, route, leg,"
+                    " parent_order_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        f"tmp-{secrets.token_hex(8)}",
+                        symbol,
+                        side.upper(),
+                        quote_qty,
+                        quantity,
+                        INTENT,
+                        route,
+                        leg,
+                        parent_order_id,
+                        now,
+                        now,
+                    ),
+                )
+                client_order_id = f"dca-{self.prefix}-{cursor.lastrowid}"
+                self._conn.execute(
+                    "UPDATE orders SET client_order_id = ? WHERE seq = ?", (client_order_id, cursor.lastrowid)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logging.info("Journal: intención %s registrada (%s %s)", client_order_id, side.upper(), symbol)
+        return self.get(client_order_id)
+
+    def record_fill(
+        self,
+        client_order_id: str,
+        order_id: Optional[int],
+        executed_qty: float,
+        fiat_spent: float,
+        price: float,
+        transact_time: Optional[int],
+    ) -> JournalEntry:
+        self._update(
+            client_order_id,
+            status=FILLED,
+            order_id=order_id,
+            executed_qty=executed_qty,
+            fiat_spent=fiat_spent,
+            price=price,
+            transact_time=transact_time,
+        )
+        return self.get(client_order_id)
+
+    def record_rejected(self, client_order_id: str, error: str) -> None:
+        self._update(client_order_id, status=REJECTED, error=error[:500])
+
+    def record_withdraw(
+        self,
+        client_order_id: str,
+        status: str,
+        withdraw_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> JournalEntry:
+        fields = {"withdraw_status": status}
+        if status == WITHDRAW_SENDING:
+            fields["withdraw_sent_at"] = _now_ms()
+        if status == WITHDRAW_DONE:
+            fields.update(withdraw_id=withdraw_id, withdraw_time=_now_ms())
+        if error:
+            fields["error"] = error[:500]
+        self._update(client_order_id, **fields)
+        return self.get(client_order_id)
+
+    def release_withdraw(self, client_order_id: str, error: str) -> JournalEntry:
+        """Binance no ejecutó el retiro (418/429, reloj): vuelve a "sin retirar" para reenviarlo."""
+        self._update(client_order_id, withdraw_status=None, withdraw_sent_at=None, error=error[:500])
+        return self.get(client_order_id)
+
+    def queue_withdraw(self, client_order_id: str) -> JournalEntry:
+        self._update(client_order_id, withdraw_status=WITHDRAW_QUEUED)
+        return self.get(client_order_id)
+
+    def queued_withdrawals(self) -> list[JournalEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM orders WHERE status = ? AND withdraw_status = ? ORDER BY seq", (FILLED, WITHDRAW_QUEUED)
+            ).fetchall()
+        return [JournalEntry(**dict(row)) for row in rows]
+
+    def open_withdraw_batch(self, client_order_ids: list[str]) -> str:
+        """Agrupa compras en cola bajo un withdrawOrderId propio y las pasa a "sending"."""
+        with self._lock:
+            first = self._conn.execute(
+                "SELECT MIN(seq) AS seq FROM orders WHERE client_order_id IN"
+                f" ({', '.join('?' for _ in client_order_ids)})",
+                client_order_ids,
+            ).fetchone()["seq"]
+        batch_id = f"dca-{self.prefix}-w{first}"
+        now = _now_ms()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE orders SET withdraw_status = ?, withdraw_batch = ?, withdraw_sent_at = ?, updated_at = ?"
+                " WHERE client_order_id = ? AND withdraw_status = ?",
+                [(WITHDRAW_SENDING, batch_id, now, now, cid, WITHDRAW_QUEUED) for cid in client_order_ids],
+            )
+        return batch_id
+
+    def release_withdraw_batch(self, batch_id: str, error: str) -> None:
+        """El retiro del lote no se ejecutó: sus compras vuelven a la cola sin lote."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE orders SET withdraw_status = ?, withdraw_batch = NULL, withdraw_sent_at = NULL,"
+                " error = ?, updated_at = ? WHERE withdraw_batch = ? AND withdraw_status = ?",
+                (WITHDRAW_QUEUED, error[:500], _now_ms(), batch_id, WITHDRAW_SENDING),
+            )
+
+    def sending_batches(self) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT withdraw_batch FROM orders WHERE withdraw_status = ? AND withdraw_batch IS NOT NULL",
+                (WITHDRAW_SENDING,),
+            ).fetchall()
+        return [row["withdraw_batch"] for row in rows]
+
+    def batch_entries(self, batch_id: str) -> list[JournalEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM orders WHERE withdraw_batch = ? ORDER BY seq", (batch_id,)
+            ).fetchall()
+        return [JournalEntry(**dict(row)) for row in rows]
+
+    def record_batch_withdraw(
+        self,
+        batch_id: str,
+        status: str,
+        withdraw_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> list[JournalEntry]:
+        now = _now_ms()
+        fields = {"withdraw_status": status, "updated_at": now}
+        if status == WITHDRAW_DONE:
+            fields.update(withdraw_id=withdraw_id, withdraw_time=now)
+        if error:
+            fields["error"] = error[:500]
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            # Un solo UPDATE: todas las compras del lote cambian juntas.
+            self._conn.execute(
+                f"UPDATE orders SET {assignments} WHERE withdraw_batch = ?", (*fields.values(), batch_id)
+            )
+        return self.batch_entries(batch_id)
+
+    def untransferred(self) -> list[JournalEntry]:
+        """Compras con retiro aceptado por Binance cuya llegada a la wallet aún no se confirmó."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM orders WHERE status = ? AND withdraw_status = ? AND transfer_time IS NULL ORDER BY seq",
+                (FILLED, WITHDRAW_DONE),
+            ).fetchall()
+        return [JournalEntry(**dict(row)) for row in rows]
+
+    def _update_withdrawal(self, withdraw_order_id: str, **fields) -> list[JournalEntry]:
+        # Un retiro cubre su propia compra o todas las de su lote; se actualizan juntas.
+        scope = "(withdraw_batch = ? OR (withdraw_batch IS NULL AND client_order_id = ?))"
+        fields["updated_at"] = _now_ms()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE orders SET {assignments} WHERE {scope}",
+                (*fields.values(), withdraw_order_id, withdraw_order_id),
+            )
+            rows = self._conn.execute(
+                f"SELECT * FROM orders WHERE {scope} ORDER BY seq", (withdraw_order_id, withdraw_order_id)
+            ).fetchall()
+        return [JournalEntry(**dict(row)) for row in rows]
+
+    def record_transfer(self, withdraw_order_id: str, transfer_time: int, tx_id: Optional[str]) -> list[JournalEntry]:
+        """Registra que el retiro `withdraw_order_id` se completó en la red."""
+        return self._update_withdrawal(withdraw_order_id, transfer_time=transfer_time, tx_id=tx_id)
+
+    def record_transfer_failed(self, withdraw_order_id: str, error: str) -> list[JournalEntry]:
+        """Binance aceptó el retiro pero después lo canceló, rechazó o falló."""
+        return self._update_withdrawal(withdraw_order_id, withdraw_status=WITHDRAW_FAILED, error=error[:500])
+
+    def record_reported(self, client_order_id: str) -> None:
+        self._update(client_order_id, reported=1)
+
+    def close_leg(self, client_order_id: str, note: Optional[str] = None) -> None:
+        """Cierra un tramo intermedio (o un deshacer) de una ruta: no se retira ni se reporta."""
+        fields = {"withdraw_status": WITHDRAW_SKIPPED, "reported": 1}
+        if note:
+            fields["error"] = note[:500]
+        self._update(client_order_id, **fields)
+
+    def children_of(self, client_order_id: str) -> list[JournalEntry]:
+        """Tramos abiertos a partir de `client_order_id` (siguientes tramos o deshacer), en orden."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM orders WHERE parent_order_id = ? ORDER BY seq", (client_order_id,)
+            ).fetchall()
+        return [JournalEntry(**dict(row)) for row in rows]
+
+    def pending(self) -> list[JournalEntry]:
+        """Entradas con algún paso sin cerrar, de la más vieja a la más nueva."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM orders WHERE status = ? OR (status = ? AND"
+                " (withdraw_status IS NULL OR withdraw_status = ? OR reported = 0)) ORDER BY seq",
+                (INTENT, FILLED, WITHDRAW_SENDING),
+            ).fetchall()
+        return [JournalEntry(**dict(row)) for row in rows]
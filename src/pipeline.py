@@ -0,0 +1,123 @@
+import heapq
+import logging
+import random
+import threading
+import time
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+class PipelineStage(Generic[T]):
+    """
+    Etapa de un pipeline con cola acotada y un hilo propio.
+
+    `handler(item)` devuelve True cuando el ítem terminó esta etapa (pasa a `next_stage`)
+    y False (o lanza) si hay que reintentarlo: vuelve a la cola con backoff exponencial con
+    jitter, sin frenar a los demás ítems. Un ítem ya encolado o en reintento no se duplica.
+    `submit` bloquea si la cola está llena (backpressure hacia quien produce).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[T], bool],
+        next_stage: Optional["PipelineStage[T]"] = None,
+        max_queue: int = 100,
+        base_delay_seconds: float = 2.0,
+        max_delay_seconds: float = 300.0,
+    ) -> None:
+        self.name = name
+        self.handler = handler
+        self.next_stage = next_stage
+        self.max_queue = max_queue
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._ready: list[T] = []
+        self._retries: list[tuple[float, int, T]] = []
+        self._attempts: dict[T, int] = {}
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._closing = False
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, item: T, timeout: Optional[float] = None) -> bool:
+        """Encola `item`. Devuelve False si venció `timeout` esperando lugar en la cola."""
+        with self._cond:
+            if item in self._attempts:
+                return True
+            if not self._cond.wait_for(lambda: len(self._attempts) < self.max_queue or self._closing, timeout):
+                logging.warning("Cola de %s llena; no se encoló %s", self.name, item)
+                return False
+            self._attempts[item] = 0
+            self._ready.append(item)
+            self._cond.notify_all()
+        self._ensure_worker()
+        return True
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._attempts)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que la etapa quede vacía. Devuelve False si venció el timeout."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            while self._attempts:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5) -> None:
+        if not self.flush(timeout):
+            logging.warning("Quedan %d ítems en %s; se retoman al reiniciar", self.pending_count(), self.name)
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+
+    def _ensure_worker(self) -> None:
+        with self._cond:
+            if self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name=f"pipeline-{self.name}", daemon=True)
+            self._worker.start()
+
+    def _next_item(self) -> Optional[T]:
+        with self._cond:
+            while not self._closing:
+                now = time.monotonic()
+                while self._retries and self._retries[0][0] <= now:
+                    self._ready.append(heapq.heappop(self._retries)[2])
+                if self._ready:
+                    return self._ready.pop(0)
+                wait = self._retries[0][0] - now if self._retries else None
+                self._cond.wait(wait)
+            return None
+
+    def _run(self) -> None:
+        while True:
+            item = self._next_item()
+            if item is None:
+                return
+            try:
+                done = self.handler(item)
+            except Exception as exc:  # noqa: BLE001
+                logging.error("Error en %s procesando %s: %s", self.name, item, exc)
+                done = False
+
+            if done and self.next_stage is not None:
+                self.next_stage.submit(item)
+            with self._cond:
+                if done:
+                    del self._attempts[item]
+                else:
+                    attempt = self._attempts[item] = self._attempts[item] + 1
+                    delay = random.uniform(
+                        self.base_delay_seconds / 2, min(self.max_delay_seconds, self.base_delay_seconds * 2**attempt)
+                    )
+                    logging.info("%s: %s se reintenta en %.1fs (intento %d)", self.name, item, delay, attempt)
+                    self._seq += 1
+                    heapq.heappush(self._retries, (time.monotonic() + delay, self._seq, item))
+                self._cond.notify_all()
@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+from typing import Mapping, Optional
+
+# Peso por endpoint según la documentación de Binance (spot). Los no listados cuentan 1.
+ENDPOINT_WEIGHTS: dict[tuple[str, str], int] = {
+    ("GET", "/api/v3/account"): 20,
+    ("GET", "/api/v3/exchangeInfo"): 20,
+    ("GET", "/api/v3/myTrades"): 20,
+    ("GET", "/api/v3/order"): 4,
+    ("POST", "/api/v3/order"): 1,
+    ("GET", "/api/v3/ticker/price"): 2,
+    ("GET", "/api/v3/time"): 1,
+    ("POST", "/api/v3/userDataStream"): 2,
+    ("PUT", "/api/v3/userDataStream"): 2,
+    ("DELETE", "/api/v3/userDataStream"): 2,
+}
+
+ORDER_ENDPOINTS = {("POST", "/api/v3/order")}
+
+
+def _depth_weight(params: Optional[Mapping]) -> int:
+    limit = int((params or {}).get("limit", 100))
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
+class _TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float) -> None:
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def take(self, cost: float, now: float) -> float:
+        """Reserva `cost` tokens (puede quedar en negativo) y devuelve la espera necesaria."""
+        self.refill(now)
+        self.tokens -= cost
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.refill_per_second
+
+
+class RequestGovernor:
+    """
+    Regula el ritmo de llamadas a Binance con un token bucket de peso (y otro de órdenes).
+
+    El bucket se ajusta con lo que reporta el servidor en `X-MBX-USED-WEIGHT-1M` y
+    `X-MBX-ORDER-COUNT-10S`, así que también contempla el consumo de otros procesos que
+    comparten la misma IP/API key (main.py, sync_trades.py, btc_checker.py).
+    """
+
+    def __init__(
+        self,
+        weight_limit_per_minute: int = 6000,
+        order_limit_per_10s: int = 100,
+        safety_ratio: float = 0.8,
+    ) -> None:
+        self.weight_limit = weight_limit_per_minute
+        self.order_limit = order_limit_per_10s
+        self._weight = _TokenBucket(weight_limit_per_minute * safety_ratio, weight_limit_per_minute / 60)
+        self._orders = _TokenBucket(order_limit_per_10s * safety_ratio, order_limit_per_10s / 10)
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def cost(method: str, path: str, params: Optional[Mapping] = None) -> int:
+        if path == "/api/v3/depth":
+            return _depth_weight(params)
+        return ENDPOINT_WEIGHTS.get((method.upper(), path), 1)
+
+    def reserve(self, method: str, path: str, params: Optional[Mapping] = None) -> float:
+        """
+        Reserva el presupuesto de una llamada y devuelve cuántos segundos hay que esperar
+        antes de enviarla. Las rutas /sapi tienen límites propios y no consumen este bucket.
+        """
+        if not path.startswith("/api/"):
+            return 0.0
+
+        now = time.monotonic()
+        with self._lock:
+            delay = self._weight.take(self.cost(method, path, params), now)
+            if (method.upper(), path) in ORDER_ENDPOINTS:
+                delay = max(delay, self._orders.take(1, now))
+            return max(delay, self._blocked_until - now)
+
+    def acquire(self, method: str, path: str, params: Optional[Mapping] = None) -> None:
+        delay = self.reserve(method, path, params)
+        if delay > 0:
+            logging.info("Limitando llamadas a Binance: se espera %.2fs antes de %s %s", delay, method, path)
+            time.sleep(delay)
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Sincroniza los buckets con el consumo reportado por el servidor."""
+        used_weight = _header_int(headers, "X-MBX-USED-WEIGHT-1M")
+        order_count = _header_int(headers, "X-MBX-ORDER-COUNT-10S")
+        now = time.monotonic()
+        with self._lock:
+            if used_weight is not None:
+                self._weight.refill(now)
+                self._weight.tokens = min(self._weight.tokens, self._weight.capacity - used_weight)
+            if order_count is not None:
+                self._orders.refill(now)
+                self._orders.tokens = min(self._orders.tokens, self._orders.capacity - order_count)
+
+    def penalize(self, retry_after_seconds: float) -> None:
+        """Bloquea todas las llamadas tras un 429/418 durante lo indicado por Retry-After."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after_seconds)
+        logging.warning("Binance pidió pausar las llamadas %.0fs (Retry-After)", retry_after_seconds)
+
+    def budget(self) -> float:
+        """Peso disponible en este momento (puede ser negativo si hay llamadas encoladas)."""
+        with self._lock:
+            self._weight.refill(time.monotonic())
+            return self._weight.tokens
+
+    def safe_poll_interval(self, cost: float, share: float = 0.25) -> float:
+        """
+        Intervalo mínimo para repetir una llamada de peso `cost` usando como mucho `share`
+        del presupuesto por minuto. Se alarga si el presupuesto actual está por debajo de la mitad.
+        """
+        interval = cost / (self._weight.refill_per_second * share)
+        budget = self.budget()
+        if budget < self._weight.capacity / 2:
+            interval *= self._weight.capacity / max(budget, cost)
+        return interval
+
+
+def _header_int(headers: Mapping[str, str], key: str) -> Optional[int]:
+    value = headers.get(key)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after_seconds(headers: Mapping[str, str], default: float = 60) -> float:
+    try:
+        return float(headers.get("Retry-After", default))
+    except (TypeError, ValueError):
+        return default
+
+
+_governors: dict[str, RequestGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(base_url: str) -> RequestGovernor:
+    """Devuelve el governor compartido por todos los clientes de un mismo endpoint."""
+    key = base_url.rstrip("/")
+    with _governors_lock:
+        if key not in _governors:
+            _governors[key] = RequestGovernor()
+        return _governors[key]
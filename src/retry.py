@@ -0,0 +1,57 @@
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+# Métodos que Binance trata como idempotentes: repetirlos no genera efectos duplicados.
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+
+# -1021: timestamp fuera de recvWindow. La orden se rechaza antes de ejecutarse,
+# así que se puede reintentar cualquier método tras resincronizar el reloj.
+TIMESTAMP_ERROR_CODES = {-1021}
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 4
+    base_delay_seconds: float = 0.2
+    max_delay_seconds: float = 3.0
+
+    def backoff(self, attempt: int) -> float:
+        """Backoff exponencial con jitter completo (attempt empieza en 0)."""
+        return random.uniform(0, min(self.max_delay_seconds, self.base_delay_seconds * 2**attempt))
+
+
+def is_retryable(
+    method: str,
+    status_code: Optional[int] = None,
+    error_code: Optional[int] = None,
+    timeout: bool = False,
+    connect_failed: bool = False,
+) -> bool:
+    """
+    Decide si una llamada fallida puede repetirse sin riesgo.
+
+    - No se pudo conectar: la request nunca llegó, se repite cualquier método.
+    - Timeout de lectura o 5xx: el resultado es desconocido; sólo se repiten métodos idempotentes
+      (un POST /order podría haberse ejecutado).
+    - 429/418 no se reintenta aquí: el governor ya frena las llamadas según Retry-After.
+    """
+    if error_code in TIMESTAMP_ERROR_CODES:
+        return True
+    if connect_failed:
+        return True
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    if timeout:
+        return idempotent
+    if status_code is not None and status_code >= 500:
+        return idempotent
+    return False
+
+
+def binance_error_code(payload) -> Optional[int]:
+    if isinstance(payload, dict):
+        try:
+            return int(payload.get("code"))
+        except (TypeError, ValueError):
+            return None
+    return None
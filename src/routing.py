@@ -0,0 +1,127 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.execution import DEPTH_LIMIT, book_levels, estimate_buy
+
+# Comisión spot estándar (0.1%) si no se configura otra.
+DEFAULT_FEE_BPS = 10.0
+
+
+@dataclass(frozen=True)
+class Route:
+    """Cadena de compras: cada tramo compra el base de su símbolo pagando con lo que dejó el anterior."""
+
+    symbols: tuple[str, ...]
+
+    @property
+    def name(self) -> str:
+        return " → ".join(self.symbols)
+
+    @property
+    def is_direct(self) -> bool:
+        return len(self.symbols) == 1
+
+
+@dataclass(frozen=True)
+class RouteQuote:
+    route: Route
+    quote_qty: float
+    spent_quote: float
+    output_qty: float
+    complete: bool
+    # Peor slippage estimado entre los tramos de la ruta.
+    slippage_bps: float = 0.0
+    # Libros leídos para la cotización, para no volver a pedirlos al ejecutar.
+    books: dict[str, dict] = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def output_per_quote(self) -> float:
+        """Activo final recibido (neto de comisiones) por unidad de cotización gastada."""
+        return self.output_qty / self.spent_quote if self.spent_quote else 0.0
+
+    @property
+    def effective_price(self) -> float:
+        return self.spent_quote / self.output_qty if self.output_qty else 0.0
+
+
+class Router:
+    """
+    Compara rutas candidatas (p.ej. BTCARS directo contra USDTARS → BTCUSDT) recorriendo
+    el libro de cada tramo con el monto que llega del anterior, descontando la comisión
+    de cada tramo, y elige la que entrega más activo final por unidad gastada.
+
+    Los tramos de una ruta indirecta se compran a mercado por todo el monto, así que sólo
+    compiten las rutas que el libro cubre enteras y con slippage dentro de `max_slippage_bps`
+    en cada tramo; la directa siempre compite porque su compra la acota el `ExecutionPlanner`.
+    """
+
+    def __init__(
+        self,
+        client,
+        routes: list[Route],
+        fee_bps: float = DEFAULT_FEE_BPS,
+        max_slippage_bps: Optional[float] = None,
+    ) -> None:
+        self.client = client
+        self.routes = routes
+        self.fee_bps = fee_bps
+        self.max_slippage_bps = max_slippage_bps
+
+    def net_of_fee(self, qty: float) -> float:
+        return qty * (1 - self.fee_bps / 10_000)
+
+    def quote(self, route: Route, quote_qty: float, books: dict[str, dict]) -> Optional[RouteQuote]:
+        amount = quote_qty
+        spent = quote_qty
+        complete = True
+        slippage = 0.0
+        for index, symbol in enumerate(route.symbols):
+            asks = book_levels(books[symbol].get("asks"))
+            if not asks:
+                return None
+            estimate = estimate_buy(asks, amount)
+            if not estimate.complete:
+                complete = False
+                if index == 0:
+                    spent = estimate.filled_quote
+            slippage = max(slippage, estimate.slippage_bps)
+            amount = self.net_of_fee(estimate.base_qty)
+        return RouteQuote(
+            route, quote_qty, spent, amount, complete, slippage, {s: books[s] for s in route.symbols}
+        )
+
+    def _eligible(self, quote: RouteQuote) -> bool:
+        if quote.route.is_direct:
+            return True
+        if not quote.complete:
+            return False
+        return self.max_slippage_bps is None or quote.slippage_bps <= self.max_slippage_bps
+
+    def best(self, quote_qty: float) -> Optional[RouteQuote]:
+        """Mejor ruta para gastar `quote_qty`; las que el libro cubre entero van primero."""
+        books: dict[str, dict] = {}
+        quotes = []
+        for route in self.routes:
+            try:
+                for symbol in route.symbols:
+                    if symbol not in books:
+                        books[symbol] = self.client.get_order_book(symbol, limit=DEPTH_LIMIT)
+            except Exception as exc:  # noqa: BLE001
+                logging.warning("No se pudo leer el libro de la ruta %s: %s", route.name, exc)
+                continue
+            quote = self.quote(route, quote_qty, books)
+            if quote is not None:
+                quotes.append(quote)
+        for quote in quotes:
+            logging.info(
+                "Ruta %s: precio efectivo %.2f con comisiones, slippage %.1f bps%s",
+                quote.route.name,
+                quote.effective_price,
+                quote.slippage_bps,
+                "" if quote.complete else " [libro insuficiente]",
+            )
+        quotes = [q for q in quotes if self._eligible(q)]
+        if not quotes:
+            return None
+        return max(quotes, key=lambda q: (q.complete, q.output_per_quote))
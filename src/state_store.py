@@ -0,0 +1,35 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+
+class JsonStateStore:
+    """
+    Pequeño almacén clave/valor en un archivo JSON (cursores, marcas de agua).
+    Cada escritura reemplaza el archivo de forma atómica.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._data: dict[str, Any] = {}
+        if self.path.exists():
+            try:
+                self._data = json.loads(self.path.read_text())
+            except (OSError, ValueError) as exc:
+                logging.warning("Estado ilegible en %s; se empieza vacío: %s", self.path, exc)
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._data, indent=2, sort_keys=True))
+            os.replace(tmp, self.path)
@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from decimal import ROUND_DOWN, ROUND_UP, Decimal
+from pathlib import Path
+from typing import Callable, Optional
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _round_to_step(value: float, step: float, rounding=ROUND_DOWN) -> float:
+    if step <= 0:
+        return value
+    step_dec = Decimal(str(step))
+    units = (Decimal(str(value)) / step_dec).to_integral_value(rounding=rounding)
+    return float(units * step_dec)
+
+
+@dataclass
+class SymbolFilters:
+    """Filtros de exchangeInfo de un símbolo ya parseados a float."""
+
+    symbol: str
+    base_asset: str = ""
+    quote_asset: str = ""
+    status: str = ""
+    min_notional: float = 0.0
+    max_notional: float = 0.0
+    min_qty: float = 0.0
+    max_qty: float = 0.0
+    step_size: float = 0.0
+    market_min_qty: float = 0.0
+    market_max_qty: float = 0.0
+    market_step_size: float = 0.0
+    min_price: float = 0.0
+    max_price: float = 0.0
+    tick_size: float = 0.0
+    raw: dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def from_symbol_info(cls, info: dict) -> "SymbolFilters":
+        raw = {f.get("filterType"): f for f in info.get("filters", []) if f.get("filterType")}
+        lot = raw.get("LOT_SIZE", {})
+        market_lot = raw.get("MARKET_LOT_SIZE", {})
+        price = raw.get("PRICE_FILTER", {})
+        min_notional = max(
+            _to_float(raw.get("MIN_NOTIONAL", {}).get("minNotional")),
+            _to_float(raw.get("NOTIONAL", {}).get("minNotional")),
+        )
+        return cls(
+            symbol=info.get("symbol", ""),
+            base_asset=info.get("baseAsset", ""),
+            quote_asset=info.get("quoteAsset", ""),
+            status=info.get("status", ""),
+            min_notional=min_notional,
+            max_notional=_to_float(raw.get("NOTIONAL", {}).get("maxNotional")),
+            min_qty=_to_float(lot.get("minQty")),
+            max_qty=_to_float(lot.get("maxQty")),
+            step_size=_to_float(lot.get("stepSize")),
+            market_min_qty=_to_float(market_lot.get("minQty")),
+            market_max_qty=_to_float(market_lot.get("maxQty")),
+            market_step_size=_to_float(market_lot.get("stepSize")),
+            min_price=_to_float(price.get("minPrice")),
+            max_price=_to_float(price.get("maxPrice")),
+            tick_size=_to_float(price.get("tickSize")),
+            raw=raw,
+        )
+
+    def round_qty(self, qty: float, market: bool = False) -> float:
+        """Redondea hacia abajo la cantidad al stepSize (MARKET_LOT_SIZE si se pide y existe)."""
+        step = self.market_step_size if market and self.market_step_size > 0 else self.step_size
+        return _round_to_step(qty, step)
+
+    def round_price(self, price: float, up: bool = False) -> float:
+        return _round_to_step(price, self.tick_size, ROUND_UP if up else ROUND_DOWN)
+
+
+class SymbolCache:
+    """
+    Cache de filtros por símbolo persistido en disco con TTL.
+
+    Una entrada vencida se sigue sirviendo mientras se refresca en segundo plano, y si
+    Binance no responde se usa la última copia conocida (arranque instantáneo y tolerante
+    a estar offline). Sólo se bloquea cuando el símbolo nunca se descargó.
+    """
+
+    def __init__(
+        self,
+        fetch: Optional[Callable[[str], dict]],
+        path: Optional[Path] = None,
+        ttl_seconds: float = 6 * 3600,
+    ) -> None:
+        self.fetch = fetch
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, tuple[float, SymbolFilters]] = {}
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+            for symbol, entry in data.get("symbols", {}).items():
+                self._entries[symbol] = (float(entry["fetched_at"]), SymbolFilters(**entry["filters"]))
+        except Exception as exc:  # noqa: BLE001
+            logging.warning("Cache de exchangeInfo ilegible (%s); se descarta: %s", self.path, exc)
+            self._entries = {}
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                "symbols": {
+                    symbol: {"fetched_at": fetched_at, "filters": asdict(filters)}
+                    for symbol, (fetched_at, filters) in self._entries.items()
+                }
+            }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            logging.warning("No se pudo guardar la cache de exchangeInfo en %s: %s", self.path, exc)
+
+    def _refresh(self, symbol: str) -> SymbolFilters:
+        if self.fetch is None:
+            raise LookupError(f"Sin filtros en cache para {symbol} y sin fuente sincrónica para descargarlos")
+        return self.store(symbol, self.fetch(symbol))
+
+    def store(self, symbol: str, info: dict) -> SymbolFilters:
+        """Parsea y guarda la respuesta de exchangeInfo de un símbolo (útil para clientes async)."""
+        filters = SymbolFilters.from_symbol_info(info)
+        with self._lock:
+            self._entries[symbol.upper()] = (time.time(), filters)
+        self._save()
+        return filters
+
+    def peek(self, symbol: str) -> Optional[tuple[SymbolFilters, bool]]:
+        """Devuelve (filtros, vencido) sin tocar la red, o None si el símbolo no está en cache."""
+        with self._lock:
+            entry = self._entries.get(symbol.upper())
+        if entry is None:
+            return None
+        fetched_at, filters = entry
+        return filters, time.time() - fetched_at > self.ttl_seconds
+
+    def _refresh_in_background(self, symbol: str) -> None:
+        with self._lock:
+            if symbol in self._refreshing:
+                return
+            self._refreshing.add(symbol)
+
+        def _run() -> None:
+            try:
+                self._refresh(symbol)
+            except Exception as exc:  # noqa: BLE001
+                logging.warning("No se pudo refrescar exchangeInfo de %s; se usa la copia en cache: %s", symbol, exc)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(symbol)
+
+        threading.Thread(target=_run, name=f"exchange-info-{symbol}", daemon=True).start()
+
+    def get(self, symbol: str) -> SymbolFilters:
+        symbol = symbol.upper()
+        cached = self.peek(symbol)
+        if cached is None:
+            return self._refresh(symbol)
+
+        filters, stale = cached
+        if stale:
+            self._refresh_in_background(symbol)
+        return filters
+
+    def invalidate(self, symbol: str) -> None:
+        with self._lock:
+            self._entries.pop(symbol.upper(), None)
@@ -1,13 +1,91 @@
+import json
 import logging
+import os
+import random
+import threading
+import time
 from datetime import datetime
+from pathlib import Path
 from typing import Optional
 
 import requests
 
 
+def trade_payload(
+    *,
+    buy_timestamp: datetime,
+    fiat_spent: float,
+    btc_bought: float,
+    price_fiat_per_btc: float,
+    wallet: str,
+    transfer_timestamp: Optional[datetime] = None,
+    binance_order_id: Optional[int] = None,
+    binance_trade_id: Optional[int] = None,
+    withdraw_id: Optional[str] = None,
+    transfer_tx_id: Optional[str] = None,
+) -> dict:
+    return {
+        "buy_timestamp": buy_timestamp.isoformat(),
+        "fiat_spent": fiat_spent,
+        "btc_bought": btc_bought,
+        "price_fiat_per_btc": price_fiat_per_btc,
+        "wallet": wallet,
+        "transfer_timestamp": transfer_timestamp.isoformat() if transfer_timestamp else None,
+        "binance_order_id": binance_order_id,
+        "binance_trade_id": binance_trade_id,
+        "withdraw_id": withdraw_id,
+        "transfer_tx_id": transfer_tx_id,
+    }
+
+
+def transfer_payload(
+    *,
+    binance_order_id: int,
+    transfer_timestamp: Optional[datetime] = None,
+    withdraw_id: Optional[str] = None,
+    transfer_tx_id: Optional[str] = None,
+) -> dict:
+    return {
+        "binance_order_id": binance_order_id,
+        "transfer_timestamp": transfer_timestamp.isoformat() if transfer_timestamp else None,
+        "withdraw_id": withdraw_id,
+        "transfer_tx_id": transfer_tx_id,
+    }
+
+
 class TradeReporter:
-    def __init__(self, base_url: Optional[str]) -> None:
+    """
+    Reporta trades al backend sin bloquear el flujo de compra/retiro.
+
+    `report_trade` sólo encola: el payload se agrega a un spool en disco (JSONL, con fsync)
+    y un hilo de fondo lo envía en lotes a POST /trades/bulk sobre una sesión HTTP reutilizada,
+    reintentando con backoff mientras el backend no responda. Lo pendiente se recupera del
+    spool al reiniciar; el backend deduplica por binance_order_id, así que reenviar es seguro.
+    Los datos de retiro (`report_transfers`) viajan por el mismo spool, en orden: un PATCH
+    nunca llega antes que el alta de los trades que actualiza.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str],
+        spool_path: Optional[Path] = None,
+        batch_size: int = 50,
+        max_backoff_seconds: float = 300,
+    ) -> None:
         self.base_url = base_url.rstrip("/") if base_url else None
+        self.spool_path = Path(spool_path) if spool_path else None
+        self.batch_size = batch_size
+        self.max_backoff_seconds = max_backoff_seconds
+        self.session = requests.Session()
+        self._pending: list[dict] = self._load_spool()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._worker: Optional[threading.Thread] = None
+        # Tope de trades por lote mientras se aísla una fila que el backend rechaza.
+        self._split_limit = batch_size
+        if self._pending:
+            logging.info("Se recuperaron %d trades pendientes de reportar", len(self._pending))
+            self._ensure_worker()
 
     def is_enabled(self) -> bool:
         return bool(self.base_url)
@@ -21,21 +99,216 @@ class TradeReporter:
         price_fiat_per_btc: float,
         wallet: str,
         transfer_timestamp: Optional[datetime] = None,
+        binance_order_id: Optional[int] = None,
+        binance_trade_id: Optional[int] = None,
+        withdraw_id: Optional[str] = None,
+        transfer_tx_id: Optional[str] = None,
     ) -> None:
         if not self.base_url:
             return
 
-        payload = {
-            "buy_timestamp": buy_timestamp.isoformat(),
-            "fiat_spent": fiat_spent,
-            "btc_bought": btc_bought,
-            "price_fiat_per_btc": price_fiat_per_btc,
-            "wallet": wallet,
-            "transfer_timestamp": transfer_timestamp.isoformat() if transfer_timestamp else None,
-        }
-        try:
-            resp = requests.post(f"{self.base_url}/trades", json=payload, timeout=5)
-            resp.raise_for_status()
-            logging.info("Trade registrado en backend: %s", resp.json())
-        except Exception as exc:  # noqa: BLE001
-            logging.error("No se pudo registrar el trade en backend: %s", exc)
+        payload = trade_payload(
+            buy_timestamp=buy_timestamp,
+            fiat_spent=fiat_spent,
+            btc_bought=btc_bought,
+            price_fiat_per_btc=price_fiat_per_btc,
+            wallet=wallet,
+            transfer_timestamp=transfer_timestamp,
+            binance_order_id=binance_order_id,
+            binance_trade_id=binance_trade_id,
+            withdraw_id=withdraw_id,
+            transfer_tx_id=transfer_tx_id,
+        )
+        with self._cond:
+            self._append_spool(payload)
+            self._pending.append(payload)
+            self._cond.notify()
+        self._ensure_worker()
+
+    def report_transfers(self, updates: list[dict]) -> None:
+        """Encola datos de retiro (armados con `transfer_payload`) para PATCH /trades/transfers."""
+        if not self.base_url or not updates:
+            return
+        op = {"transfers": updates}
+        with self._cond:
+            self._append_spool(op)
+            self._pending.append(op)
+            self._cond.notify()
+        self._ensure_worker()
+
+    def report_trades(self, payloads: list[dict]) -> dict:
+        """
+        Envía varios trades (armados con `trade_payload`) a POST /trades/bulk de forma sincrónica.
+        A diferencia de report_trade, propaga el error para que el llamador no avance su cursor.
+        """
+        if not self.base_url or not payloads:
+            return {"created": 0, "skipped": 0}
+
+        resp = self.session.post(f"{self.base_url}/trades/bulk", json=payloads, timeout=30)
+        resp.raise_for_status()
+        return resp.json()
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que se envíe todo lo encolado. Devuelve False si venció el timeout."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            while self._pending:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5) -> None:
+        if not self.flush(timeout):
+            logging.warning("Quedan %d trades sin reportar; se reenviarán al reiniciar", self.pending_count())
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+
+    def _ensure_worker(self) -> None:
+        with self._cond:
+            if self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="trade-reporter", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        failures = 0
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+                batch = self._next_batch()
+
+            try:
+                if "transfers" in batch[0]:
+                    result = self._patch_transfers(batch[0]["transfers"])
+                    logging.info("Retiros vinculados en el backend: trades actualizados=%s", result.get("updated"))
+                else:
+                    result = self._post_batch(batch)
+                    logging.info(
+                        "Trades reportados al backend: nuevos=%s omitidos=%s",
+                        result.get("created"),
+                        result.get("skipped"),
+                    )
+            except _Rejected as exc:
+                if self._split(batch):
+                    logging.warning("El backend rechazó un lote (%s); se reintenta en mitades para aislar la fila", exc)
+                    continue
+                logging.error("El backend rechazó un trade (%s); se aparta en %s", exc, self._rejected_path())
+                self._write_rejected(batch)
+                self._split_limit = self.batch_size
+            except Exception as exc:  # noqa: BLE001
+                failures += 1
+                delay = random.uniform(0, min(self.max_backoff_seconds, 2**failures))
+                logging.error("No se pudo registrar el trade en backend (%s); reintento en %.1fs", exc, delay)
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closing, timeout=delay)
+                continue
+
+            failures = 0
+            with self._cond:
+                del self._pending[: len(batch)]
+                self._rewrite_spool()
+                self._cond.notify_all()
+
+    def _next_batch(self) -> list[dict]:
+        # Un lote es una actualización de retiros sola o trades consecutivos hasta batch_size.
+        if "transfers" in self._pending[0]:
+            return self._pending[:1]
+        batch = []
+        for payload in self._pending[: self._split_limit]:
+            if "transfers" in payload:
+                break
+            batch.append(payload)
+        return batch
+
+    def _split(self, batch: list[dict]) -> bool:
+        """
+        Parte un lote rechazado para reintentar sin la fila mala: los trades bajan el tope de
+        lote a la mitad y una actualización de retiros se divide en dos en el spool. False si
+        ya es una sola fila (esa es la que se aparta).
+        """
+        if "transfers" in batch[0]:
+            updates = batch[0]["transfers"]
+            if len(updates) <= 1:
+                return False
+            half = len(updates) // 2
+            with self._cond:
+                self._pending[:1] = [{"transfers": updates[:half]}, {"transfers": updates[half:]}]
+                self._rewrite_spool()
+            return True
+        if len(batch) <= 1:
+            return False
+        self._split_limit = len(batch) // 2
+        return True
+
+    def _post_batch(self, batch: list[dict]) -> dict:
+        resp = self.session.post(f"{self.base_url}/trades/bulk", json=batch, timeout=10)
+        return self._checked_json(resp)
+
+    def _patch_transfers(self, updates: list[dict]) -> dict:
+        resp = self.session.patch(f"{self.base_url}/trades/transfers", json=updates, timeout=10)
+        return self._checked_json(resp)
+
+    @staticmethod
+    def _checked_json(resp) -> dict:
+        if resp.status_code in (404, 405):
+            # El backend no expone el endpoint (URL mal configurada o versión vieja): no es
+            # culpa de los datos, se reintenta con backoff hasta que se corrija.
+            raise RuntimeError(f"HTTP {resp.status_code} en {resp.request.method} {resp.url}: revisar BACKEND_API_BASE")
+        if 400 <= resp.status_code < 500 and resp.status_code not in (408, 429):
+            # 413 incluido: el lote se parte igual que ante una fila inválida.
+            raise _Rejected(f"HTTP {resp.status_code}: {resp.text}")
+        resp.raise_for_status()
+        return resp.json()
+
+    def _load_spool(self) -> list[dict]:
+        if not self.spool_path or not self.spool_path.exists():
+            return []
+        pending = []
+        for line in self.spool_path.read_text().splitlines():
+            if not line.strip():
+                continue
+            try:
+                pending.append(json.loads(line))
+            except ValueError:
+                logging.warning("Línea corrupta en %s; se descarta", self.spool_path)
+        return pending
+
+    def _append_spool(self, payload: dict) -> None:
+        if not self.spool_path:
+            return
+        self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.spool_path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(payload) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def _rewrite_spool(self) -> None:
+        if not self.spool_path:
+            return
+        tmp = self.spool_path.with_suffix(".tmp")
+        tmp.write_text("".join(json.dumps(p) + "\n" for p in self._pending), encoding="utf-8")
+        os.replace(tmp, self.spool_path)
+
+    def _rejected_path(self) -> Optional[Path]:
+        return self.spool_path.with_suffix(".rejected.jsonl") if self.spool_path else None
+
+    def _write_rejected(self, batch: list[dict]) -> None:
+        path = self._rejected_path()
+        if not path:
+            return
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.writelines(json.dumps(p) + "\n" for p in batch)
+
+
+class _Rejected(Exception):
+    """Error 4xx del backend: reintentar el mismo lote no va a cambiar el resultado."""
@@ -1,14 +1,58 @@
 import logging
+import math
+import time
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
 
-from src.binance_client import AssetBalance, BinanceClient
-from src.telemetry import TradeReporter
+from requests import HTTPError
+
+from src.binance_client import ORDER_NOT_FOUND_CODE, AssetBalance, BinanceClient, http_error_code
+from src.retry import TIMESTAMP_ERROR_CODES
+from src.execution import DEPTH_LIMIT, MARKET, ExecutionPlan, ExecutionPlanner, estimate_buy, log_execution
+from src.order_journal import (
+    FILLED,
+    INTENT,
+    REJECTED,
+    WITHDRAW_DONE,
+    WITHDRAW_FAILED,
+    WITHDRAW_SENDING,
+    WITHDRAW_SKIPPED,
+    JournalEntry,
+    OrderJournal,
+)
+from src.pipeline import PipelineStage
+from src.routing import DEFAULT_FEE_BPS, Router, RouteQuote
+from src.telemetry import TradeReporter, transfer_payload
+from src.twap import SliceScheduler
+
+# Ítem de la etapa de retiro que evalúa (y envía) el retiro por lotes.
+WITHDRAW_BATCH_KEY = "withdraw-batch"
+# Intentos del tramo siguiente de una ruta antes de deshacer el tramo ya comprado.
+ROUTE_LEG_ATTEMPTS = 2
+# Una intención que Binance no conoce se da por no enviada recién pasado este margen
+# (una orden recién aceptada puede tardar en aparecer en GET /api/v3/order).
+INTENT_GRACE_SECONDS = 60
+OPEN_ORDER_STATUSES = {"NEW", "PARTIALLY_FILLED", "PENDING_NEW"}
+# Un retiro con resultado desconocido nunca se reenvía: se busca en el historial y, si pasado
+# este margen sigue sin aparecer, queda "failed" para revisión manual (reenviarlo podría duplicarlo).
+WITHDRAW_GRACE_SECONDS = 600
+# Resultado de `_apply_withdraw` cuando Binance respondió sin ejecutar el retiro (418/429, reloj).
+WITHDRAW_NOT_SENT = "not_sent"
 
 
 class AutoSwapper:
     """
     Detecta saldo libre en un activo de cotización y lo usa para comprar
-    el par configurado mediante orden de mercado.
+    el par configurado. Antes de cada compra se lee el libro y el `ExecutionPlanner`
+    decide entre orden de mercado, LIMIT IOC o comprar sólo una porción del saldo. Con un
+    `SliceScheduler` los saldos grandes se reparten en varias órdenes a lo largo del tiempo, y
+    con un `Router` se compra por la ruta (directa o de varios tramos) que rinde más.
+
+    Cada compra pasa por el journal (intención → orden → retiro → reporte) con un
+    newClientOrderId propio, así un corte en cualquier punto se retoma sin repetir pasos.
+    El retiro y el reporte corren en etapas con hilo propio: el hilo del monitor vuelve a
+    mirar saldos apenas se llena la orden.
     """
 
     def __init__(
@@ -21,6 +65,10 @@ class AutoSwapper:
         withdraw_coin: str = "BTC",
         reporter: TradeReporter | None = None,
         wallet: str | None = None,
+        journal: OrderJournal | None = None,
+        planner: ExecutionPlanner | None = None,
+        scheduler: SliceScheduler | None = None,
+        router: Router | None = None,
     ) -> None:
         self.client = client
         self.quote_asset = quote_asset
@@ -31,6 +79,15 @@ class AutoSwapper:
         self.withdraw_coin = withdraw_coin.upper()
         self.reporter = reporter
         self.wallet = wallet or ""
+        # Sin journal en disco se usa uno en memoria: mismo flujo, sin recuperación tras reinicio.
+        self.journal = journal or OrderJournal(Path(":memory:"))
+        self.planner = planner or ExecutionPlanner()
+        self.scheduler = scheduler
+        self.router = router
+        self.report_stage: PipelineStage[str] = PipelineStage("report", self._report_step)
+        self.withdraw_stage: PipelineStage[str] = PipelineStage(
+            "withdraw", self._withdraw_step, next_stage=self.report_stage
+        )
 
     def _load_min_notional(self) -> float:
         try:
@@ -49,6 +106,7 @@ class AutoSwapper:
     def handle_balance(self, balance: AssetBalance) -> None:
         if balance.asset != self.quote_asset:
             return
+        self.check_withdraw_batch()
 
         available = balance.free
         if available <= 0:
@@ -62,16 +120,77 @@ class AutoSwapper:
                 available,
                 effective_min,
             )
+            if self.scheduler:
+                self.scheduler.finish("saldo por debajo del mínimo")
             return
 
+        if not self.recover():
+            # El saldo visto puede ser el remanente de una orden cuyo resultado aún no se conoce.
+            logging.warning("Hay una compra sin resolver en el journal; se posterga la nueva orden.")
+            return
+
+        amount = available
+        if self.scheduler:
+            amount = self.scheduler.child_amount(available, effective_min)
+            if amount is None:
+                return
+
+        entry = None
+        try:
+            entry = self._buy(amount, available, balance.asset)
+        finally:
+            if self.scheduler:
+                # Sin ejecución, la próxima hija se posterga para no reintentar en cada evento.
+                if entry is not None:
+                    self.scheduler.record_fill(entry.fiat_spent, available, effective_min)
+                else:
+                    self.scheduler.record_miss()
+
+    def _buy(self, amount: float, available: float, asset: str) -> JournalEntry | None:
+        """Compra por `amount` (por la mejor ruta o según el libro). None si no se ejecutó nada."""
+        book = None
+        if self.router:
+            best = self.router.best(amount)
+            if best is not None and not best.route.is_direct:
+                return self._buy_route(best)
+            if best is not None:
+                book = best.books.get(self.symbol)
+
+        plan = self._plan(amount, book)
+        if plan is None:
+            return None
         logging.info(
-            "Detectados %.8f %s libres. Enviando orden de compra en %s con todo el saldo...",
+            "Detectados %.8f %s libres. Enviando orden de compra en %s: %s (slippage estimado %.1f bps)",
             available,
-            balance.asset,
+            asset,
             self.symbol,
+            plan.describe(),
+            plan.estimate.slippage_bps,
         )
 
-        order = self.client.place_market_order(symbol=self.symbol, side="BUY", quote_order_qty=available)
+        entry = self.journal.open_intent(self.symbol, "BUY", quote_qty=plan.quote_qty, quantity=plan.quantity)
+        entry = self._submit(entry, lambda: self._place(plan, entry.client_order_id))
+        if entry is None:
+            return None
+        log_execution(plan, entry.price, entry.executed_qty)
+        self._schedule(entry)
+        return entry
+
+    def _submit(self, entry: JournalEntry, send: Callable[[], dict]) -> JournalEntry | None:
+        """Envía la orden de `entry` y registra el resultado. None si no se ejecutó nada."""
+        try:
+            order = send()
+        except HTTPError as exc:
+            if exc.response is not None and exc.response.status_code < 500:
+                # Rechazo explícito: la orden no se ejecutó.
+                self.journal.record_rejected(entry.client_order_id, str(exc))
+            else:
+                logging.error("Resultado de la orden %s desconocido; se reconcilia luego.", entry.client_order_id)
+            raise
+        except Exception:
+            logging.error("Resultado de la orden %s desconocido; se reconcilia luego.", entry.client_order_id)
+            raise
+
         logging.info(
             "Orden ejecutada: id=%s status=%s cummulativeQuoteQty=%s executedQty=%s",
             order.get("orderId"),
@@ -79,33 +198,432 @@ class AutoSwapper:
             order.get("cummulativeQuoteQty"),
             order.get("executedQty"),
         )
+        if self._to_float(order.get("executedQty")) <= 0:
+            # LIMIT IOC sin contraparte al precio tope: expira sin ejecutar nada.
+            logging.info("La orden %s expiró sin ejecutarse; se reintenta en el próximo ciclo.", entry.client_order_id)
+            self.journal.record_rejected(entry.client_order_id, f"status={order.get('status')}")
+            return None
+        return self._record_order(entry, order)
+
+    def _plan(self, available: float, book: dict | None = None) -> ExecutionPlan | None:
+        """Plan de compra por `available`; `book` evita releer el libro si el router ya lo trajo."""
+        try:
+            if book is None:
+                book = self.client.get_order_book(self.symbol, limit=DEPTH_LIMIT)
+            filters = self.client.get_symbol_filters(self.symbol)
+        except Exception as exc:  # noqa: BLE001
+            # Sin libro no se puede estimar: se mantiene el comportamiento previo (MARKET).
+            logging.warning("No se pudo leer el libro de %s; se usa orden de mercado: %s", self.symbol, exc)
+            return ExecutionPlan(MARKET, estimate_buy([], available), available)
+        return self.planner.plan(book, available, filters)
+
+    def _place(self, plan: ExecutionPlan, client_order_id: str) -> dict:
+        if plan.kind == MARKET:
+            return self.client.place_market_order(
+                symbol=self.symbol,
+                side="BUY",
+                quote_order_qty=plan.quote_qty,
+                new_client_order_id=client_order_id,
+            )
+        return self.client.place_limit_order(
+            symbol=self.symbol,
+            side="BUY",
+            quantity=plan.quantity,
+            price=plan.limit_price,
+            time_in_force="IOC",
+            new_client_order_id=client_order_id,
+        )
+
+    def _buy_route(self, quote: RouteQuote) -> JournalEntry | None:
+        """Primer tramo de una ruta de varios tramos; el resto lo completa `_advance_route`."""
+        symbols = quote.route.symbols
+        logging.info(
+            "Comprando %.8f por la ruta %s (precio efectivo estimado %.2f)",
+            quote.quote_qty,
+            quote.route.name,
+            quote.effective_price,
+        )
+        entry = self.journal.open_intent(
+            symbols[0], "BUY", quote_qty=quote.quote_qty, route=",".join(symbols), leg=0
+        )
+        entry = self._submit(
+            entry,
+            lambda: self.client.place_market_order(
+                symbol=symbols[0],
+                side="BUY",
+                quote_order_qty=quote.quote_qty,
+                new_client_order_id=entry.client_order_id,
+            ),
+        )
+        if entry is not None:
+            self._advance_route(entry)
+        return entry
+
+    def _advance_route(self, entry: JournalEntry) -> bool:
+        """
+        Completa la ruta a partir de un tramo intermedio ya lleno: compra el tramo siguiente
+        con lo recibido (reintentando en la próxima recuperación) y, si Binance lo rechaza
+        `ROUTE_LEG_ATTEMPTS` veces, deshace vendiendo lo comprado. Un tramo se cierra recién
+        cuando el siguiente quedó lleno, así un corte a mitad de ruta se retoma.
+        Devuelve False si la ruta sigue abierta.
+        """
+        cid = entry.client_order_id
+        children = self.journal.children_of(cid)
+        if not children or (
+            children[-1].status == REJECTED and children[-1].side == "BUY" and len(children) < ROUTE_LEG_ATTEMPTS
+        ):
+            self._open_next_leg(entry)
+            children = self.journal.children_of(cid)
+        child = children[-1]
+        if child.status == INTENT:
+            child = self._reconcile_intent(child)
+            if child.status == INTENT:
+                return False
+
+        if child.status == FILLED:
+            if child.side == "SELL":
+                self.journal.close_leg(child.client_order_id, "deshace ruta incompleta")
+                self.journal.close_leg(cid, "ruta deshecha")
+                return True
+            if not child.is_final_leg and not self._advance_route(child):
+                return False
+            self.journal.close_leg(cid)
+            self._schedule(child)
+            return True
 
+        if child.side == "BUY":
+            if len(children) < ROUTE_LEG_ATTEMPTS:
+                logging.warning("Tramo siguiente a %s no ejecutado; se reintenta en la próxima recuperación.", cid)
+                return False
+            self._unwind(entry)
+            if self.journal.children_of(cid)[-1].side == "BUY":
+                # No se llegó a registrar la venta: se reintenta en la próxima recuperación.
+                return False
+            return self._advance_route(entry)
+        logging.error("No se pudo completar ni deshacer la ruta desde %s; requiere revisión manual.", cid)
+        self.journal.close_leg(cid, f"ruta incompleta: {entry.executed_qty} en {entry.symbol} sin deshacer")
+        return True
+
+    def _net_received(self, entry: JournalEntry) -> float:
+        """
+        Lo que dejó libre un tramo intermedio: salvo que se pague en BNB, Binance cobra la
+        comisión de compra en el activo comprado. Truncado a 8 decimales.
+        """
+        fee_bps = self.router.fee_bps if self.router else DEFAULT_FEE_BPS
+        return math.floor(entry.executed_qty * (1 - fee_bps / 10_000) * 1e8) / 1e8
+
+    def _open_next_leg(self, entry: JournalEntry) -> None:
+        symbols = entry.route_symbols
+        leg = entry.leg + 1
+        amount = self._net_received(entry)
+        child = self.journal.open_intent(
+            symbols[leg],
+            "BUY",
+            quote_qty=amount,
+            route=entry.route,
+            leg=leg,
+            parent_order_id=entry.client_order_id,
+        )
+        try:
+            self._submit(
+                child,
+                lambda: self.client.place_market_order(
+                    symbol=symbols[leg], side="BUY", quote_order_qty=amount, new_client_order_id=child.client_order_id
+                ),
+            )
+        except Exception as exc:  # noqa: BLE001
+            logging.warning("Tramo %d de la ruta %s sin completar: %s", leg, entry.route, exc)
+
+    def _unwind(self, entry: JournalEntry) -> None:
+        """Vende lo comprado en un tramo intermedio cuando el siguiente no se puede ejecutar."""
+        try:
+            filters = self.client.get_symbol_filters(entry.symbol)
+        except Exception as exc:  # noqa: BLE001
+            logging.warning("No se pudieron leer los filtros de %s para deshacer la ruta: %s", entry.symbol, exc)
+            return
+        # Se vende lo neto de comisión: con el bruto la orden se rechaza por saldo insuficiente.
+        quantity = filters.round_qty(self._net_received(entry), market=True)
+        logging.warning("Deshaciendo la ruta %s: se venden %.8f en %s", entry.route, quantity, entry.symbol)
+        unwind = self.journal.open_intent(
+            entry.symbol,
+            "SELL",
+            quantity=quantity,
+            route=entry.route,
+            leg=entry.leg,
+            parent_order_id=entry.client_order_id,
+        )
+        try:
+            self._submit(
+                unwind,
+                lambda: self.client.place_market_order(
+                    symbol=entry.symbol, side="SELL", quantity=quantity, new_client_order_id=unwind.client_order_id
+                ),
+            )
+        except Exception as exc:  # noqa: BLE001
+            logging.error("No se pudo deshacer la ruta %s: %s", entry.route, exc)
+
+    def recover(self) -> bool:
+        """
+        Retoma lo que quedó a medias en el journal (al iniciar y antes de cada compra): las
+        órdenes con resultado desconocido se consultan acá y el resto vuelve al pipeline.
+        Devuelve False si queda alguna orden cuyo resultado en Binance aún no se conoce.
+        """
+        resolved = True
+        for entry in self.journal.pending():
+            # Resolver un tramo de ruta puede haber actualizado entradas posteriores de la lista.
+            entry = self.journal.get(entry.client_order_id)
+            if entry.status == INTENT:
+                entry = self._reconcile_intent(entry)
+                if entry.status == INTENT:
+                    resolved = False
+                    continue
+            if entry.status != FILLED:
+                continue
+            if entry.is_final_leg:
+                self._schedule(entry)
+            elif entry.side == "SELL":
+                # Venta que deshizo una ruta: no se retira ni se reporta.
+                self.journal.close_leg(entry.client_order_id, "deshace ruta incompleta")
+            elif not self._advance_route(entry):
+                resolved = False
+        return resolved
+
+    def check_withdraw_batch(self) -> None:
+        """Encola la evaluación del retiro por lotes (se llama en cada ciclo del monitor)."""
+        if self.withdrawer and self.withdrawer.batching:
+            self.withdraw_stage.submit(WITHDRAW_BATCH_KEY)
+
+    def close(self, timeout: float = 5) -> None:
+        """Espera a que terminen retiros y reportes en curso; lo que quede se retoma al reiniciar."""
+        self.withdraw_stage.close(timeout)
+        self.report_stage.close(timeout)
+
+    def _schedule(self, entry: JournalEntry) -> None:
+        if not entry.is_final_leg:
+            return
+        if entry.withdraw_status in (None, WITHDRAW_SENDING):
+            self.withdraw_stage.submit(entry.client_order_id)
+        elif not entry.reported:
+            self.report_stage.submit(entry.client_order_id)
+
+    def _withdraw_step(self, client_order_id: str) -> bool:
+        if client_order_id == WITHDRAW_BATCH_KEY:
+            return self._withdraw_batch()
+        entry = self.journal.get(client_order_id)
+        if entry.withdraw_batch:
+            # Cubierta por un retiro por lotes: lo resuelve `_withdraw_batch`.
+            return self._withdraw_batch()
+        if entry.withdraw_status in (None, WITHDRAW_SENDING):
+            entry = self._withdraw(entry)
+        # "sending" = resultado desconocido: se reintenta verificando el historial;
+        # sin estado = Binance no lo ejecutó: se reenvía con backoff.
+        return entry.withdraw_status not in (None, WITHDRAW_SENDING)
+
+    def _report_step(self, client_order_id: str) -> bool:
+        if client_order_id == WITHDRAW_BATCH_KEY:
+            # Los trades del lote ya se reportaron al entrar en cola; el vínculo va por `_link_transfers`.
+            return True
+        entry = self.journal.get(client_order_id)
+        if not entry.reported:
+            self._report(entry)
+        return self.journal.get(client_order_id).reported
+
+    def _reconcile_intent(self, entry: JournalEntry) -> JournalEntry:
+        cid = entry.client_order_id
+        try:
+            order = self.client.get_order(entry.symbol, orig_client_order_id=cid)
+        except HTTPError as exc:
+            if http_error_code(exc) == ORDER_NOT_FOUND_CODE:
+                if entry.age_seconds <= INTENT_GRACE_SECONDS:
+                    logging.info("La orden %s todavía no aparece en Binance; se reintenta luego.", cid)
+                    return entry
+                logging.warning("La orden %s nunca llegó a Binance; se descarta la intención.", cid)
+                self.journal.record_rejected(cid, "no existe en Binance")
+                return self.journal.get(cid)
+            logging.warning("No se pudo consultar la orden %s: %s", cid, exc)
+            return entry
+        except Exception as exc:  # noqa: BLE001
+            logging.warning("No se pudo consultar la orden %s: %s", cid, exc)
+            return entry
+
+        status = order.get("status")
+        if status in OPEN_ORDER_STATUSES:
+            return entry
+        if self._to_float(order.get("executedQty")) <= 0:
+            self.journal.record_rejected(cid, f"status={status}")
+            return self.journal.get(cid)
+        logging.info("Orden %s recuperada desde Binance: id=%s status=%s", cid, order.get("orderId"), status)
+        return self._record_order(entry, order)
+
+    def _record_order(self, entry: JournalEntry, order: dict) -> JournalEntry:
         executed_qty = self._to_float(order.get("executedQty"))
         fiat_spent = self._to_float(order.get("cummulativeQuoteQty"))
-        buy_ts = self._order_timestamp(order)
-        transfer_ts = None
         price = self._avg_price(order, fiat_spent, executed_qty)
+        parent = self.journal.get(entry.parent_order_id) if entry.parent_order_id and entry.side == "BUY" else None
+        if parent and parent.executed_qty:
+            # Tramo de una ruta: el gasto se expresa en la moneda del primer tramo (la de cotización).
+            fiat_spent = parent.fiat_spent * min(1.0, fiat_spent / parent.executed_qty)
+            price = fiat_spent / executed_qty if executed_qty else 0.0
+        return self.journal.record_fill(
+            entry.client_order_id,
+            order_id=order.get("orderId"),
+            executed_qty=executed_qty,
+            fiat_spent=fiat_spent,
+            price=price,
+            transact_time=int(self._order_timestamp(order).timestamp() * 1000),
+        )
+
+    def _withdraw(self, entry: JournalEntry) -> JournalEntry:
+        cid = entry.client_order_id
+        if not self.withdrawer or not entry.executed_qty:
+            return self.journal.record_withdraw(cid, WITHDRAW_SKIPPED)
+        if self.withdrawer.batching and entry.withdraw_status is None:
+            # Se junta con otras compras; `_withdraw_batch` decide cuándo conviene retirar.
+            return self.journal.queue_withdraw(cid)
+
+        if entry.withdraw_status != WITHDRAW_SENDING:
+            entry = self.journal.record_withdraw(cid, WITHDRAW_SENDING)
+            sent_at = None
+        else:
+            sent_at = entry.withdraw_sent_at or entry.updated_at
+        status, withdraw_id, error = self._apply_withdraw(cid, entry.executed_qty, sent_at)
+        if status == WITHDRAW_SENDING:
+            return entry
+        if status == WITHDRAW_NOT_SENT:
+            return self.journal.release_withdraw(cid, error)
+        return self.journal.record_withdraw(cid, status, withdraw_id=withdraw_id, error=error)
 
-        if self.withdrawer and executed_qty > 0:
+    def _withdraw_batch(self) -> bool:
+        """
+        Retira en un solo envío las compras en cola cuando `AutoWithdrawer.batch_due` lo indica
+        (y reintenta lotes con resultado desconocido). Devuelve False si alguno sigue sin resolver.
+        """
+        for batch_id in self.journal.sending_batches():
+            if not self._send_batch(batch_id):
+                return False
+        queued = self.journal.queued_withdrawals()
+        if not queued:
+            return True
+        total = sum(e.executed_qty for e in queued)
+        oldest_ms = min(e.transact_time or e.created_at for e in queued)
+        if self.withdrawer and self.withdrawer.batching:
+            if not self.withdrawer.batch_due(total, time.time() - oldest_ms / 1000):
+                return True
+        batch_id = self.journal.open_withdraw_batch([e.client_order_id for e in queued])
+        logging.info("Retiro por lotes %s: %d compras, %.8f %s", batch_id, len(queued), total, self.withdraw_coin)
+        return self._send_batch(batch_id, first_attempt=True)
+
+    def _send_batch(self, batch_id: str, first_attempt: bool = False) -> bool:
+        entries = self.journal.batch_entries(batch_id)
+        if not self.withdrawer:
+            self.journal.record_batch_withdraw(batch_id, WITHDRAW_SKIPPED)
+            return True
+        amount = round(sum(e.executed_qty for e in entries), 8)
+        sent_at = None if first_attempt else min(e.withdraw_sent_at or e.updated_at for e in entries)
+        status, withdraw_id, error = self._apply_withdraw(batch_id, amount, sent_at)
+        if status == WITHDRAW_SENDING:
+            return False
+        if status == WITHDRAW_NOT_SENT:
+            self.journal.release_withdraw_batch(batch_id, error)
+            return False
+        entries = self.journal.record_batch_withdraw(batch_id, status, withdraw_id=withdraw_id, error=error)
+        if status == WITHDRAW_DONE:
+            self._link_transfers(entries)
+        return True
+
+    def _apply_withdraw(
+        self, withdraw_order_id: str, amount: float, sent_at: int | None
+    ) -> tuple[str, str | None, str | None]:
+        """
+        Llama a withdraw/apply con `withdraw_order_id`. Devuelve (estado, id, error); estado
+        "sending" = resultado desconocido, se vuelve a verificar más tarde, y WITHDRAW_NOT_SENT
+        = Binance no lo ejecutó, se puede reenviar.
+
+        Con `sent_at` (epoch ms del envío anterior, de resultado desconocido) no se reenvía:
+        sólo se busca en el historial hasta WITHDRAW_GRACE_SECONDS y después queda "failed".
+        """
+        if sent_at is not None:
             try:
-                resp = self.withdrawer.withdraw(amount=executed_qty)
-                if resp is not None:
-                    transfer_ts = datetime.now(timezone.utc)
+                found = self.client.get_withdraw_history(coin=self.withdraw_coin, withdraw_order_id=withdraw_order_id)
             except Exception as exc:  # noqa: BLE001
+                logging.warning("No se pudo verificar el retiro de %s; se reintenta luego: %s", withdraw_order_id, exc)
+                return WITHDRAW_SENDING, None, None
+            if found:
+                return WITHDRAW_DONE, found[0].get("id"), None
+            if time.time() - sent_at / 1000 <= WITHDRAW_GRACE_SECONDS:
+                logging.info("El retiro %s todavía no aparece en el historial; se verifica luego.", withdraw_order_id)
+                return WITHDRAW_SENDING, None, None
+            logging.error(
+                "El retiro %s no aparece en el historial tras %ds; queda para revisión manual.",
+                withdraw_order_id,
+                WITHDRAW_GRACE_SECONDS,
+            )
+            return WITHDRAW_FAILED, None, "resultado desconocido y ausente del historial: revisar manualmente"
+
+        try:
+            resp = self.withdrawer.withdraw(amount=amount, withdraw_order_id=withdraw_order_id)
+        except HTTPError as exc:
+            status_code = exc.response.status_code if exc.response is not None else None
+            if status_code in (418, 429) or http_error_code(exc) in TIMESTAMP_ERROR_CODES:
+                # Rechazado antes de ejecutarse (límite de peso o reloj): se reenvía luego.
+                logging.warning("Binance no ejecutó el retiro de %s; se reenvía luego: %s", withdraw_order_id, exc)
+                return WITHDRAW_NOT_SENT, None, str(exc)
+            if status_code is not None and status_code < 500:
                 logging.error("Error al enviar retiro automático: %s", exc)
+                return WITHDRAW_FAILED, None, str(exc)
+            logging.error("Resultado del retiro de %s desconocido; se verifica luego: %s", withdraw_order_id, exc)
+            return WITHDRAW_SENDING, None, None
+        except Exception as exc:  # noqa: BLE001
+            logging.error("Resultado del retiro de %s desconocido; se verifica luego: %s", withdraw_order_id, exc)
+            return WITHDRAW_SENDING, None, None
+
+        if resp is None:
+            return WITHDRAW_SKIPPED, None, None
+        return WITHDRAW_DONE, resp.get("id"), None
+
+    def _link_transfers(self, entries: list[JournalEntry]) -> None:
+        """
+        Vincula en el backend cada trade con el retiro que lo cubrió. Va por el spool del
+        reporter detrás de las altas ya encoladas; un trade que todavía no se reportó lleva
+        los datos del retiro en su propia alta. La hora de llegada a la wallet la completa
+        después `WithdrawReconciler`, cuando Binance confirma el retiro en la red.
+        """
+        if not self.reporter:
+            return
+        self.reporter.report_transfers(
+            [
+                transfer_payload(
+                    binance_order_id=e.order_id,
+                    withdraw_id=e.withdraw_id,
+                )
+                for e in entries
+                if e.order_id is not None
+            ]
+        )
 
-        if self.reporter and executed_qty > 0:
+    def _report(self, entry: JournalEntry) -> None:
+        if self.reporter and entry.executed_qty:
+            # Aceptar el retiro no es completarlo: sólo se informa la hora confirmada en la red.
+            transfer_ts = None
+            if entry.transfer_time:
+                transfer_ts = datetime.fromtimestamp(entry.transfer_time / 1000, tz=timezone.utc)
             try:
                 self.reporter.report_trade(
-                    buy_timestamp=buy_ts,
-                    fiat_spent=fiat_spent,
-                    btc_bought=executed_qty,
-                    price_fiat_per_btc=price,
+                    buy_timestamp=datetime.fromtimestamp(entry.transact_time / 1000, tz=timezone.utc),
+                    fiat_spent=entry.fiat_spent,
+                    btc_bought=entry.executed_qty,
+                    price_fiat_per_btc=entry.price,
                     wallet=self.wallet,
                     transfer_timestamp=transfer_ts,
+                    binance_order_id=entry.order_id,
+                    withdraw_id=entry.withdraw_id if entry.withdraw_status == WITHDRAW_DONE else None,
+                    transfer_tx_id=entry.tx_id,
                 )
             except Exception as exc:  # noqa: BLE001
                 logging.error("No se pudo reportar el trade al backend: %s", exc)
+                return
+        # El reporter persiste en su spool antes de volver: ya no se pierde.
+        self.journal.record_reported(entry.client_order_id)
 
     @staticmethod
     def _to_float(value) -> float:
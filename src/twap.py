@@ -0,0 +1,143 @@
+import logging
+import time
+from typing import Optional
+
+from src.state_store import JsonStateStore
+
+
+class SliceScheduler:
+    """
+    Reparte un saldo grande en `slices` órdenes hijas a lo largo de `window_seconds` (TWAP).
+
+    El plan se guarda en un `JsonStateStore`, así un reinicio retoma la misma ventana. El
+    monto de cada hija se recalcula con el saldo libre del momento dividido por las hijas que
+    faltan: un depósito que llega a mitad de la ventana se reparte entre las hijas restantes.
+    Cada hija es una compra normal del `AutoSwapper` (journal, retiro y reporte propios).
+    Una hija que no se ejecuta se reintenta con backoff desde `retry_seconds` (hasta el
+    intervalo entre hijas); tras `max_misses` fallos seguidos se abandona el reparto y no se
+    compra nada durante `window_seconds`, para no arrancar otro TWAP sobre el mismo problema.
+    """
+
+    def __init__(
+        self,
+        store: JsonStateStore,
+        threshold_quote: float,
+        slices: int = 6,
+        window_seconds: float = 3600,
+        key: str = "twap",
+        retry_seconds: float = 60,
+        max_misses: int = 5,
+    ) -> None:
+        self.store = store
+        self.threshold_quote = threshold_quote
+        self.slices = slices
+        self.window_seconds = window_seconds
+        self.key = key
+        self.retry_seconds = retry_seconds
+        self.max_misses = max_misses
+
+    def next_due(self) -> Optional[float]:
+        """Epoch (segundos) de la próxima hija (o del fin de la pausa), o None si no hay reparto en curso."""
+        state = self.store.get(self.key)
+        return state["next_at"] if state else None
+
+    def child_amount(self, available: float, min_notional: float, now: Optional[float] = None) -> Optional[float]:
+        """
+        Monto a comprar ahora con `available` libre. Sin reparto en curso devuelve todo el
+        saldo (o arranca uno si supera el umbral); None si todavía no toca la próxima hija.
+        """
+        now = time.time() if now is None else now
+        state = self.store.get(self.key)
+        if state is not None and "abandoned_until" in state:
+            if now < state["abandoned_until"]:
+                return None
+            state = None
+        if state is None:
+            if self.slices <= 1 or available < self.threshold_quote:
+                return available
+            state = {
+                "started_at": now,
+                "interval": self.window_seconds / self.slices,
+                "slices": self.slices,
+                "done": 0,
+                "next_at": now,
+                "spent": 0.0,
+                "expected_free": available,
+            }
+            self.store.set(self.key, state)
+            logging.info(
+                "Saldo %.8f supera el umbral TWAP %.8f: se reparte en %d órdenes cada %.0fs",
+                available,
+                self.threshold_quote,
+                self.slices,
+                state["interval"],
+            )
+        elif available > state["expected_free"] + min_notional:
+            logging.info(
+                "Depósito nuevo durante el TWAP (%.8f libres, se esperaban %.8f); se reparte en las hijas restantes",
+                available,
+                state["expected_free"],
+            )
+            state["expected_free"] = available
+            self.store.set(self.key, state)
+
+        if now < state["next_at"]:
+            return None
+        remaining_slices = max(1, state["slices"] - state["done"])
+        amount = max(available / remaining_slices, min(available, min_notional))
+        if available - amount < min_notional:
+            # Lo que quedaría no alcanza para otra orden válida: va todo en esta.
+            amount = available
+        return amount
+
+    def record_fill(self, quote_spent: float, available_before: float, min_notional: float) -> None:
+        state = self.store.get(self.key)
+        if state is None or "abandoned_until" in state:
+            return
+        state["done"] += 1
+        state["spent"] += quote_spent
+        state["misses"] = 0
+        state["expected_free"] = max(0.0, available_before - quote_spent)
+        if state["done"] >= state["slices"] or state["expected_free"] < min_notional:
+            self.finish(f"{state['done']} órdenes por {state['spent']:.8f}")
+            return
+        # Se respeta la grilla original; si un corte la atrasó, la hija siguiente sale ya.
+        state["next_at"] = state["started_at"] + state["interval"] * state["done"]
+        self.store.set(self.key, state)
+        logging.info(
+            "TWAP: hija %d/%d ejecutada (%.8f); próxima en %.0fs",
+            state["done"],
+            state["slices"],
+            quote_spent,
+            max(0.0, state["next_at"] - time.time()),
+        )
+
+    def record_miss(self) -> None:
+        """La hija que tocaba no se ejecutó (sin libro útil, IOC vencida, error): se posterga."""
+        state = self.store.get(self.key)
+        if state is None or "abandoned_until" in state:
+            return
+        misses = state.get("misses", 0) + 1
+        if misses >= self.max_misses:
+            self.abandon(f"{misses} intentos seguidos sin ejecutar la hija {state['done'] + 1}")
+            return
+        delay = min(self.retry_seconds * 2 ** (misses - 1), max(state["interval"], self.retry_seconds))
+        state["misses"] = misses
+        state["next_at"] = time.time() + delay
+        self.store.set(self.key, state)
+        logging.info("TWAP: la hija %d no se ejecutó; se reintenta en %.0fs", state["done"] + 1, delay)
+
+    def abandon(self, reason: str) -> None:
+        """Abandona el reparto y deja una pausa de `window_seconds` antes de volver a comprar."""
+        until = time.time() + self.window_seconds
+        # next_at marca el fin de la pausa, así el monitor vuelve a mirar saldos entonces.
+        self.store.set(self.key, {"abandoned_until": until, "next_at": until})
+        logging.error("TWAP abandonado: %s; sin compras por %.0fs", reason, self.window_seconds)
+
+    def finish(self, reason: str) -> None:
+        state = self.store.get(self.key)
+        # La pausa tras abandonar se mantiene aunque el saldo baje: vence sola.
+        if state is None or "abandoned_until" in state:
+            return
+        self.store.set(self.key, None)
+        logging.info("TWAP terminado: %s", reason)
@@ -0,0 +1,87 @@
+import json
+import logging
+import time
+from typing import Callable, Optional
+
+import websocket
+
+from src.binance_client import AssetBalance, BinanceClient
+
+
+class UserDataStream:
+    """
+    Conexión al user-data stream de Binance (listenKey + WebSocket).
+
+    `run` bloquea entregando cada evento a `on_event` y sólo retorna lanzando una
+    excepción cuando el stream se corta; la reconexión la decide quien lo usa.
+    """
+
+    def __init__(
+        self,
+        client: BinanceClient,
+        ws_url: str = "wss://stream.binance.com:9443/ws",
+        keepalive_interval_seconds: float = 30 * 60,
+        recv_timeout_seconds: float = 5,
+    ) -> None:
+        self.client = client
+        self.ws_url = ws_url.rstrip("/")
+        self.keepalive_interval_seconds = keepalive_interval_seconds
+        self.recv_timeout_seconds = recv_timeout_seconds
+
+    def run(
+        self,
+        on_event: Callable[[dict], None],
+        on_connected: Optional[Callable[[], None]] = None,
+        on_idle: Optional[Callable[[], None]] = None,
+    ) -> None:
+        listen_key = self.client.create_listen_key()
+        ws = websocket.create_connection(f"{self.ws_url}/{listen_key}", timeout=self.recv_timeout_seconds)
+        logging.info("User-data stream conectado (%s)", self.ws_url)
+        try:
+            if on_connected:
+                on_connected()
+            last_keepalive = time.monotonic()
+            while True:
+                if time.monotonic() - last_keepalive >= self.keepalive_interval_seconds:
+                    self.client.keepalive_listen_key(listen_key)
+                    last_keepalive = time.monotonic()
+
+                try:
+                    raw = ws.recv()
+                except websocket.WebSocketTimeoutException:
+                    if on_idle:
+                        on_idle()
+                    continue
+
+                if not raw:
+                    raise ConnectionError("El servidor cerró el user-data stream")
+                event = json.loads(raw)
+                if event.get("e") == "listenKeyExpired":
+                    raise ConnectionError("listenKey expirado")
+                on_event(event)
+        finally:
+            try:
+                ws.close()
+            except Exception:  # noqa: BLE001
+                pass
+            try:
+                self.client.close_listen_key(listen_key)
+            except Exception as exc:  # noqa: BLE001
+                logging.debug("No se pudo cerrar el listenKey: %s", exc)
+
+
+def balance_from_event(event: dict, asset: str) -> Optional[AssetBalance]:
+    """
+    Extrae el balance de `asset` de un evento outboundAccountPosition, si lo incluye.
+    """
+    if event.get("e") != "outboundAccountPosition":
+        return None
+
+    for b in event.get("B", []):
+        if b.get("a") != asset:
+            continue
+        try:
+            return AssetBalance(asset=asset, free=float(b.get("f", 0)), locked=float(b.get("l", 0)))
+        except (TypeError, ValueError):
+            return None
+    return None
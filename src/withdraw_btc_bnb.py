@@ -29,6 +29,7 @@ def main() -> None:
         api_key=config.api_key,
         api_secret=config.api_secret,
         base_url=config.base_url,
+        state_dir=config.state_dir,
     )
 
     coin = os.getenv("WITHDRAW_COIN", "BTC").upper()
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.order_journal import WITHDRAW_SENDING, JournalEntry, OrderJournal
+from src.state_store import JsonStateStore
+from src.telemetry import TradeReporter, transfer_payload
+
+# Estados de /sapi/v1/capital/withdraw/history. 0, 2 y 4 (email enviado, en proceso,
+# esperando aprobación) siguen pendientes.
+WITHDRAW_COMPLETED = 6
+WITHDRAW_FAILED_STATUSES = {1: "cancelado", 3: "rechazado", 5: "fallido"}
+
+# Margen hacia atrás del cursor: applyTime de Binance y withdraw_time local no coinciden al ms.
+CURSOR_MARGIN_MS = 5 * 60 * 1000
+
+
+def _parse_utc(value: Optional[str]) -> Optional[int]:
+    """'YYYY-MM-DD HH:MM:SS' (UTC, formato del historial de retiros) a epoch ms."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return int(parsed.timestamp() * 1000)
+
+
+class WithdrawReconciler:
+    """
+    Confirma cuándo llegó cada retiro a la wallet.
+
+    Que Binance acepte withdraw/apply no significa que el retiro se completó. Cada
+    `interval_seconds` se recorre /sapi/v1/capital/withdraw/history desde un cursor guardado
+    en un `JsonStateStore`, se cruza cada retiro con las compras del journal por su
+    withdrawOrderId y se registra la hora de completado (`completeTime`) y el txId. Todas
+    las compras confirmadas en una pasada van al backend en un único PATCH /trades/transfers.
+    """
+
+    def __init__(
+        self,
+        client,
+        journal: OrderJournal,
+        reporter: Optional[TradeReporter],
+        store: JsonStateStore,
+        coin: str = "BTC",
+        interval_seconds: float = 600,
+    ) -> None:
+        self.client = client
+        self.journal = journal
+        self.reporter = reporter
+        self.store = store
+        self.coin = coin.upper()
+        self.interval_seconds = interval_seconds
+        self.cursor_key = f"withdraw-history-{self.coin}"
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="withdraw-reconciler", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as exc:  # noqa: BLE001
+                logging.warning("No se pudo reconciliar el historial de retiros: %s", exc)
+            self._stop.wait(self.interval_seconds)
+
+    def run_once(self) -> int:
+        """Una pasada de reconciliación. Devuelve cuántas compras quedaron confirmadas."""
+        outstanding = self.journal.untransferred()
+        if not outstanding:
+            return 0
+        pending = {e.withdraw_order_id for e in outstanding}
+        start_time = self.store.get(self.cursor_key)
+        if start_time is None:
+            start_time = self._floor(outstanding)
+
+        confirmed: list[JournalEntry] = []
+        for page in self.client.iter_withdraw_history(coin=self.coin, start_time=start_time):
+            for withdrawal in page:
+                withdraw_order_id = withdrawal.get("withdrawOrderId")
+                if withdraw_order_id not in pending:
+                    continue
+                status = int(withdrawal.get("status", -1))
+                if status == WITHDRAW_COMPLETED:
+                    complete_time = _parse_utc(withdrawal.get("completeTime")) or int(time.time() * 1000)
+                    confirmed += self.journal.record_transfer(withdraw_order_id, complete_time, withdrawal.get("txId"))
+                    pending.discard(withdraw_order_id)
+                elif status in WITHDRAW_FAILED_STATUSES:
+                    reason = WITHDRAW_FAILED_STATUSES[status]
+                    logging.warning(
+                        "El retiro %s (%s) figura %s en Binance; el saldo volvió a la cuenta",
+                        withdraw_order_id,
+                        withdrawal.get("id"),
+                        reason,
+                    )
+                    self.journal.record_transfer_failed(withdraw_order_id, f"retiro {reason} (status {status})")
+                    pending.discard(withdraw_order_id)
+
+        if confirmed:
+            logging.info("Retiros confirmados en la red: %d compras", len(confirmed))
+            self._push(confirmed)
+        self._advance_cursor(start_time)
+        return len(confirmed)
+
+    def _push(self, entries: list[JournalEntry]) -> None:
+        if not self.reporter:
+            return
+        self.reporter.report_transfers(
+            [
+                transfer_payload(
+                    binance_order_id=e.order_id,
+                    transfer_timestamp=datetime.fromtimestamp(e.transfer_time / 1000, tz=timezone.utc),
+                    withdraw_id=e.withdraw_id,
+                    transfer_tx_id=e.tx_id,
+                )
+                for e in entries
+                if e.order_id is not None and e.transfer_time
+            ]
+        )
+
+    def _advance_cursor(self, start_time: int) -> None:
+        # El cursor queda justo antes del retiro más viejo sin confirmar (o del que todavía
+        # se está enviando), para no volver a leer historia ya resuelta; nunca retrocede.
+        remaining = self.journal.untransferred() + [
+            e for e in self.journal.pending() if e.withdraw_status == WITHDRAW_SENDING
+        ]
+        floor = self._floor(remaining) if remaining else int(time.time() * 1000) - CURSOR_MARGIN_MS
+        self.store.set(self.cursor_key, max(start_time, floor))
+
+    @staticmethod
+    def _floor(entries: list[JournalEntry]) -> int:
+        # Un retiro en envío no tiene withdraw_time aún: se toma la compra como cota inferior.
+        return min(e.withdraw_time or e.created_at for e in entries) - CURSOR_MARGIN_MS
@@ -1,11 +1,34 @@
 import logging
+import threading
+import time
+from dataclasses import dataclass
 
 from src.binance_client import BinanceClient
 
 
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass(frozen=True)
+class NetworkFee:
+    """Condiciones de retiro de una moneda en una red según /sapi/v1/capital/config/getall."""
+
+    fee: float
+    min_amount: float
+    enabled: bool
+
+
 class AutoWithdrawer:
     """
     Envía retiros automáticos cuando se le indica un monto y la configuración lo permite.
+
+    Con `batch_fee_ratio` > 0 trabaja por lotes: `batch_due` decide cuándo conviene retirar
+    lo acumulado, comparando el fee de red vigente (cacheado `fee_ttl_seconds`) contra el
+    monto, o cuando lo más viejo lleva `batch_max_hold_seconds` esperando.
     """
 
     def __init__(
@@ -15,14 +38,84 @@ class AutoWithdrawer:
         address: str | None,
         network: str = "BSC",
         min_amount: float = 0.0,
+        batch_fee_ratio: float = 0.0,
+        batch_max_hold_seconds: float = 7 * 24 * 3600,
+        fee_ttl_seconds: float = 3600,
     ) -> None:
         self.client = client
         self.coin = coin.upper()
         self.address = address
         self.network = network.upper()
         self.min_amount = min_amount
+        self.batch_fee_ratio = batch_fee_ratio
+        self.batch_max_hold_seconds = batch_max_hold_seconds
+        self.fee_ttl_seconds = fee_ttl_seconds
+        self._fee: NetworkFee | None = None
+        self._fee_fetched_at = 0.0
+        self._fee_lock = threading.Lock()
+
+    @property
+    def batching(self) -> bool:
+        return bool(self.address) and self.batch_fee_ratio > 0
+
+    def network_fee(self) -> NetworkFee | None:
+        """Fee y mínimo de retiro vigentes; si Binance no responde se usa la última copia."""
+        with self._fee_lock:
+            if self._fee and time.monotonic() - self._fee_fetched_at < self.fee_ttl_seconds:
+                return self._fee
+            try:
+                coins = self.client.get_coin_config()
+            except Exception as exc:  # noqa: BLE001
+                logging.warning("No se pudo leer el fee de retiro de %s: %s", self.coin, exc)
+                return self._fee
+            for coin in coins:
+                if coin.get("coin") != self.coin:
+                    continue
+                for network in coin.get("networkList") or []:
+                    if network.get("network") == self.network:
+                        self._fee = NetworkFee(
+                            fee=_to_float(network.get("withdrawFee")),
+                            min_amount=_to_float(network.get("withdrawMin")),
+                            enabled=bool(network.get("withdrawEnable")),
+                        )
+                        self._fee_fetched_at = time.monotonic()
+                        return self._fee
+            logging.warning("Binance no informa la red %s para %s", self.network, self.coin)
+            return self._fee
+
+    def batch_due(self, amount: float, oldest_age_seconds: float) -> bool:
+        """True si conviene retirar ahora `amount` acumulado (fee relativo bajo o espera vencida)."""
+        fee = self.network_fee()
+        if fee is not None and not fee.enabled:
+            logging.info("Retiros de %s por %s deshabilitados en Binance; se sigue acumulando.", self.coin, self.network)
+            return False
+        minimum = max(self.min_amount, fee.min_amount if fee else 0.0)
+        if amount < minimum:
+            if oldest_age_seconds >= self.batch_max_hold_seconds:
+                logging.warning(
+                    "Lote de %.8f %s retenido más de lo configurado pero bajo el mínimo de retiro %.8f",
+                    amount,
+                    self.coin,
+                    minimum,
+                )
+            return False
+        if oldest_age_seconds >= self.batch_max_hold_seconds:
+            logging.info("Lote de %.8f %s alcanzó la espera máxima; se retira.", amount, self.coin)
+            return True
+        if fee is None:
+            return False
+        if fee.fee <= amount * self.batch_fee_ratio:
+            logging.info(
+                "Lote de %.8f %s: fee %.8f (%.2f%%) dentro del umbral; se retira.",
+                amount,
+                self.coin,
+                fee.fee,
+                fee.fee / amount * 100,
+            )
+            return True
+        return False
 
-    def withdraw(self, amount: float) -> None:
+    def withdraw(self, amount: float, withdraw_order_id: str | None = None) -> dict | None:
         if not self.address:
             logging.info("No se configuró WITHDRAW_ADDRESS; se omite el retiro automático.")
             return
@@ -49,6 +142,7 @@ class AutoWithdrawer:
             address=self.address,
             amount=amount,
             network=self.network,
+            withdraw_order_id=withdraw_order_id,
         )
         logging.info("Retiro enviado. Respuesta: %s", resp)
         return resp
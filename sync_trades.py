@@ -3,8 +3,13 @@ Sincroniza compras de BTC desde Binance hacia el backend (Supabase vía FastAPI)
 
 Usa:
 - Credenciales Binance y trade symbol desde .env
-- BACKEND_API_BASE para enviar POST /trades
+- BACKEND_API_BASE para enviar POST /trades/bulk
+
+Es incremental: guarda en STATE_DIR el último id de trade de Binance sincronizado y en
+cada corrida sólo pide los trades posteriores. El backend deduplica por id de trade.
+Mientras el backend confirma una página ya se está pidiendo la siguiente a Binance.
 """
+import asyncio
 import logging
 import sys
 from datetime import datetime, timezone
@@ -18,68 +23,123 @@ ROOT = Path(__file__).resolve().parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from src.binance_client import BinanceClient  # noqa: E402
+from src.async_binance_client import AsyncBinanceClient  # noqa: E402
 from src.config import load_config  # noqa: E402
-from src.telemetry import TradeReporter  # noqa: E402
+from src.state_store import JsonStateStore  # noqa: E402
+from src.telemetry import TradeReporter, trade_payload  # noqa: E402
+
 
+def _epoch_ms(iso: str) -> int:
+    dt = datetime.fromisoformat(iso)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
 
-def fetch_existing_trades(api_base: str) -> Set[str]:
+
+def fetch_existing_trades(api_base: str) -> Set[int]:
+    """
+    Timestamps (epoch ms) de los trades ya cargados. Sólo se usa en la primera corrida
+    incremental, para no duplicar filas cargadas antes de que existiera binance_trade_id.
+    Un error se propaga: seguir sin esa lista duplicaría todo el historial viejo.
+    """
     try:
-        resp = requests.get(f"{api_base}/trades", timeout=5)
+        resp = requests.get(f"{api_base}/trades", timeout=30)
         resp.raise_for_status()
         data = resp.json()
-        return {t.get("buy_timestamp") for t in data if t.get("buy_timestamp")}
     except Exception as exc:  # noqa: BLE001
-        logging.error("No se pudieron obtener trades existentes: %s", exc)
-        return set()
+        logging.error("No se pudieron obtener trades existentes; se aborta la primera sincronización: %s", exc)
+        raise
+    return {_epoch_ms(t["buy_timestamp"]) for t in data if t.get("buy_timestamp")}
+
+
+def _to_payload(t: dict, wallet: str) -> dict:
+    buy_dt = datetime.fromtimestamp(int(t.get("time", 0)) / 1000, tz=timezone.utc)
+    qty = float(t.get("qty", 0))
+    quote_qty = float(t.get("quoteQty", 0))
+    price = float(t.get("price", 0))
+    return trade_payload(
+        buy_timestamp=buy_dt,
+        fiat_spent=quote_qty,
+        btc_bought=qty,
+        price_fiat_per_btc=price if price > 0 else (quote_qty / qty if qty else 0),
+        wallet=wallet,
+        transfer_timestamp=None,
+        binance_order_id=t.get("orderId"),
+        binance_trade_id=t.get("id"),
+    )
 
 
-def main() -> None:
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
-    config = load_config()
+async def _fetch_pages(client: AsyncBinanceClient, symbol: str, from_id, queue: asyncio.Queue) -> None:
+    # Cola de una página: Binance va como mucho una página adelante del backend. El fin (None)
+    # o el error que cortó la paginación también viajan por la cola.
+    try:
+        async for page in client.iter_my_trades(symbol, from_id=from_id):
+            await queue.put(page)
+    except Exception as exc:  # noqa: BLE001
+        await queue.put(exc)
+        return
+    await queue.put(None)
 
-    if not config.backend_api_base:
-        logging.error("Define BACKEND_API_BASE para sincronizar trades.")
-        sys.exit(1)
 
-    client = BinanceClient(
-        api_key=config.api_key,
-        api_secret=config.api_secret,
-        base_url=config.base_url,
-    )
+async def sync(config) -> tuple[int, int]:
+    """Sincroniza y devuelve (creados, omitidos)."""
     reporter = TradeReporter(base_url=config.backend_api_base)
+    state = JsonStateStore(Path(config.state_dir) / "sync_trades.json")
+    cursor_key = f"{config.trade_symbol}:last_trade_id"
 
-    logging.info("Obteniendo trades de Binance para %s ...", config.trade_symbol)
-    trades = client.get_my_trades(config.trade_symbol)
-    if not trades:
-        logging.info("No se encontraron trades en Binance para %s", config.trade_symbol)
-        return
+    last_id = state.get(cursor_key)
+    legacy_task = None
+    if last_id is None:
+        logging.info("Primera sincronización incremental: se revisa el historial completo.")
+        legacy_task = asyncio.create_task(asyncio.to_thread(fetch_existing_trades, config.backend_api_base))
+    else:
+        logging.info("Sincronizando trades de %s posteriores al id %s ...", config.trade_symbol, last_id)
 
-    existing = fetch_existing_trades(config.backend_api_base)
     created = 0
     skipped = 0
+    from_id = last_id + 1 if last_id is not None else None
+    async with AsyncBinanceClient(
+        api_key=config.api_key,
+        api_secret=config.api_secret,
+        base_url=config.base_url,
+        state_dir=config.state_dir,
+    ) as client:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        producer = asyncio.create_task(_fetch_pages(client, config.trade_symbol, from_id, queue))
+        try:
+            legacy_existing: Set[int] = await legacy_task if legacy_task else set()
+            while (page := await queue.get()) is not None:
+                if isinstance(page, Exception):
+                    raise page
+                payloads = []
+                for t in page:
+                    if int(t.get("time", 0)) in legacy_existing:
+                        skipped += 1
+                        continue
+                    payloads.append(_to_payload(t, config.withdraw_address or ""))
+
+                result = await asyncio.to_thread(reporter.report_trades, payloads)
+                created += result.get("created", 0)
+                skipped += result.get("skipped", 0)
+                # Se avanza el cursor sólo después de que el backend confirmó la página.
+                state.set(cursor_key, int(page[-1]["id"]))
+        finally:
+            producer.cancel()
+    return created, skipped
 
-    for t in sorted(trades, key=lambda x: x.get("time", 0)):
-        buy_dt = datetime.fromtimestamp(int(t.get("time", 0)) / 1000, tz=timezone.utc)
-        buy_iso = buy_dt.isoformat()
-        qty = float(t.get("qty", 0))
-        quote_qty = float(t.get("quoteQty", 0))
-        price = float(t.get("price", 0))
-
-        if buy_iso in existing:
-            skipped += 1
-            continue
-
-        reporter.report_trade(
-            buy_timestamp=buy_dt,
-            fiat_spent=quote_qty,
-            btc_bought=qty,
-            price_fiat_per_btc=price if price > 0 else (quote_qty / qty if qty else 0),
-            wallet=config.withdraw_address or "",
-            transfer_timestamp=None,
-        )
-        created += 1
 
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    config = load_config()
+
+    if not config.backend_api_base:
+        logging.error("Define BACKEND_API_BASE para sincronizar trades.")
+        sys.exit(1)
+
+    created, skipped = asyncio.run(sync(config))
+    if created == 0 and skipped == 0:
+        logging.info("No hay trades nuevos en Binance para %s", config.trade_symbol)
+        return
     logging.info("Sincronización completada. Nuevos: %s | Omitidos (ya estaban): %s", created, skipped)
 
 